@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+from core.cache import cached
+from core.data import appended_rows, read_dataset
+from core.matcher import sentiment_of
+
+SENTIMENTS = ['Positif', 'Netral', 'Negatif']
+SUM_COLUMNS = ['tweets', 'likes', 'retweets', 'total_engagement'] + SENTIMENTS
+
+
+def account_keys(df):
+    # Handles are case-insensitive; fall back to user_id when the crawl lost the handle
+    keys = df['username'].str.lower()
+    return keys.fillna('id:' + df['user_id'].astype('Int64').astype(str))
+
+
+def aggregate_accounts(df, sentiment):
+    # One grouped pass; every column is a sum, min or max so tables merge
+    frame = pd.DataFrame({
+        'account': account_keys(df),
+        'username': df['username'],
+        'user_id': df['user_id'],
+        'likes': df['favorite_count'],
+        'retweets': df['retweet_count'],
+        'created_at': df['created_at'],
+    })
+    frame['total_engagement'] = frame['likes'] + frame['retweets']
+    for label in SENTIMENTS:
+        frame[label] = (sentiment == label).astype(int)
+
+    accounts = frame.groupby('account').agg(
+        username=('username', 'first'),
+        user_id=('user_id', 'first'),
+        tweets=('likes', 'size'),
+        likes=('likes', 'sum'),
+        retweets=('retweets', 'sum'),
+        total_engagement=('total_engagement', 'sum'),
+        first_seen=('created_at', 'min'),
+        last_seen=('created_at', 'max'),
+        **{label: (label, 'sum') for label in SENTIMENTS},
+    )
+    return _finish(accounts)
+
+
+def _finish(accounts):
+    accounts['avg_engagement'] = accounts['total_engagement'] / accounts['tweets']
+    accounts['dominant_sentiment'] = accounts[SENTIMENTS].idxmax(axis=1)
+    return accounts.sort_index()
+
+
+def merge_accounts(old, new):
+    # Fold the aggregates of a new crawl into an existing table
+    combined = pd.concat([old, new])
+    grouped = combined.groupby(level=0)
+    merged = grouped[SUM_COLUMNS].sum()
+    merged['username'] = grouped['username'].first()
+    merged['user_id'] = grouped['user_id'].first()
+    merged['first_seen'] = grouped['first_seen'].min()
+    merged['last_seen'] = grouped['last_seen'].max()
+    return _finish(merged[old.columns.drop(['avg_engagement', 'dominant_sentiment'])])
+
+
+@cached
+def account_index(version):
+    df = read_dataset(version)
+    delta = appended_rows(version)
+    if delta is None:
+        accounts = aggregate_accounts(df, sentiment_of(version, df.index))
+    else:
+        # A crawl that only added tweets is folded into the served snapshot's table
+        added = df.iloc[delta['added']]
+        accounts = merge_accounts(account_index(delta['version'])['accounts'],
+                                  aggregate_accounts(added, sentiment_of(version, added.index)))
+    # Row positions per account, for drill-downs without a full-frame filter
+    keys = account_keys(df).to_numpy()
+    order = np.argsort(keys, kind='stable')
+    bounds = np.searchsorted(keys[order], accounts.index.to_numpy(), side='left')
+    return {'accounts': accounts, 'row_order': order, 'row_bounds': np.append(bounds, len(order))}
+
+
+@cached
+def top_accounts(version, by='total_engagement', n=10):
+    return account_index(version)['accounts'].nlargest(n, [by, 'tweets']).reset_index()
+
+
+def account_rows(index, account):
+    position = index['accounts'].index.get_loc(account)
+    return index['row_order'][index['row_bounds'][position]:index['row_bounds'][position + 1]]
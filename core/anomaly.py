@@ -0,0 +1,166 @@
+import hashlib
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+
+from core.cache import cached
+from core.data import read_dataset
+from core.matcher import sentiment_of
+
+METRICS = {
+    # metric: (label, minimum standard deviation used for the z-score)
+    'volume': ('Volume Tweet', 2.0),
+    'engagement': ('Engagement', 25.0),
+    'negative_share': ('Proporsi Negatif', 0.1),
+}
+THRESHOLD = 5.0
+ALPHA = 0.05
+SEASONAL_ALPHA = 0.2
+MIN_HISTORY = 24
+MIN_SEASONAL = 3
+# Negative share is noise on hours with only one or two tweets
+MIN_TWEETS_FOR_SHARE = 3
+
+
+class EWMA:
+    __slots__ = ('alpha', 'mean', 'var', 'n')
+
+    def __init__(self, alpha):
+        self.alpha = alpha
+        self.mean = 0.0
+        self.var = 0.0
+        self.n = 0
+
+    def zscore(self, x, floor):
+        return (x - self.mean) / max(math.sqrt(self.var), floor)
+
+    def update(self, x):
+        if self.n == 0:
+            self.mean = x
+        else:
+            diff = x - self.mean
+            incr = self.alpha * diff
+            self.mean += incr
+            self.var = (1 - self.alpha) * (self.var + diff * incr)
+        self.n += 1
+
+
+class SeasonalDetector:
+    # Global EWMA plus one per hour-of-week slot; the seasonal baseline is
+    # used once its slot has seen a few weeks. Both updates are O(1).
+    def __init__(self, floor):
+        self.floor = floor
+        self.overall = EWMA(ALPHA)
+        self.slots = [EWMA(SEASONAL_ALPHA) for _ in range(7 * 24)]
+
+    def score(self, ts, x):
+        slot = self.slots[ts.dayofweek * 24 + ts.hour]
+        if slot.n >= MIN_SEASONAL:
+            return slot.zscore(x, self.floor)
+        if self.overall.n >= MIN_HISTORY:
+            return self.overall.zscore(x, self.floor)
+        return 0.0
+
+    def update(self, ts, x):
+        self.overall.update(x)
+        self.slots[ts.dayofweek * 24 + ts.hour].update(x)
+
+
+class AnomalyMonitor:
+    # Consumes hourly aggregates in order. Only closed hours update the
+    # baselines; the newest (possibly still filling) hour is scored provisionally.
+    def __init__(self, threshold=THRESHOLD):
+        self.threshold = threshold
+        self.detectors = {metric: SeasonalDetector(floor) for metric, (_, floor) in METRICS.items()}
+        self.last_closed = None
+        self.fingerprint = None
+        self.flags = []
+
+    def _score(self, ts, row, update):
+        flags = []
+        for metric, detector in self.detectors.items():
+            x = row[metric]
+            if pd.isna(x):
+                continue
+            z = detector.score(ts, x)
+            if z >= self.threshold:
+                flags.append({'hour': ts, 'metric': metric, 'value': x, 'z': round(z, 2), 'provisional': not update})
+            if update:
+                detector.update(ts, x)
+        return flags
+
+    def feed(self, hourly):
+        closed = hourly.iloc[:-1]
+        if self.last_closed is not None:
+            closed = closed[closed.index > self.last_closed]
+        for ts, row in zip(closed.index, closed.to_dict('records')):
+            self.flags.extend(self._score(ts, row, update=True))
+        if len(closed):
+            self.last_closed = closed.index[-1]
+        self.fingerprint = history_fingerprint(hourly, self.last_closed)
+        provisional = self._score(hourly.index[-1], hourly.iloc[-1], update=False) if len(hourly) else []
+        return self.flags + provisional
+
+
+def history_fingerprint(hourly, until):
+    if until is None:
+        return None
+    values = hourly.loc[:until, list(METRICS)].fillna(-1).to_numpy(dtype=np.float64)
+    return hashlib.blake2b(values.tobytes(), digest_size=8).hexdigest()
+
+
+def hourly_aggregates(df, sentiment):
+    frame = pd.DataFrame({
+        'hour': df['created_at'].dt.floor('h'),
+        'volume': 1,
+        'engagement': df['favorite_count'] + df['retweet_count'],
+        'negative': (sentiment == 'Negatif').astype(int),
+    })
+    hourly = frame.groupby('hour').sum()
+    if hourly.empty:
+        return hourly.assign(negative_share=[])
+    hourly = hourly.reindex(pd.date_range(hourly.index.min(), hourly.index.max(), freq='h'), fill_value=0)
+    share = hourly['negative'] / hourly['volume']
+    hourly['negative_share'] = share.where(hourly['volume'] >= MIN_TWEETS_FOR_SHARE)
+    return hourly
+
+
+def flag_intervals(flags):
+    # Merge consecutive flagged hours of the same metric into intervals
+    columns = ['metric', 'label', 'start', 'end', 'peak_z', 'peak_value', 'provisional']
+    if not flags:
+        return pd.DataFrame(columns=columns)
+    frame = pd.DataFrame(flags).sort_values(['metric', 'hour'])
+    new_run = (frame['metric'] != frame['metric'].shift()) | (frame['hour'].diff() != pd.Timedelta(hours=1))
+    frame['run'] = new_run.cumsum()
+    intervals = frame.groupby('run').agg(
+        metric=('metric', 'first'),
+        start=('hour', 'min'),
+        end=('hour', 'max'),
+        peak_z=('z', 'max'),
+        peak_value=('value', 'max'),
+        provisional=('provisional', 'any'),
+    )
+    intervals['end'] += pd.Timedelta(hours=1)
+    intervals['label'] = intervals['metric'].map(lambda m: METRICS[m][0])
+    return intervals[columns].sort_values('start').reset_index(drop=True)
+
+
+_monitor_lock = threading.Lock()
+_monitor = {'instance': None}
+
+
+@cached
+def spike_intervals(version):
+    df = read_dataset(version)
+    hourly = hourly_aggregates(df, sentiment_of(version, df.index))
+    with _monitor_lock:
+        # Reuse the process-wide monitor when the new snapshot only appends
+        # hours; otherwise history changed and baselines are rebuilt
+        monitor = _monitor['instance']
+        if monitor is None or history_fingerprint(hourly, monitor.last_closed) != monitor.fingerprint:
+            monitor = AnomalyMonitor()
+            _monitor['instance'] = monitor
+        return flag_intervals(monitor.feed(hourly))
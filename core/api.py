@@ -0,0 +1,215 @@
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from core import data, ranking, text, warmup
+from core.cache import cached
+from core.matcher import sentiment_of
+
+# Set to a port number to serve the JSON API from inside the Streamlit process,
+# where it shares every cached artifact with the pages
+API_PORT = os.environ.get('DASHBOARD_API_PORT')
+API_HOST = os.environ.get('DASHBOARD_API_HOST', '127.0.0.1')
+GZIP_MIN_BYTES = 1024
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_server = {'instance': None}
+
+
+def _filtered(version, start=None, end=None, q=None, min_engagement=0):
+    # Returns the snapshot itself when no filter applies, so calls hash to the
+    # same cache entries the pages use
+    df = data.read_dataset(version)
+    mask = pd.Series(True, index=df.index)
+    if start:
+        mask &= df['created_at'] >= pd.Timestamp(start)
+    if end:
+        mask &= df['created_at'] < pd.Timestamp(end) + pd.Timedelta(days=1)
+    if q:
+        # Literal, case-insensitive substring, as on the Dataset page and in SQL
+        mask &= data.text_heap(version).contains('full_text', df.index, q)
+    if min_engagement:
+        mask &= (df['favorite_count'] + df['retweet_count']) >= min_engagement
+    return df if mask.all() else df[mask]
+
+
+def daily(df, **_):
+    counts = df.groupby(df['created_at'].dt.date).size()
+    return [{'date': str(date), 'count': int(count)} for date, count in counts.items()]
+
+
+def sentiment(df, version, **_):
+    counts = sentiment_of(version, df.index).value_counts()
+    return {label: int(counts.get(label, 0)) for label in ['Positif', 'Netral', 'Negatif']}
+
+
+def keywords(df, version, top=20, **_):
+    texts = data.load_texts(df, version=version)
+    return [{'keyword': word, 'count': count} for word, count in text.extract_keywords(texts, top_n=top)]
+
+
+def hashtags(df, version, **_):
+    texts = data.load_texts(df, version=version)
+    return [{'hashtag': tag, 'count': count} for tag, count in text.extract_hashtags(texts)]
+
+
+def top_tweets(df, version, k=10, **_):
+    full = data.read_dataset(version)
+    order = ranking.ranking_index(version)['total_engagement']
+    rows = full.iloc[ranking.top_k(order, full.index.isin(df.index), k)]
+    rows = rows.assign(full_text=data.load_texts(rows, version=version))
+    return [{
+        'id': str(row['id']),
+        'username': row['username'],
+        'created_at': row['created_at'].isoformat(),
+        'full_text': row['full_text'],
+        'likes': int(row['favorite_count']),
+        'retweets': int(row['retweet_count']),
+        'total_engagement': int(row['favorite_count'] + row['retweet_count']),
+    } for _, row in rows.iterrows()]
+
+
+ENDPOINTS = {
+    'daily': daily,
+    'sentiment': sentiment,
+    'keywords': keywords,
+    'hashtags': hashtags,
+    'top-tweets': top_tweets,
+}
+INT_PARAMS = {'top', 'k', 'min_engagement'}
+
+
+def parse_params(query):
+    params = {}
+    for name, values in parse_qs(query).items():
+        value = values[-1]
+        params[name] = int(value) if name in INT_PARAMS else value
+    return params
+
+
+@cached
+def api_response(version, endpoint, params):
+    # Keyed by (version, endpoint, sorted params); the body and its ETag are reused
+    params = dict(params)
+    filters = {name: params.pop(name) for name in ('start', 'end', 'q', 'min_engagement') if name in params}
+    df = _filtered(version, **filters)
+    payload = {
+        'version': version,
+        'endpoint': endpoint,
+        'params': {**filters, **params},
+        'rows': len(df),
+        'data': ENDPOINTS[endpoint](df, version=version, **params),
+    }
+    body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+    etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+    return {'body': body, 'gzip': gzip.compress(body) if len(body) >= GZIP_MIN_BYTES else None, 'etag': etag}
+
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = 'DashboardAPI/1.0'
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        name = url.path.rstrip('/').removeprefix('/api/')
+        version = data.served_version()
+
+        if name == 'health':
+            return self._send_json(HTTPStatus.OK, {'version': version, 'ready': warmup.is_ready()})
+        if name not in ENDPOINTS:
+            return self._send_json(HTTPStatus.NOT_FOUND, {'error': f"unknown endpoint '{name}'", 'endpoints': sorted(ENDPOINTS)})
+        try:
+            params = parse_params(url.query)
+            response = api_response(version, name, tuple(sorted(params.items())))
+        except (TypeError, ValueError) as exc:
+            return self._send_json(HTTPStatus.BAD_REQUEST, {'error': str(exc)})
+        except Exception:
+            logger.exception("API request failed: %s", self.path)
+            return self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': 'internal error'})
+
+        if self.headers.get('If-None-Match') == response['etag']:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', response['etag'])
+            self.end_headers()
+            return
+
+        body = response['body']
+        use_gzip = response['gzip'] is not None and 'gzip' in self.headers.get('Accept-Encoding', '')
+        if use_gzip:
+            body = response['gzip']
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('ETag', response['etag'])
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(host=API_HOST, port=8765):
+    server = ThreadingHTTPServer((host, int(port)), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def ensure_started():
+    # One server per process, only when DASHBOARD_API_PORT is set
+    if not API_PORT:
+        return
+    with _lock:
+        if _server['instance'] is not None:
+            return
+        try:
+            server = serve(API_HOST, API_PORT)
+        except OSError:
+            logger.exception("Could not start the JSON API on %s:%s", API_HOST, API_PORT)
+            _server['instance'] = False
+            return
+        _server['instance'] = server
+        threading.Thread(target=server.serve_forever, name='json-api', daemon=True).start()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve dashboard aggregates as JSON")
+    parser.add_argument('--host', default=API_HOST)
+    parser.add_argument('--port', type=int, default=int(API_PORT or 8765))
+    args = parser.parse_args(argv)
+
+    server = serve(args.host, args.port)
+    # Run as `python -m core.api` this module is __main__, and the warm-up
+    # imports core.api as a second copy; register the server there so that
+    # copy does not try to bind DASHBOARD_API_PORT again
+    import core.api
+    with core.api._lock:
+        core.api._server['instance'] = server
+    warmup.ensure_started()
+    print(f"Serving on http://{args.host}:{args.port}/api/")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
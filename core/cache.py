@@ -0,0 +1,347 @@
+import contextlib
+import copy
+import functools
+import hashlib
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MB = 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+# Per-function limits. Anything not listed gets DEFAULT_POLICY. `max_bytes`
+# is the memory budget for all entries of that function together. `copy=False`
+# serves entries without copying: for immutable indexes, whose arrays are
+# frozen read-only when stored. Every cached result is keyed by a snapshot
+# version or by the content of its arguments, so none goes stale: there is no
+# TTL, and entries leave only by LRU order or budget, never between warm-ups.
+DEFAULT_POLICY = {'max_entries': 32, 'ttl': None, 'max_bytes': 64 * MB, 'copy': True}
+POLICIES = {
+    # Current snapshot plus the stale one served while revalidating
+    'read_dataset': {'max_entries': 2, 'ttl': None, 'max_bytes': 1024 * MB},
+    'text_heap': {'max_entries': 2, 'ttl': None, 'max_bytes': 1 * MB},
+    'sentiment_labels': {'max_entries': 8, 'ttl': None, 'max_bytes': 64 * MB},
+    'extract_keywords': {'max_entries': 64, 'ttl': None, 'max_bytes': 16 * MB},
+    'categorize_keywords': {'max_entries': 64, 'ttl': None, 'max_bytes': 4 * MB},
+    'extract_keyword_cooccurrence': {'max_entries': 32, 'ttl': None, 'max_bytes': 16 * MB},
+    'extract_keywords_temporal': {'max_entries': 8, 'ttl': None, 'max_bytes': 32 * MB},
+    'trend_engine': {'max_entries': 6, 'ttl': None, 'max_bytes': 32 * MB, 'copy': False},
+    'trending_keywords': {'max_entries': 16, 'ttl': None, 'max_bytes': 8 * MB},
+    'distinct_index': {'max_entries': 2, 'ttl': None, 'max_bytes': 128 * MB},
+    'count_distinct': {'max_entries': 256, 'ttl': None, 'max_bytes': 1 * MB},
+    'near_duplicate_clusters': {'max_entries': 2, 'ttl': None, 'max_bytes': 256 * MB},
+    'tweet_lexicon_hits': {'max_entries': 2, 'ttl': None, 'max_bytes': 256 * MB, 'copy': False},
+    'category_daily': {'max_entries': 4, 'ttl': None, 'max_bytes': 16 * MB},
+    'conversation_graph': {'max_entries': 2, 'ttl': None, 'max_bytes': 256 * MB},
+    'account_index': {'max_entries': 2, 'ttl': None, 'max_bytes': 256 * MB},
+    'top_accounts': {'max_entries': 32, 'ttl': None, 'max_bytes': 4 * MB},
+    'ranking_index': {'max_entries': 2, 'ttl': None, 'max_bytes': 128 * MB, 'copy': False},
+    'trend_pyramid': {'max_entries': 2, 'ttl': None, 'max_bytes': 128 * MB},
+    'trend_window': {'max_entries': 64, 'ttl': None, 'max_bytes': 32 * MB},
+    'spike_intervals': {'max_entries': 4, 'ttl': None, 'max_bytes': 8 * MB},
+    'hashtag_index': {'max_entries': 2, 'ttl': None, 'max_bytes': 64 * MB},
+    'top_hashtags': {'max_entries': 64, 'ttl': None, 'max_bytes': 4 * MB},
+    'term_index': {'max_entries': 2, 'ttl': None, 'max_bytes': 256 * MB, 'copy': False},
+    'row_features': {'max_entries': 2, 'ttl': None, 'max_bytes': 128 * MB, 'copy': False},
+    'keyword_drilldown': {'max_entries': 128, 'ttl': None, 'max_bytes': 32 * MB},
+    'location_index': {'max_entries': 2, 'ttl': None, 'max_bytes': 32 * MB},
+    'append_delta': {'max_entries': 2, 'ttl': None, 'max_bytes': 64 * MB},
+    'source_aggregates': {'max_entries': 2, 'ttl': None, 'max_bytes': 1 * MB},
+    'source_overlap': {'max_entries': 2, 'ttl': None, 'max_bytes': 1 * MB},
+    'snapshot_span': {'max_entries': 2, 'ttl': None, 'max_bytes': 1 * MB},
+    'daily_buckets': {'max_entries': 2, 'ttl': None, 'max_bytes': 64 * MB},
+    'period_summary': {'max_entries': 64, 'ttl': None, 'max_bytes': 16 * MB},
+    'stratified_sample': {'max_entries': 2, 'ttl': None, 'max_bytes': 256 * MB},
+    'api_response': {'max_entries': 256, 'ttl': None, 'max_bytes': 64 * MB},
+    'extract_hashtags': {'max_entries': 32, 'ttl': None, 'max_bytes': 4 * MB},
+}
+
+_registry = {}
+_flights = {}
+_flights_lock = threading.Lock()
+_wait_hook = {'hook': None}
+
+
+def _hash_arg(h, value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        h.update(type(value).__name__.encode())
+        if isinstance(value, pd.DataFrame):
+            h.update(repr(list(value.columns)).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    else:
+        h.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def make_key(args, kwargs):
+    h = hashlib.blake2b(digest_size=16)
+    for value in args:
+        _hash_arg(h, value)
+    for name in sorted(kwargs):
+        h.update(name.encode())
+        _hash_arg(h, kwargs[name])
+    return h.hexdigest()
+
+
+def sizeof(value):
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        return int(value.nbytes)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sum(sizeof(item) for item in value.values())
+    if isinstance(value, (list, tuple)) and any(isinstance(item, (np.ndarray, pd.DataFrame, pd.Series)) for item in value):
+        return sum(sizeof(item) for item in value)
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+def _copy(value):
+    # Same contract as st.cache_data: callers get their own mutable copy
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    return copy.deepcopy(value)
+
+
+def _freeze(value):
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _freeze(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _freeze(item)
+    return value
+
+
+def _share(value):
+    # No-copy entries: arrays are read-only and shared; frames get a shallow
+    # copy (free under copy-on-write) so column assignment stays local
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    if isinstance(value, dict):
+        return {key: _share(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_share(item) for item in value)
+    return value
+
+
+class LRUCache:
+    def __init__(self, name, max_entries=None, ttl=None, max_bytes=None, copy=True):
+        self.name = name
+        self.copy = copy
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        # Entries held outside the LRU and its budget, e.g. the served snapshot
+        self._pinned = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+        self.oversize = 0
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+        self.evictions += 1
+
+    def get(self, key):
+        with self._lock:
+            if key in self._pinned:
+                self.hits += 1
+                return self._pinned[key], True
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[2] > self.ttl:
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None, False
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], True
+
+    def peek(self, key):
+        # Lookup without touching stats or recency
+        with self._lock:
+            if key in self._pinned:
+                return self._pinned[key], True
+            entry = self._entries.get(key)
+            if entry is None or (self.ttl is not None and time.monotonic() - entry[2] > self.ttl):
+                return None, False
+            return entry[0], True
+
+    def put(self, key, value):
+        size = sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+                self.evictions -= 1
+            if self.max_bytes is not None and size > self.max_bytes:
+                # Larger than the whole budget: serve it once, never keep it.
+                # Every call recomputes it, so say so instead of failing quietly
+                self.oversize += 1
+                logger.warning("%s: %.0f MB result exceeds its %.0f MB cache budget and is not kept",
+                               self.name, size / MB, self.max_bytes / MB)
+                return
+            self._entries[key] = (value, size, time.monotonic())
+            self.bytes += size
+            now = time.monotonic()
+            if self.ttl is not None:
+                for old_key in [k for k, e in self._entries.items() if now - e[2] > self.ttl]:
+                    self._drop(old_key)
+            while self._entries and (
+                (self.max_entries is not None and len(self._entries) > self.max_entries)
+                or (self.max_bytes is not None and self.bytes > self.max_bytes)
+            ):
+                self._drop(next(iter(self._entries)))
+
+    def pin(self, key, value):
+        # Hold one entry regardless of LRU order and budget; replaces the
+        # previous pin, which is then only kept if it fits the LRU
+        with self._lock:
+            self._pinned = {key: value}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._pinned.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            calls = self.hits + self.misses
+            return {
+                'function': self.name,
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / calls if calls else 0.0,
+                'evictions': self.evictions,
+                'coalesced': self.coalesced,
+                'oversize': self.oversize,
+                'pinned': len(self._pinned),
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'copy': self.copy,
+            }
+
+
+class Flight:
+    # One in-progress computation that concurrent callers wait on
+    def __init__(self, name):
+        self.name = name
+        self.started = time.monotonic()
+        self.waiters = 0
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+def set_wait_hook(hook):
+    # hook(flight) returns a context manager shown while a caller waits,
+    # e.g. a spinner in the waiting session
+    _wait_hook['hook'] = hook
+
+
+def in_flight():
+    with _flights_lock:
+        return [{'function': f.name, 'seconds': time.monotonic() - f.started, 'waiters': f.waiters}
+                for f in _flights.values()]
+
+
+def _single_flight(store, key, func, args, kwargs):
+    # The first caller for a key computes; concurrent callers for the same key
+    # block on its result instead of starting the same work again
+    with _flights_lock:
+        flight = _flights.get((store.name, key))
+        leader = flight is None
+        if leader:
+            flight = _flights[(store.name, key)] = Flight(store.name)
+        else:
+            flight.waiters += 1
+            store.coalesced += 1
+
+    if not leader:
+        hook = _wait_hook['hook']
+        with hook(flight) if hook is not None else contextlib.nullcontext():
+            flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    try:
+        # A flight that finished between our miss and registering already stored it
+        value, hit = store.peek(key)
+        if not hit:
+            value = func(*args, **kwargs)
+            if not store.copy:
+                _freeze(value)
+            store.put(key, value)
+        flight.value = value
+        return value
+    except BaseException as exc:
+        flight.error = exc
+        raise
+    finally:
+        with _flights_lock:
+            del _flights[(store.name, key)]
+        flight.done.set()
+
+
+def cached(func=None, **overrides):
+    # Drop-in replacement for @st.cache_data with bounded, accounted storage
+    def decorate(func):
+        policy = {**DEFAULT_POLICY, **POLICIES.get(func.__name__, {}), **overrides}
+        store = LRUCache(func.__name__, **policy)
+        _registry[func.__name__] = store
+
+        def borrow(*args, **kwargs):
+            # The stored value itself, uncopied: for callers that only read a
+            # slice of it and never mutate it
+            key = make_key(args, kwargs)
+            value, hit = store.get(key)
+            if not hit:
+                value = _single_flight(store, key, func, args, kwargs)
+            return value
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            value = borrow(*args, **kwargs)
+            return _copy(value) if store.copy else _share(value)
+
+        def pin(*args, **kwargs):
+            store.pin(make_key(args, kwargs), borrow(*args, **kwargs))
+
+        wrapper.borrow = borrow
+        wrapper.pin = pin
+        wrapper.clear = store.clear
+        wrapper.cache = store
+        return wrapper
+
+    return decorate(func) if func is not None else decorate
+
+
+def stats():
+    return [store.stats() for store in _registry.values()]
+
+
+def clear_all():
+    for store in _registry.values():
+        store.clear()
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+from core.cache import cached
+from core.data import read_dataset, text_batches
+from core.text import hashtags_of
+
+HLL_PRECISION = 14
+EXACT_LIMIT = 50_000
+
+
+def hash_values(values):
+    values = pd.Series(values).dropna().astype(str)
+    return pd.util.hash_array(values.to_numpy(dtype=object))
+
+
+def _bit_length(x):
+    x = x.copy()
+    n = np.zeros(x.shape, dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        mask = x >= (np.uint64(1) << np.uint64(shift))
+        n[mask] += shift
+        x[mask] >>= np.uint64(shift)
+    return n + (x > 0).astype(np.uint8)
+
+
+class HyperLogLog:
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if not len(hashes):
+            return
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.int64)
+        rest = hashes & ((np.uint64(1) << (np.uint64(64) - p)) - np.uint64(1))
+        rank = (64 - self.precision) - _bit_length(rest).astype(np.int64) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        merged = HyperLogLog(self.precision)
+        merged.registers = np.maximum(self.registers, other.registers)
+        return merged
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+class DistinctCounter:
+    # Exact set of hashes for small inputs, switching to HyperLogLog once it
+    # grows past `exact_limit`. Both forms merge with each other.
+    def __init__(self, exact_limit=EXACT_LIMIT, precision=HLL_PRECISION):
+        self.exact_limit = exact_limit
+        self.precision = precision
+        self.exact = set()
+        self.sketch = None
+
+    @property
+    def is_exact(self):
+        return self.sketch is None
+
+    def _promote(self):
+        self.sketch = HyperLogLog(self.precision)
+        self.sketch.add_hashes(np.fromiter(self.exact, dtype=np.uint64, count=len(self.exact)))
+        self.exact = set()
+
+    def add_hashes(self, hashes):
+        if self.sketch is None:
+            self.exact.update(np.asarray(hashes, dtype=np.uint64).tolist())
+            if len(self.exact) > self.exact_limit:
+                self._promote()
+        else:
+            self.sketch.add_hashes(hashes)
+
+    def add(self, values):
+        self.add_hashes(hash_values(values))
+
+    def merge(self, other):
+        merged = DistinctCounter(self.exact_limit, self.precision)
+        if self.is_exact and other.is_exact:
+            merged.add_hashes(list(self.exact | other.exact))
+            return merged
+        merged._promote()
+        for part in (self, other):
+            if part.is_exact:
+                merged.sketch.add_hashes(np.fromiter(part.exact, dtype=np.uint64, count=len(part.exact)))
+            else:
+                merged.sketch = merged.sketch.merge(part.sketch)
+        return merged
+
+    def count(self):
+        return len(self.exact) if self.sketch is None else self.sketch.count()
+
+
+def _daily_counters(dates, values):
+    counters = {}
+    frame = pd.DataFrame({'date': dates, 'value': values}).dropna()
+    for date, group in frame.groupby('date'):
+        counter = DistinctCounter()
+        counter.add(group['value'])
+        counters[date] = counter
+    return counters
+
+
+@cached
+def distinct_index(version):
+    # One mergeable counter per day and field, built in one pass over the snapshot
+    df = read_dataset(version)
+    dates = df['created_at'].dt.date
+
+    words, tags = [], []
+    for texts in text_batches(version):
+        words.append(texts.str.lower().str.split())
+        tags.append(texts.apply(hashtags_of))
+    words, tags = pd.concat(words), pd.concat(tags)
+    word_dates = dates.repeat(words.str.len().fillna(0).astype(int))
+    users = df['username'].where(df['username'].notna(), df['user_id'])
+    tag_dates = dates.repeat(tags.str.len())
+
+    return {
+        'words': _daily_counters(word_dates.to_numpy(), words.explode().dropna().to_numpy()),
+        'users': _daily_counters(dates.to_numpy(), users.to_numpy()),
+        'hashtags': _daily_counters(tag_dates.to_numpy(), tags.explode().dropna().to_numpy()),
+    }
+
+
+def merge_range(counters, start=None, end=None):
+    total = DistinctCounter()
+    for date, counter in counters.items():
+        if (start is None or date >= start) and (end is None or date <= end):
+            total = total.merge(counter)
+    return total
+
+
+@cached
+def count_distinct(version, field, start=None, end=None):
+    return merge_range(distinct_index(version)[field], start, end).count()
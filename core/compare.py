@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+from core.cache import cached
+from core.cardinality import count_distinct
+from core.data import read_dataset
+from core.hashtags import top_hashtags
+from core.postings import SENTIMENTS, row_features, term_index
+
+SUM_COLUMNS = ['tweets', 'likes', 'retweets', 'total_engagement'] + SENTIMENTS
+
+
+@cached
+def daily_buckets(version):
+    # Per-day sums plus per-(day, term) tweet counts; any date range is a
+    # merge of whole buckets instead of a pass over the rows
+    df = read_dataset(version)
+    features = row_features(version)
+    frame = pd.DataFrame({
+        'date': features['date'],
+        'likes': df['favorite_count'].to_numpy(),
+        'retweets': df['retweet_count'].to_numpy(),
+        'total_engagement': features['engagement'],
+    })
+    for label in SENTIMENTS:
+        frame[label] = (features['sentiment'] == label).astype(int)
+    totals = frame.groupby('date').agg(tweets=('likes', 'size'), **{c: (c, 'sum') for c in SUM_COLUMNS[1:]})
+
+    index = term_index(version)
+    terms = np.repeat(index['vocab'].to_numpy(), np.diff(index['row_bounds']))
+    keywords = pd.DataFrame({'date': features['date'].to_numpy()[index['row_order']], 'term': terms})
+    keywords = keywords.groupby(['date', 'term']).size().sort_index()
+    return {'totals': totals, 'keywords': keywords}
+
+
+def merge_period(buckets, start, end):
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    totals = buckets['totals'].loc[start:end]
+    keywords = buckets['keywords'].loc[start:end].groupby(level='term').sum()
+    return totals, keywords
+
+
+@cached
+def period_summary(version, start, end, top_n=15):
+    totals, keywords = merge_period(daily_buckets(version), start, end)
+    summary = totals[SUM_COLUMNS].sum().astype(int).to_dict()
+    days = (pd.Timestamp(end) - pd.Timestamp(start)).days + 1
+    summary.update({
+        'start': start,
+        'end': end,
+        'days': days,
+        'per_day': summary['tweets'] / days,
+        'avg_engagement': summary['total_engagement'] / summary['tweets'] if summary['tweets'] else 0.0,
+        'users': count_distinct(version, 'users', start, end),
+        # Zero-filled so day offsets line up when the periods are overlaid
+        'daily': totals['tweets'].reindex(pd.date_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize(),
+                                                        name='date'), fill_value=0),
+        'keywords': keywords.nlargest(top_n),
+        'keyword_counts': keywords,
+        'hashtags': top_hashtags(version, by='tweets', n=top_n, start=start, end=end),
+    })
+    for label in SENTIMENTS:
+        summary[f'{label}_share'] = summary[label] / summary['tweets'] if summary['tweets'] else 0.0
+    return summary
+
+
+def compare_periods(version, period_a, period_b, top_n=15):
+    # Two range merges; each side is cached on its own, so moving one range
+    # leaves the other warm
+    return period_summary(version, *period_a, top_n=top_n), period_summary(version, *period_b, top_n=top_n)
+
+
+def keyword_deltas(a, b, top_n=15):
+    terms = a['keywords'].index.union(b['keywords'].index)
+    table = pd.DataFrame({
+        'A': a['keyword_counts'].reindex(terms, fill_value=0),
+        'B': b['keyword_counts'].reindex(terms, fill_value=0),
+    })
+    # Per-day rates so periods of different length compare fairly
+    table['A / hari'] = table['A'] / a['days']
+    table['B / hari'] = table['B'] / b['days']
+    table['Perubahan'] = table['B / hari'] - table['A / hari']
+    return table.reindex(table[['A', 'B']].max(axis=1).sort_values(ascending=False).index).head(top_n)
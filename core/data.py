@@ -0,0 +1,196 @@
+import hashlib
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from core import ingest, partitions, sampling, sources, textstore
+from core.cache import cached
+
+ROOT = Path(__file__).resolve().parent.parent
+DATASET_PATH = Path(os.environ.get('DASHBOARD_DATASET', ROOT / 'dataset.csv'))
+
+PERIOD_START = '2025-09-01'
+PERIOD_END = '2025-11-30'
+
+# Keep serving the last fully warmed snapshot while a changed dataset.csv is
+# recomputed in the background; set to 0 to always read the file on disk
+STALE_WHILE_REVALIDATE = os.environ.get('DASHBOARD_STALE_WHILE_REVALIDATE', '1') != '0'
+
+_lock = threading.Lock()
+_active = {'version': None, 'activated_at': None}
+
+
+def dataset_files():
+    # With month partitions present only the months inside the period are read
+    if partitions.is_partitioned():
+        return partitions.partitions_for(PERIOD_START, PERIOD_END)
+    if sources.is_multi_source():
+        return sources.source_files()
+    return [DATASET_PATH]
+
+
+def dataset_version():
+    # Cheap fingerprint of the files backing the period; the leading part is
+    # the newest modification time so the sidebar can show it
+    stats = []
+    for path in dataset_files():
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        stats.append((path.name, stat.st_mtime_ns, stat.st_size))
+    if not stats:
+        return 'missing'
+    digest = hashlib.blake2b(repr(stats).encode(), digest_size=6).hexdigest()
+    return f"{max(s[1] for s in stats):x}-{digest}"
+
+
+# `version` is only the cache key: the files on disk are always what gets read,
+# so a stale snapshot is served from its cached entry (the served one is pinned
+# by activate), never re-read
+@cached
+def read_dataset(version):
+    if version != dataset_version():
+        # The files on disk already belong to a newer snapshot; reading them now
+        # would label their rows with the old version
+        raise RuntimeError(f"snapshot {version} is no longer cached and its source files have changed")
+    if partitions.is_partitioned():
+        df = partitions.load_range(PERIOD_START, PERIOD_END)
+    elif sources.is_multi_source():
+        df = sources.load_sources()
+    else:
+        df = ingest.read_csv(DATASET_PATH)
+    df['created_at'] = pd.to_datetime(df['created_at'])
+    df = df[(df['created_at'] >= PERIOD_START) & (df['created_at'] <= PERIOD_END)]
+    # Tweet text moves to the snapshot's memory-mapped heap, so the frame
+    # every page copies carries no wide string columns
+    textstore.build(version, df)
+    df = df.drop(columns=[column for column in textstore.TEXT_COLUMNS if column in df.columns])
+    sampling.build(version, df)
+    return df
+
+
+@cached
+def text_heap(version):
+    read_dataset(version)
+    return textstore.TextHeap(textstore.heap_path(version))
+
+
+def snapshot_rows(positions, version=None):
+    # Rows at the given positions, taken from the cached snapshot without the
+    # full copy load_data() makes
+    return read_dataset.borrow(version or served_version()).iloc[positions]
+
+
+def load_texts(df, column='full_text', version=None):
+    # Text only for the rows of df, e.g. the ones a table displays
+    return text_heap(version or served_version()).get(column, df.index)
+
+
+def with_text_columns(df, version=None):
+    # Rows of df with every heap column read back, in the source files' column
+    # order; columns df already has (e.g. from the SQL backend) are kept
+    heap = text_heap(version or served_version())
+    df = df.assign(**{column: heap.get(column, df.index)
+                      for column in heap.columns if column not in df.columns})
+    order = [column for column in heap.source_columns if column in df.columns]
+    return df[order + [column for column in df.columns if column not in order]]
+
+
+def text_batches(version, column='full_text', ids=None):
+    return text_heap(version).batches(column, ids)
+
+
+@cached
+def source_aggregates(version):
+    return sources.source_summary(read_dataset(version))
+
+
+@cached
+def source_overlap(version):
+    # Tweets more than one query found
+    df = read_dataset.borrow(version)
+    if 'sources' not in df.columns:
+        return 0
+    return int(df['sources'].str.contains('|', regex=False).sum())
+
+
+@cached
+def snapshot_span(version):
+    # First and last tweet time, for pages that only have the sample loaded
+    created = read_dataset.borrow(version)['created_at']
+    return created.min(), created.max()
+
+
+@cached
+def append_delta(previous, version):
+    old, new = read_dataset(previous), read_dataset(version)
+    if list(old.columns) != list(new.columns) or not new['id'].is_unique:
+        return None
+    positions = pd.Index(new['id']).get_indexer(old['id'])
+    if (positions < 0).any():
+        return None
+    # `sources` grows when a new query also finds an old tweet; the tweet itself is unchanged
+    columns = [column for column in old.columns if column != 'sources']
+    before = pd.util.hash_pandas_object(old[columns], index=False).to_numpy()
+    after = pd.util.hash_pandas_object(new[columns].iloc[positions], index=False).to_numpy()
+    if not np.array_equal(before, after):
+        return None
+    added = np.ones(len(new), dtype=bool)
+    added[positions] = False
+    return {'version': previous, 'positions': positions, 'added': np.flatnonzero(added)}
+
+
+def appended_rows(version):
+    # How `version` extends the served snapshot when a new crawl (a source file
+    # or month partition) only added tweets: the served version, the new row
+    # position of each of its rows, and the positions of the added rows. None
+    # when nothing is served yet or earlier rows changed; indexes then rebuild
+    with _lock:
+        previous = _active['version']
+    if previous is None or previous == version:
+        return None
+    try:
+        return append_delta(previous, version)
+    except RuntimeError:
+        # One of the two snapshots can no longer be read
+        return None
+
+
+def activate(version):
+    # Swap the served snapshot in one step once all its caches are warm. Its
+    # frame is pinned outside the LRU, so it is never re-read from files that
+    # may have changed since, even if it exceeds the read_dataset budget
+    read_dataset.pin(version)
+    with _lock:
+        _active['version'] = version
+        _active['activated_at'] = datetime.now()
+
+
+def served_version():
+    if STALE_WHILE_REVALIDATE:
+        with _lock:
+            if _active['version'] is not None:
+                return _active['version']
+    return dataset_version()
+
+
+def snapshot_info():
+    with _lock:
+        active = dict(_active)
+    version = served_version()
+    mtime_ns = int(version.split('-')[0], 16) if version != 'missing' else None
+    return {
+        'version': version,
+        'modified_at': datetime.fromtimestamp(mtime_ns / 1e9) if mtime_ns else None,
+        'activated_at': active['activated_at'],
+        'pending': version != dataset_version(),
+    }
+
+
+def load_data():
+    return read_dataset(served_version())
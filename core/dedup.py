@@ -0,0 +1,134 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from core.cache import cached
+from core.data import read_dataset, text_batches
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+# Estimated Jaccard a bucket candidate must reach to be merged into a cluster
+SIMILARITY = 0.7
+
+_NOISE_RE = re.compile(r'http\S+|www\S+|@\S+')
+_WORD_RE = re.compile(r'\w+')
+
+_rng = np.random.default_rng(20250901)
+_SEEDS = _rng.integers(1, 2**63, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+_BAND_MIX = (_rng.integers(1, 2**63, size=ROWS, dtype=np.int64).astype(np.uint64) | np.uint64(1))
+
+
+def shingles(text):
+    if pd.isna(text):
+        return []
+    words = _WORD_RE.findall(_NOISE_RE.sub('', str(text).lower()))
+    if len(words) < SHINGLE_SIZE:
+        return [' '.join(words)] if words else []
+    return [' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+
+
+def _mix(x):
+    # splitmix64 finaliser; wraps in uint64 so each seed acts as a permutation
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def minhash_signatures(texts, chunk_size=20_000):
+    texts = list(texts)
+    signatures = np.full((len(texts), NUM_PERM), np.iinfo(np.uint64).max, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for start in range(0, len(texts), chunk_size):
+            chunk = [shingles(t) for t in texts[start:start + chunk_size]]
+            lengths = np.array([len(s) for s in chunk])
+            flat = [s for row in chunk for s in row]
+            if not flat:
+                continue
+            hashes = pd.util.hash_array(np.array(flat, dtype=object))
+            rows = np.flatnonzero(lengths) + start
+            offsets = np.concatenate([[0], np.cumsum(lengths[lengths > 0])[:-1]])
+            # One permutation at a time: a (shingles x NUM_PERM) block would
+            # be hundreds of MB per chunk
+            for p, seed in enumerate(_SEEDS):
+                signatures[rows, p] = np.minimum.reduceat(_mix(hashes ^ seed), offsets)
+    return signatures
+
+
+def band_keys(signatures):
+    with np.errstate(over='ignore'):
+        bands = signatures.reshape(len(signatures), BANDS, ROWS)
+        return (bands * _BAND_MIX).sum(axis=2, dtype=np.uint64)
+
+
+class NearDuplicateIndex:
+    # Incremental MinHash-LSH: each added tweet is looked up in the band
+    # tables and merged (union-find) with any candidate similar enough
+    def __init__(self):
+        self.signatures = np.empty((0, NUM_PERM), dtype=np.uint64)
+        self.tables = [{} for _ in range(BANDS)]
+        self.parent = []
+
+    def __len__(self):
+        return len(self.parent)
+
+    def _find(self, i):
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def _union(self, a, b):
+        ra, rb = self._find(a), self._find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+    def add(self, texts):
+        new = minhash_signatures(texts)
+        offset = len(self.parent)
+        self.signatures = np.vstack([self.signatures, new])
+        self.parent.extend(range(offset, offset + len(new)))
+        keys = band_keys(new)
+        # Tweets with no words left (bare links) have nothing to compare on
+        empty = (new == np.iinfo(np.uint64).max).all(axis=1)
+        for row in np.flatnonzero(~empty):
+            i = offset + int(row)
+            for band in range(BANDS):
+                key = int(keys[row, band])
+                table = self.tables[band]
+                other = table.get(key)
+                if other is None:
+                    table[key] = i
+                elif self._find(other) != self._find(i):
+                    if np.mean(self.signatures[other] == self.signatures[i]) >= SIMILARITY:
+                        self._union(other, i)
+
+    def clusters(self):
+        roots = np.array([self._find(i) for i in range(len(self.parent))], dtype=np.int64)
+        _, dense = np.unique(roots, return_inverse=True)
+        return dense
+
+
+@cached
+def near_duplicate_clusters(version):
+    df = read_dataset(version).sort_values('created_at', kind='stable')
+    index = NearDuplicateIndex()
+    for texts in text_batches(version, ids=df.index):
+        index.add(texts)
+    clusters = pd.DataFrame({'cluster': index.clusters()}, index=df.index)
+    clusters['cluster_size'] = clusters.groupby('cluster')['cluster'].transform('size')
+    # The earliest tweet of each cluster, the one collapsing keeps; lets a
+    # sample of the snapshot be collapsed the same way
+    clusters['representative'] = ~clusters['cluster'].duplicated()
+    return clusters.loc[read_dataset(version).index]
+
+
+def collapse_near_duplicates(df, clusters):
+    # Keep the earliest tweet of each near-duplicate cluster
+    clusters = clusters.reindex(df.index)
+    earliest = df['created_at'].groupby(clusters['cluster']).idxmin()
+    return df.loc[df.index.isin(earliest.values)]
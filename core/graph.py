@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+
+from core.cache import cached
+from core.data import read_dataset, text_batches
+
+
+class CSRGraph:
+    # Directed, weighted user graph in compressed sparse row form
+    def __init__(self, names, src, dst, weight=None):
+        self.names = np.asarray(names, dtype=object)
+        n = len(self.names)
+        weight = np.ones(len(src), dtype=np.int64) if weight is None else np.asarray(weight, dtype=np.int64)
+        order = np.lexsort((dst, src))
+        self.indices = np.asarray(dst, dtype=np.int64)[order]
+        self.weights = weight[order]
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=self.indptr[1:])
+
+    @property
+    def num_nodes(self):
+        return len(self.names)
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    def sources(self):
+        return np.repeat(np.arange(self.num_nodes), np.diff(self.indptr))
+
+    def in_degree(self, weighted=True):
+        return np.bincount(self.indices, weights=self.weights if weighted else None,
+                           minlength=self.num_nodes).astype(np.int64)
+
+    def components(self):
+        # Weakly connected components by min-label propagation with pointer jumping
+        src, dst = self.sources(), self.indices
+        labels = np.arange(self.num_nodes)
+        while True:
+            previous = labels.copy()
+            np.minimum.at(labels, src, labels[dst])
+            np.minimum.at(labels, dst, labels[src])
+            labels = labels[labels]
+            if np.array_equal(labels, previous):
+                return labels
+
+
+def _user_edges(src_names, dst_names):
+    src_names = pd.Series(src_names, dtype=object).str.lower()
+    dst_names = pd.Series(dst_names, dtype=object).str.lower()
+    keep = src_names.notna() & dst_names.notna() & (src_names != dst_names)
+    return src_names[keep].to_numpy(), dst_names[keep].to_numpy()
+
+
+def build_user_graph(df, texts):
+    # `texts` yields the tweets' text in batches indexed like df
+    reply_src, reply_dst = _user_edges(df['username'], df['in_reply_to_screen_name'])
+    batches = [batch.str.extractall(r'@(\w+)')[0] for batch in texts]
+    # An empty snapshot yields no batches at all
+    mentions = pd.concat(batches) if batches else pd.Series(dtype=object)
+    mention_src, mention_dst = _user_edges(df['username'].loc[mentions.index.get_level_values(0)].to_numpy(),
+                                           mentions.to_numpy())
+
+    codes, names = pd.factorize(np.concatenate([reply_src, reply_dst, mention_src, mention_dst]))
+    r, m = len(reply_src), len(mention_src)
+    pairs = pd.DataFrame({'src': np.concatenate([codes[:r], codes[2 * r:2 * r + m]]),
+                          'dst': np.concatenate([codes[r:2 * r], codes[2 * r + m:]])})
+    reply = pairs.iloc[:r].value_counts().reset_index(name='weight')
+    mention = pairs.iloc[r:].value_counts().reset_index(name='weight')
+    return {
+        'reply': CSRGraph(names, reply['src'].to_numpy(), reply['dst'].to_numpy(), reply['weight'].to_numpy()),
+        'mention': CSRGraph(names, mention['src'].to_numpy(), mention['dst'].to_numpy(), mention['weight'].to_numpy()),
+    }
+
+
+def cascade_depths(df):
+    # Nodes are (conversation, user) pairs; a reply points at the replied-to
+    # user in the same conversation. Depth is the longest reply chain below a
+    # node, filled in topological order from users who reply to nobody inside
+    # the thread: a node is ready once all its targets are done (Kahn) and
+    # takes one more than the deepest of them. Reply cycles (A and B answering
+    # each other) are broken by releasing one node of each cycle.
+    conv = df['conversation_id'].to_numpy()
+    user = df['username'].str.lower().fillna('')
+    target = df['in_reply_to_screen_name'].str.lower()
+    is_reply = target.notna().to_numpy() & (user.to_numpy() != target.fillna('').to_numpy())
+
+    node_keys = pd.MultiIndex.from_arrays([np.concatenate([conv, conv[is_reply]]),
+                                           np.concatenate([user.to_numpy(), target[is_reply].to_numpy()])])
+    codes, uniques = pd.factorize(node_keys)
+    src = codes[:len(df)][is_reply]
+    dst = codes[len(df):]
+
+    n = len(uniques)
+    depth = np.full(n, -1, dtype=np.int64)
+    below = np.zeros(n, dtype=np.int64)
+    pending = np.bincount(src, minlength=n)
+    ready = pending == 0
+    while True:
+        if not ready.any():
+            left = depth < 0
+            if not left.any():
+                break
+            # Every stuck node waits on a stuck target; following one such
+            # target from each ends on a cycle, whose lowest node is released
+            stuck = left[src] & left[dst]
+            step, lowest = np.arange(n), np.arange(n)
+            step[src[stuck]] = dst[stuck]
+            for _ in range(n.bit_length()):
+                lowest = np.minimum(lowest, lowest[step])
+                step = step[step]
+            ready = np.zeros(n, dtype=bool)
+            ready[step[left]] = True
+            ready &= lowest == np.arange(n)
+        depth[ready] = below[ready]
+        done = ready[dst]
+        np.maximum.at(below, src[done], depth[dst[done]] + 1)
+        pending -= np.bincount(src[done], minlength=n)
+        ready = (pending == 0) & (depth < 0)
+
+    node_conv = uniques.get_level_values(0).to_numpy()
+    return pd.Series(depth, index=node_conv).groupby(level=0).max()
+
+
+@cached
+def conversation_graph(version):
+    df = read_dataset(version)
+    graphs = build_user_graph(df, text_batches(version))
+    reply = graphs['reply']
+
+    threads = df.groupby('conversation_id').agg(
+        tweets=('id', 'size'),
+        replies=('in_reply_to_screen_name', 'count'),
+        platform_replies=('reply_count', 'sum'),
+        quotes=('quote_count', 'sum'),
+    )
+    threads['depth'] = cascade_depths(df).reindex(threads.index).fillna(0).astype(int)
+    threads = threads.sort_values(['tweets', 'platform_replies'], ascending=False).reset_index()
+
+    received = pd.DataFrame({'username': reply.names, 'replies_received': reply.in_degree()})
+    own_replies = df.assign(username=df['username'].str.lower()).groupby('username')['reply_count'].sum()
+    received['reply_count'] = received['username'].map(own_replies).fillna(0).astype(int)
+    top_replied = received.sort_values(['replies_received', 'reply_count'], ascending=False).head(15)
+
+    combined = CSRGraph(reply.names,
+                        np.concatenate([reply.sources(), graphs['mention'].sources()]),
+                        np.concatenate([reply.indices, graphs['mention'].indices]))
+    labels = combined.components()
+    component_sizes = np.sort(np.bincount(labels)[np.unique(labels)])[::-1]
+
+    return {
+        'threads': threads,
+        'top_replied': top_replied.reset_index(drop=True),
+        'component_sizes': component_sizes,
+        'stats': {
+            'users': reply.num_nodes,
+            'reply_edges': reply.num_edges,
+            'mention_edges': graphs['mention'].num_edges,
+            'components': len(component_sizes),
+        },
+    }
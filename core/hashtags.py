@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+from core.cache import cached
+from core.data import appended_rows, read_dataset, text_batches
+from core.text import HASHTAG_RE
+
+
+def explode_hashtags(texts):
+    # One (row position, hashtag) pair per distinct tag in a tweet, with how
+    # often the tweet uses it; `texts` are batches of the text column in row order
+    batches = [batch.str.findall(HASHTAG_RE) for batch in texts]
+    # An empty snapshot (or crawl) yields no batches at all
+    tags = pd.concat(batches, ignore_index=True) if batches else pd.Series(dtype=object)
+    tags = tags.explode().dropna().str.lower()
+    pairs = pd.DataFrame({'row': tags.index.to_numpy(), 'hashtag': tags.to_numpy()})
+    return pairs.groupby(['row', 'hashtag'], sort=False).size().reset_index(name='uses')
+
+
+def aggregate_hashtags(df, pairs):
+    # hashtag x day table of sums: `uses` counts every occurrence, `tweets`
+    # the tweets carrying the tag
+    rows = df.iloc[pairs['row']]
+    frame = pd.DataFrame({
+        'hashtag': pairs['hashtag'].to_numpy(),
+        'uses': pairs['uses'].to_numpy(),
+        'date': rows['created_at'].dt.normalize().to_numpy(),
+        'likes': rows['favorite_count'].to_numpy(),
+        'retweets': rows['retweet_count'].to_numpy(),
+    })
+    frame['total_engagement'] = frame['likes'] + frame['retweets']
+    daily = frame.groupby(['hashtag', 'date']).agg(
+        uses=('uses', 'sum'),
+        tweets=('likes', 'size'),
+        likes=('likes', 'sum'),
+        retweets=('retweets', 'sum'),
+        total_engagement=('total_engagement', 'sum'),
+    )
+    return daily.sort_index()
+
+
+def merge_hashtags(old, new):
+    # Fold the daily table of a new crawl into an existing one
+    return pd.concat([old, new]).groupby(level=['hashtag', 'date']).sum().sort_index()
+
+
+@cached
+def hashtag_index(version):
+    df = read_dataset(version)
+    delta = appended_rows(version)
+    if delta is None:
+        pairs = explode_hashtags(text_batches(version))
+        daily = aggregate_hashtags(df, pairs)
+        rows, hashtags = pairs['row'].to_numpy(), pairs['hashtag'].to_numpy()
+    else:
+        # A crawl that only added tweets: only their text is read, and the
+        # served snapshot's table and posting lists are carried over
+        previous = hashtag_index(delta['version'])
+        pairs = explode_hashtags(text_batches(version, ids=df.index[delta['added']]))
+        pairs['row'] = delta['added'][pairs['row'].to_numpy()]
+        daily = merge_hashtags(previous['daily'], aggregate_hashtags(df, pairs))
+        rows = np.concatenate([delta['positions'][previous['row_order']], pairs['row'].to_numpy()])
+        hashtags = np.concatenate([np.repeat(previous['tags'].to_numpy(), np.diff(previous['row_bounds'])),
+                                   pairs['hashtag'].to_numpy()])
+    # Posting list: row positions per hashtag, grouped by a stable sort
+    order = np.argsort(hashtags, kind='stable')
+    tags = daily.index.get_level_values('hashtag').unique()
+    bounds = np.searchsorted(hashtags[order], tags.to_numpy(), side='left')
+    return {
+        'daily': daily,
+        'tags': tags,
+        'row_order': rows[order],
+        'row_bounds': np.append(bounds, len(order)),
+    }
+
+
+def hashtag_totals(index, start=None, end=None):
+    daily = index['daily']
+    if start is not None or end is not None:
+        dates = daily.index.get_level_values('date')
+        mask = np.ones(len(daily), dtype=bool)
+        if start is not None:
+            mask = mask & (dates >= pd.Timestamp(start))
+        if end is not None:
+            mask = mask & (dates <= pd.Timestamp(end))
+        daily = daily[mask]
+    totals = daily.groupby(level='hashtag').sum()
+    totals['avg_engagement'] = totals['total_engagement'] / totals['tweets']
+    return totals
+
+
+@cached
+def top_hashtags(version, by='uses', n=15, start=None, end=None):
+    totals = hashtag_totals(hashtag_index(version), start, end)
+    return totals.nlargest(n, [by, 'tweets']).reset_index()
+
+
+def hashtag_daily(index, hashtag):
+    return index['daily'].xs(hashtag, level='hashtag')
+
+
+def hashtag_rows(index, hashtag):
+    position = index['tags'].get_loc(hashtag)
+    return np.sort(index['row_order'][index['row_bounds'][position]:index['row_bounds'][position + 1]])
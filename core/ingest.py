@@ -0,0 +1,145 @@
+import argparse
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from core.sources import INGEST_WORKERS
+
+ROOT = Path(__file__).resolve().parent.parent
+CHECKPOINT_DIR = Path(os.environ.get('DASHBOARD_CHECKPOINT_DIR', ROOT / '.ingest'))
+CHUNK_BYTES = 32 * 1024 * 1024
+# Files smaller than this are read with a single pd.read_csv
+PARALLEL_MIN_BYTES = int(float(os.environ.get('DASHBOARD_PARALLEL_CSV_MB', 128)) * 1024 * 1024)
+SCAN_BYTES = 8 * 1024 * 1024
+
+
+def record_boundaries(path, chunk_bytes=CHUNK_BYTES):
+    # Byte offsets that start a record. Quoted fields may span lines, so a
+    # newline only ends a record when the number of quotes seen so far is
+    # even (RFC 4180 escapes a quote by doubling it, which keeps parity)
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.readline()
+        position = f.tell()
+        bounds = [position]
+        odd = False
+        while position + chunk_bytes < size:
+            target = position + chunk_bytes
+            while position < target:
+                block = f.read(min(SCAN_BYTES, target - position))
+                odd ^= block.count(b'"') % 2 == 1
+                position += len(block)
+            while True:
+                line = f.readline()
+                if not line:
+                    break
+                odd ^= line.count(b'"') % 2 == 1
+                position += len(line)
+                if not odd:
+                    break
+            if position >= size:
+                break
+            bounds.append(position)
+    return header, bounds + [size]
+
+
+def parse_range(path, header, start, end, output):
+    # Runs in a worker: parse one byte range and checkpoint it atomically
+    with open(path, 'rb') as f:
+        f.seek(start)
+        body = f.read(end - start)
+    chunk = pd.read_csv(io.BytesIO(header + body))
+    tmp = Path(f"{output}.tmp")
+    chunk.to_pickle(tmp)
+    os.replace(tmp, output)
+    return output
+
+
+def fingerprint(path):
+    stat = os.stat(path)
+    key = f"{Path(path).resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+
+def _unify(chunks):
+    # Chunk-local dtype inference can differ from a whole-file read: a text
+    # column that is empty in one chunk parses as float there
+    frame = pd.concat(chunks, ignore_index=True)
+    for column in frame.columns:
+        kinds = {str(chunk[column].dtype) for chunk in chunks}
+        if len(kinds) > 1 and 'str' in kinds:
+            frame[column] = frame[column].astype('str')
+    return frame
+
+
+def parallel_read_csv(path, workers=INGEST_WORKERS, chunk_bytes=CHUNK_BYTES, checkpoint_dir=CHECKPOINT_DIR,
+                      keep_checkpoints=False):
+    # Checkpoints are keyed by the file's size and mtime; an interrupted run
+    # resumes with the chunks that already finished
+    path = Path(path)
+    directory = checkpoint_dir / f"{path.stem}-{fingerprint(path)}"
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = directory / 'manifest.json'
+    if manifest.exists():
+        plan = json.loads(manifest.read_text())
+        header = plan['header'].encode('utf-8')
+        bounds = plan['bounds']
+    else:
+        header, bounds = record_boundaries(path, chunk_bytes)
+        manifest.write_text(json.dumps({'header': header.decode('utf-8'), 'bounds': bounds}))
+
+    outputs = [directory / f"chunk-{i:05d}.pkl" for i in range(len(bounds) - 1)]
+    pending = [(path, header, bounds[i], bounds[i + 1], outputs[i])
+               for i in range(len(outputs)) if not outputs[i].exists()]
+    if pending:
+        if min(workers, len(pending)) <= 1:
+            for job in pending:
+                parse_range(*job)
+        else:
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=min(workers, len(pending)), mp_context=context) as pool:
+                list(pool.map(parse_range, *zip(*pending)))
+
+    frame = _unify([pd.read_pickle(output) for output in outputs])
+    if not keep_checkpoints:
+        shutil.rmtree(directory, ignore_errors=True)
+    return frame
+
+
+def read_csv(path, workers=INGEST_WORKERS):
+    if workers > 1 and os.path.getsize(path) >= PARALLEL_MIN_BYTES:
+        return parallel_read_csv(path, workers)
+    return pd.read_csv(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse a large crawl CSV in parallel byte ranges")
+    parser.add_argument('source', nargs='?', default=str(ROOT / 'dataset.csv'))
+    parser.add_argument('--workers', type=int, default=INGEST_WORKERS)
+    parser.add_argument('--chunk-mb', type=float, default=CHUNK_BYTES / 1024 / 1024)
+    parser.add_argument('--keep-checkpoints', action='store_true')
+    parser.add_argument('--verify', action='store_true', help="compare against a single pd.read_csv")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    frame = parallel_read_csv(args.source, args.workers, int(args.chunk_mb * 1024 * 1024),
+                              keep_checkpoints=args.keep_checkpoints)
+    print(f"{len(frame):,} rows in {time.perf_counter() - started:.2f}s with {args.workers} worker(s)")
+    if args.verify:
+        started = time.perf_counter()
+        expected = pd.read_csv(args.source)
+        print(f"pd.read_csv: {time.perf_counter() - started:.2f}s")
+        pd.testing.assert_frame_equal(frame, expected)
+        print("identical")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+import argparse
+import contextlib
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+PAGES = ['🏠_Beranda.py'] + sorted(p.relative_to(ROOT).as_posix() for p in (ROOT / 'pages').glob('*.py'))
+PERIOD = ('2025-09-01', '2025-11-30 23:59:59')
+# share_runtime patches private AppTest internals; written against this
+# Streamlit release and checked before patching
+SHARED_RUNTIME_STREAMLIT = '1.66'
+
+
+def _selectbox(label, value):
+    def step(at):
+        next(w for w in at.selectbox if w.label == label).set_value(value).run()
+    return step
+
+
+def _slider(label, value):
+    def step(at):
+        next(w for w in at.slider if w.label == label).set_value(value).run()
+    return step
+
+
+def _text_input(label, value):
+    def step(at):
+        next(w for w in at.text_input if w.label == label).input(value).run()
+    return step
+
+
+# Widget interactions replayed by every session after the first render
+INTERACTIONS = {
+    'pages/1_📊_Tren.py': [
+        ('ma_window=3', _selectbox("Window MA:", 3)),
+        ('ma_window=14', _selectbox("Window MA:", 14)),
+    ],
+    'pages/3_🔤_Kata_Kunci.py': [
+        ('trend_baseline=3', _selectbox("Baseline (jumlah window):", 3)),
+    ],
+    'pages/4_💬_Engagement.py': [
+        ('leaderboard=avg_engagement', _selectbox("Urutkan berdasarkan:", 'Rata-rata Engagement')),
+    ],
+    'pages/5_🗂️_Dataset.py': [
+        ('search=malware', _text_input("🔎 Cari kata kunci dalam tweet:", 'malware')),
+        ('min_engagement=10', _slider("📊 Minimum total engagement (likes + retweets):", 10)),
+        ('search=worm', _text_input("🔎 Cari kata kunci dalam tweet:", 'worm')),
+    ],
+}
+
+
+def synthesize(rows, path, source=ROOT / 'dataset.csv', seed=0):
+    # Bootstrap real tweets so text statistics stay realistic, then spread
+    # them over the period with fresh ids and jittered engagement
+    rng = np.random.default_rng(seed)
+    base = pd.read_csv(source)
+    df = base.iloc[rng.integers(0, len(base), rows)].reset_index(drop=True)
+    start, end = (pd.Timestamp(t).value // 10**9 for t in PERIOD)
+    stamps = pd.to_datetime(np.sort(rng.integers(start, end, rows)), unit='s')
+    df['created_at'] = stamps.strftime('%Y-%m-%d %H:%M:%S')
+    df['id'] = np.arange(rows, dtype=np.int64) + 2_000_000_000_000_000_000
+    df['conversation_id'] = np.where(rng.random(rows) < 0.8, df['id'], df['id'] - rng.integers(1, 1000, rows))
+    for column in ['favorite_count', 'retweet_count', 'reply_count']:
+        df[column] = rng.poisson(df[column].clip(lower=0) + 0.5)
+    df.to_csv(path, index=False)
+    return path
+
+
+def rss_bytes():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def cache_totals():
+    from core import cache
+    totals = {'hits': 0, 'misses': 0, 'evictions': 0, 'bytes': 0}
+    for entry in cache.stats():
+        for key in totals:
+            totals[key] += entry[key]
+    return totals
+
+
+@contextlib.contextmanager
+def share_runtime():
+    # A real server has one Runtime and one ScriptCache for every session.
+    # AppTest swaps a global mock runtime in and out around each run and
+    # compiles the page afresh, which breaks when runs overlap, so pin shared
+    # instances while concurrent sessions run and restore AppTest afterwards.
+    # This reaches into private Streamlit modules: Runtime._instance,
+    # app_test.Runtime/ScriptCache and local_script_runner.ScriptCache.
+    import streamlit
+    if not streamlit.__version__.startswith(SHARED_RUNTIME_STREAMLIT + '.'):
+        raise SystemExit(f"concurrent sessions need Streamlit {SHARED_RUNTIME_STREAMLIT}.x "
+                         f"(found {streamlit.__version__}); run with --sessions 1")
+    from unittest.mock import MagicMock
+
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.dataframe_source_manager import DataframeSourceManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage('/mock/media'))
+    runtime.dataframe_source_mgr = DataframeSourceManager()
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    saved = (Runtime._instance, app_test.Runtime, app_test.ScriptCache, local_script_runner.ScriptCache)
+    shared = ScriptCache()
+    Runtime._instance = runtime
+    app_test.Runtime = type('PerRunRuntime', (Runtime,), {})
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: shared
+    try:
+        yield
+    finally:
+        Runtime._instance, app_test.Runtime, app_test.ScriptCache, local_script_runner.ScriptCache = saved
+
+
+def run_session(page, timeout):
+    from streamlit.testing.v1 import AppTest
+    samples = []
+    at = AppTest.from_file(str(ROOT / page), default_timeout=timeout)
+    steps = [('render', lambda at: at.run())] + INTERACTIONS.get(page, [])
+    for name, step in steps:
+        started = time.perf_counter()
+        error = None
+        try:
+            step(at)
+            if at.exception:
+                error = at.exception[0].message
+        except Exception as exc:
+            error = repr(exc)
+        samples.append({'page': page, 'step': name, 'seconds': time.perf_counter() - started,
+                        'error': error, 'rss': rss_bytes()})
+        if error:
+            break
+    return samples
+
+
+def run_page(page, sessions, iterations, timeout):
+    # All sessions hammer one page at a time so cache deltas are attributable
+    before = cache_totals()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        futures = [pool.submit(run_session, page, timeout) for _ in range(sessions * iterations)]
+        samples = [s for f in futures for s in f.result()]
+    after = cache_totals()
+    latencies = np.array([s['seconds'] for s in samples])
+    delta = {key: after[key] - before[key] for key in after}
+    calls = delta['hits'] + delta['misses']
+    return {
+        'page': page,
+        'reruns': len(samples),
+        'errors': sorted({s['error'] for s in samples if s['error']}),
+        'p50': float(np.percentile(latencies, 50)),
+        'p95': float(np.percentile(latencies, 95)),
+        'p99': float(np.percentile(latencies, 99)),
+        'max': float(latencies.max()),
+        'peak_rss': max(s['rss'] for s in samples),
+        'cache_hits': delta['hits'],
+        'cache_misses': delta['misses'],
+        'cache_hit_rate': delta['hits'] / calls if calls else 0.0,
+        'cache_evictions': delta['evictions'],
+        'cache_bytes': after['bytes'],
+    }
+
+
+def print_report(report):
+    header = f"{'page':<28}{'reruns':>7}{'p50':>8}{'p95':>8}{'p99':>8}{'rss MB':>9}{'hit%':>7}{'miss':>6}{'evict':>7}"
+    print(header)
+    print('-' * len(header))
+    for row in report['pages']:
+        print(f"{Path(row['page']).stem[:27]:<28}{row['reruns']:>7}{row['p50']:>8.2f}{row['p95']:>8.2f}"
+              f"{row['p99']:>8.2f}{row['peak_rss'] / 2**20:>9.0f}{100 * row['cache_hit_rate']:>6.0f}%"
+              f"{row['cache_misses']:>6}{row['cache_evictions']:>7}")
+        for error in row['errors']:
+            print(f"  ! {error}")
+    print(f"\nrows={report['rows']} sessions={report['sessions']} warm={report['warm']} "
+          f"peak RSS {report['peak_rss'] / 2**20:.0f} MB, wall {report['wall_seconds']:.1f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive the dashboard pages from many concurrent sessions")
+    parser.add_argument('--rows', type=int, default=20_000, help="synthetic dataset size (0 = use dataset.csv)")
+    parser.add_argument('--sessions', type=int, default=20, help="concurrent sessions per page")
+    parser.add_argument('--iterations', type=int, default=1, help="session batches per page")
+    parser.add_argument('--pages', nargs='*', default=PAGES)
+    parser.add_argument('--warm', action='store_true', help="wait for the cache warm-up before measuring")
+    parser.add_argument('--timeout', type=float, default=300)
+    parser.add_argument('--json', help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.TemporaryDirectory(prefix='loadtest-')
+    if args.rows:
+        os.environ['DASHBOARD_DATASET'] = str(synthesize(args.rows, Path(workdir.name) / 'dataset.csv'))
+        os.environ['DASHBOARD_PARTITION_DIR'] = str(Path(workdir.name) / 'partitions')
+    os.environ.setdefault('DASHBOARD_BACKEND', 'pandas')
+
+    # Imported only now so core.data picks up the synthetic dataset path
+    sys.path.insert(0, str(ROOT))
+    os.chdir(ROOT)
+    from core import warmup
+    if args.warm:
+        warmup.ensure_started()
+        while not warmup.is_ready():
+            if warmup.status()['error']:
+                raise SystemExit(f"warm-up failed: {warmup.status()['error']}")
+            time.sleep(0.5)
+
+    started = time.perf_counter()
+    report = {
+        'rows': args.rows or 'dataset.csv',
+        'sessions': args.sessions,
+        'warm': args.warm,
+    }
+    # Only overlapping sessions need the patched runtime
+    with share_runtime() if args.sessions > 1 else contextlib.nullcontext():
+        report['pages'] = [run_page(page, args.sessions, args.iterations, args.timeout) for page in args.pages]
+    report['wall_seconds'] = time.perf_counter() - started
+    report['peak_rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    workdir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
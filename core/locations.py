@@ -0,0 +1,274 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from core.cache import cached
+from core.data import ROOT, read_dataset
+from core.matcher import sentiment_from_hits, tweet_lexicon_hits
+
+# Resolved raw strings survive restarts, so a new crawl only resolves unseen ones
+MAPPING_PATH = os.environ.get('DASHBOARD_LOCATION_MAP', str(ROOT / 'location_map.json'))
+
+UNKNOWN = 'Tidak diketahui'
+GLOBAL = 'Global / Online'
+SENTIMENTS = ['Positif', 'Netral', 'Negatif']
+
+# Indonesian provinces with their capitals and large cities
+PROVINCES = {
+    'Aceh': ['aceh', 'nad', 'banda aceh', 'lhokseumawe'],
+    'Sumatera Utara': ['sumatera utara', 'sumut', 'north sumatra', 'medan', 'binjai', 'pematangsiantar'],
+    'Sumatera Barat': ['sumatera barat', 'sumbar', 'west sumatra', 'padang', 'bukittinggi'],
+    'Riau': ['riau', 'pekanbaru', 'dumai'],
+    'Kepulauan Riau': ['kepulauan riau', 'kepri', 'batam', 'tanjung pinang', 'tanjungpinang'],
+    'Jambi': ['jambi'],
+    'Sumatera Selatan': ['sumatera selatan', 'sumsel', 'south sumatra', 'palembang'],
+    'Bangka Belitung': ['bangka belitung', 'babel', 'pangkal pinang', 'pangkalpinang'],
+    'Bengkulu': ['bengkulu'],
+    'Lampung': ['lampung', 'bandar lampung'],
+    'DKI Jakarta': ['jakarta', 'dki jakarta', 'jakarta pusat', 'jakarta selatan', 'jakarta barat',
+                    'jakarta timur', 'jakarta utara', 'jkt', 'jakarta raya'],
+    'Jawa Barat': ['jawa barat', 'jabar', 'west java', 'bandung', 'bekasi', 'bogor', 'depok', 'cimahi',
+                   'cirebon', 'sukabumi', 'tasikmalaya', 'karawang'],
+    'Banten': ['banten', 'tangerang', 'tangerang selatan', 'tangsel', 'serang', 'cilegon'],
+    'Jawa Tengah': ['jawa tengah', 'jateng', 'central java', 'semarang', 'solo', 'surakarta', 'magelang',
+                    'pekalongan', 'tegal', 'purwokerto', 'kudus', 'secang'],
+    'DI Yogyakarta': ['yogyakarta', 'jogja', 'jogjakarta', 'yogya', 'diy', 'di yogyakarta', 'sleman', 'bantul'],
+    'Jawa Timur': ['jawa timur', 'jatim', 'east java', 'surabaya', 'malang', 'sidoarjo', 'kediri', 'jember',
+                   'banyuwangi', 'madiun', 'gresik'],
+    'Bali': ['bali', 'denpasar', 'badung', 'gianyar', 'ubud'],
+    'Nusa Tenggara Barat': ['nusa tenggara barat', 'ntb', 'mataram', 'lombok', 'sumbawa'],
+    'Nusa Tenggara Timur': ['nusa tenggara timur', 'ntt', 'kupang', 'flores', 'labuan bajo'],
+    'Kalimantan Barat': ['kalimantan barat', 'kalbar', 'west kalimantan', 'pontianak'],
+    'Kalimantan Tengah': ['kalimantan tengah', 'kalteng', 'central kalimantan', 'palangkaraya', 'palangka raya'],
+    'Kalimantan Selatan': ['kalimantan selatan', 'kalsel', 'south kalimantan', 'banjarmasin', 'banjarbaru'],
+    'Kalimantan Timur': ['kalimantan timur', 'kaltim', 'east kalimantan', 'samarinda', 'balikpapan', 'bontang'],
+    'Kalimantan Utara': ['kalimantan utara', 'kaltara', 'north kalimantan', 'tarakan', 'tanjung selor'],
+    'Sulawesi Utara': ['sulawesi utara', 'sulut', 'north sulawesi', 'manado', 'bitung'],
+    'Gorontalo': ['gorontalo'],
+    'Sulawesi Tengah': ['sulawesi tengah', 'sulteng', 'central sulawesi', 'palu'],
+    'Sulawesi Barat': ['sulawesi barat', 'sulbar', 'west sulawesi', 'mamuju'],
+    'Sulawesi Selatan': ['sulawesi selatan', 'sulsel', 'south sulawesi', 'makassar', 'parepare'],
+    'Sulawesi Tenggara': ['sulawesi tenggara', 'sultra', 'southeast sulawesi', 'kendari'],
+    'Maluku': ['maluku', 'ambon'],
+    'Maluku Utara': ['maluku utara', 'north maluku', 'ternate', 'sofifi'],
+    'Papua': ['papua', 'jayapura'],
+    'Papua Barat': ['papua barat', 'west papua', 'manokwari'],
+    'Papua Barat Daya': ['papua barat daya', 'sorong'],
+    'Papua Tengah': ['papua tengah', 'nabire', 'timika'],
+    'Papua Pegunungan': ['papua pegunungan', 'wamena'],
+    'Papua Selatan': ['papua selatan', 'merauke'],
+}
+
+# Other countries, keyed by the name shown in the dashboard
+COUNTRIES = {
+    'Indonesia': ['indonesia', 'republik indonesia', 'nkri', 'id', 'ina'],
+    'Amerika Serikat': [
+        'united states', 'united states of america', 'usa', 'us', 'u s', 'u s a', 'america', 'new york', 'nyc',
+        'san francisco', 'sf', 'bay area', 'silicon valley', 'los angeles', 'la', 'seattle', 'boston', 'chicago',
+        'austin', 'denver', 'atlanta', 'miami', 'tampa', 'dallas', 'houston', 'san diego', 'san jose', 'portland',
+        'philadelphia', 'pittsburgh', 'minneapolis', 'detroit', 'phoenix', 'las vegas', 'sunnyvale',
+        'mountain view', 'palo alto', 'menlo park', 'foster city', 'stanford', 'brooklyn', 'manhattan',
+        'washington dc', 'washington d c', 'dc', 'colorado springs', 'salt lake city', 'nashville', 'raleigh',
+        'columbus', 'cbus', 'cleveland', 'cincinnati', 'baltimore', 'st louis', 'kansas city', 'wilmington',
+        'alabama', 'alaska', 'arizona', 'arkansas', 'california', 'colorado', 'connecticut', 'delaware',
+        'florida', 'georgia', 'hawaii', 'idaho', 'illinois', 'indiana', 'iowa', 'kansas', 'kentucky', 'louisiana',
+        'maine', 'maryland', 'massachusetts', 'michigan', 'minnesota', 'mississippi', 'missouri', 'montana',
+        'nebraska', 'nevada', 'new hampshire', 'new jersey', 'new mexico', 'north carolina', 'north dakota',
+        'ohio', 'oklahoma', 'oregon', 'pennsylvania', 'rhode island', 'south carolina', 'south dakota',
+        'tennessee', 'texas', 'utah', 'vermont', 'virginia', 'washington', 'west virginia', 'wisconsin',
+        'wyoming', 'ca', 'tx', 'ny', 'nj', 'wa', 'ma', 'co', 'fl', 'il', 'pa', 'oh', 'mi', 'va', 'nc', 'ga', 'mn'],
+    'Britania Raya': [
+        'united kingdom', 'uk', 'u k', 'great britain', 'britain', 'gb', 'england', 'scotland', 'wales',
+        'northern ireland', 'london', 'manchester', 'birmingham', 'edinburgh', 'glasgow', 'cardiff', 'bristol',
+        'leeds', 'liverpool', 'oxford', 'basingstoke', 'belfast'],
+    'Kanada': ['canada', 'toronto', 'vancouver', 'montreal', 'ottawa', 'calgary', 'ontario', 'quebec',
+               'british columbia', 'alberta'],
+    'Australia': ['australia', 'sydney', 'melbourne', 'brisbane', 'perth', 'adelaide', 'canberra', 'nsw',
+                  'new south wales', 'victoria', 'queensland'],
+    'Selandia Baru': ['new zealand', 'auckland', 'wellington', 'nz'],
+    'India': ['india', 'bharat', 'new delhi', 'delhi', 'mumbai', 'bangalore', 'bengaluru', 'hyderabad', 'chennai',
+              'kolkata', 'pune', 'ahmedabad', 'noida', 'gurgaon', 'gurugram', 'tirupur', 'haora', 'howrah',
+              'kerala', 'karnataka', 'maharashtra', 'tamil nadu'],
+    'Singapura': ['singapore', 'singapura', 'sg'],
+    'Malaysia': ['malaysia', 'kuala lumpur', 'kl', 'penang', 'johor', 'selangor'],
+    'Filipina': ['philippines', 'manila', 'cebu', 'ph'],
+    'Thailand': ['thailand', 'bangkok'],
+    'Vietnam': ['vietnam', 'viet nam', 'hanoi', 'ha noi', 'ho chi minh', 'saigon'],
+    'Jepang': ['japan', 'tokyo', 'osaka', 'kyoto', 'yokohama', '日本', '東京', '東京都', '大阪', 'nippon'],
+    'Korea Selatan': ['south korea', 'korea', 'seoul', 'busan', '대한민국', '서울'],
+    'Tiongkok': ['china', 'beijing', 'shanghai', 'shenzhen', 'guangzhou', 'hangzhou', '中国'],
+    'Hong Kong': ['hong kong', 'hongkong', 'hk'],
+    'Taiwan': ['taiwan', 'taipei', '台灣', '台湾'],
+    'Uni Emirat Arab': ['united arab emirates', 'uae', 'dubai', 'abu dhabi'],
+    'Arab Saudi': ['saudi arabia', 'riyadh', 'jeddah', 'ksa'],
+    'Israel': ['israel', 'tel aviv', 'jerusalem', 'haifa'],
+    'Turki': ['turkey', 'turkiye', 'istanbul', 'ankara'],
+    'Jerman': ['germany', 'deutschland', 'berlin', 'munich', 'munchen', 'hamburg', 'frankfurt', 'cologne', 'koln',
+               'stuttgart', 'freiburg', 'freiburg im breisgau', 'de'],
+    'Prancis': ['france', 'paris', 'lyon', 'marseille', 'toulouse', 'fr'],
+    'Belanda': ['netherlands', 'the netherlands', 'holland', 'amsterdam', 'rotterdam', 'utrecht', 'the hague',
+                'eindhoven', 'nl'],
+    'Belgia': ['belgium', 'brussels', 'antwerp', 'ghent'],
+    'Swiss': ['switzerland', 'zurich', 'geneva', 'bern', 'basel', 'lausanne', 'ch'],
+    'Austria': ['austria', 'vienna', 'wien'],
+    'Italia': ['italy', 'italia', 'rome', 'roma', 'milan', 'milano', 'turin', 'torino', 'naples', 'florence',
+               'bologna', 'forli', 'sicily', 'mount etna'],
+    'Spanyol': ['spain', 'espana', 'madrid', 'barcelona', 'valencia', 'seville', 'zaragoza', 'huesca',
+                'huesca zaragoza'],
+    'Portugal': ['portugal', 'lisbon', 'lisboa', 'porto'],
+    'Irlandia': ['ireland', 'dublin', 'cork'],
+    'Swedia': ['sweden', 'stockholm', 'gothenburg', 'malmo'],
+    'Norwegia': ['norway', 'oslo'],
+    'Denmark': ['denmark', 'copenhagen'],
+    'Finlandia': ['finland', 'helsinki', 'espoo'],
+    'Estonia': ['estonia', 'tallinn', 'tartu'],
+    'Polandia': ['poland', 'warsaw', 'krakow', 'wroclaw'],
+    'Ceko': ['czech republic', 'czechia', 'prague', 'brno'],
+    'Rumania': ['romania', 'bucharest', 'cluj', 'cluj napoca'],
+    'Ukraina': ['ukraine', 'kyiv', 'kiev', 'lviv'],
+    'Rusia': ['russia', 'moscow', 'saint petersburg', 'st petersburg'],
+    'Nigeria': ['nigeria', 'nigeri', 'lagos', 'abuja', 'kano', 'ibadan', 'osun', 'port harcourt'],
+    'Kenya': ['kenya', 'nairobi'],
+    'Afrika Selatan': ['south africa', 'johannesburg', 'cape town', 'pretoria'],
+    'Mesir': ['egypt', 'cairo'],
+    'Maroko': ['morocco', 'casablanca', 'grand casablanca', 'rabat'],
+    'Brasil': ['brazil', 'brasil', 'sao paulo', 'rio de janeiro'],
+    'Meksiko': ['mexico', 'mexico city', 'cdmx', 'guadalajara'],
+    'Argentina': ['argentina', 'buenos aires'],
+    'Pakistan': ['pakistan', 'karachi', 'lahore', 'islamabad'],
+    'Bangladesh': ['bangladesh', 'dhaka'],
+}
+
+GLOBAL_ALIASES = [
+    'global', 'worldwide', 'world', 'earth', 'planet earth', 'everywhere', 'internet', 'the internet',
+    'online', 'web', 'web3', 'metaverse', 'blockchain', 'cyberspace', 'international', 'remote', 'europe', 'eu',
+    'asia', 'africa', 'wherever you are', 'localhost', 'anywhere', 'we re global', 'earth 🌎', 'the cloud',
+]
+
+# Aliases that also name another place ("Boise, ID", "Tbilisi, Georgia"),
+# trusted only when they are the whole location string
+AMBIGUOUS = {'id', 'de', 'la', 'co', 'ca', 'georgia'}
+
+_SPLIT_RE = re.compile(r'\s*(?:[,/|;·•&]|\s-\s|\band\b)\s*')
+_CLEAN_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r'\s+')
+_URL_RE = re.compile(r'https?://\S+|\S+\.(?:com|dev|io|net|org|xyz)\b|\d+\.\d+\.\d+\.\d+')
+
+_lock = threading.Lock()
+
+
+def _normalize(text):
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return _SPACE_RE.sub(' ', _CLEAN_RE.sub(' ', text)).strip()
+
+
+def _build_aliases():
+    aliases = {_normalize(alias): GLOBAL for alias in GLOBAL_ALIASES}
+    for region, names in COUNTRIES.items():
+        aliases.update({_normalize(name): region for name in names})
+    for province, names in PROVINCES.items():
+        aliases.update({_normalize(name): province for name in names})
+    aliases.pop('', None)
+    return aliases
+
+
+ALIASES = _build_aliases()
+# Multi-word aliases matched inside longer strings, longest first
+_PHRASES = sorted((alias for alias in ALIASES if (' ' in alias or len(alias) > 4) and alias not in AMBIGUOUS),
+                  key=len, reverse=True)
+# Bumped whenever resolve() changes, so stored resolutions are redone
+RESOLVER_VERSION = 2
+GAZETTEER_VERSION = hashlib.blake2b(json.dumps([ALIASES, sorted(AMBIGUOUS), RESOLVER_VERSION],
+                                              sort_keys=True).encode(), digest_size=8).hexdigest()
+
+
+def _most_specific(regions):
+    # A province wins over the country or "global" alias beside it
+    for region in regions:
+        if region in PROVINCES:
+            return region
+    return regions[0] if regions else None
+
+
+def resolve(raw):
+    # Most specific place first: "Bandung, Indonesia" and "Medan Indonesia"
+    # resolve to the province, not to the country
+    if pd.isna(raw) or not str(raw).strip():
+        return UNKNOWN
+    text = _URL_RE.sub(' ', str(raw))
+    whole = _normalize(text)
+    if whole in AMBIGUOUS:
+        return ALIASES[whole]
+    parts = [_normalize(part) for part in _SPLIT_RE.split(text)]
+    region = _most_specific([ALIASES[part] for part in parts if part in ALIASES and part not in AMBIGUOUS])
+    if region is not None:
+        return region
+    padded = f" {whole} "
+    matches = []
+    for phrase in _PHRASES:
+        if f" {phrase} " in padded:
+            matches.append(ALIASES[phrase])
+            # Shorter aliases inside this one ("wales" in "new south wales") do not count
+            padded = padded.replace(f" {phrase} ", '  ')
+    return _most_specific(matches) or UNKNOWN
+
+
+def load_mapping(path=MAPPING_PATH):
+    try:
+        with open(path, encoding='utf-8') as f:
+            stored = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    # A changed gazetteer invalidates every stored resolution
+    return stored['mapping'] if stored.get('gazetteer') == GAZETTEER_VERSION else {}
+
+
+def save_mapping(mapping, path=MAPPING_PATH):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'gazetteer': GAZETTEER_VERSION, 'mapping': mapping}, f, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def resolve_unique(values, path=MAPPING_PATH):
+    # Work scales with distinct strings; only unseen ones hit the gazetteer
+    with _lock:
+        mapping = load_mapping(path)
+        unseen = [value for value in values if value not in mapping]
+        if unseen:
+            mapping.update({value: resolve(value) for value in unseen})
+            save_mapping(mapping, path)
+    return [mapping[value] for value in values]
+
+
+def encode_regions(locations):
+    # Dictionary-encoded region column: one code per row, one label per region
+    codes, uniques = pd.factorize(locations.fillna('').str.strip())
+    regions = resolve_unique(list(uniques))
+    categories = sorted(set(regions) | {UNKNOWN})
+    region_codes = np.array([categories.index(region) for region in regions] + [categories.index(UNKNOWN)],
+                            dtype=np.int16)
+    return pd.Categorical.from_codes(region_codes[codes], categories=categories)
+
+
+@cached
+def location_index(version):
+    df = read_dataset(version)
+    region = pd.Series(encode_regions(df['location']), index=df.index, name='region')
+    sentiment = sentiment_from_hits(tweet_lexicon_hits(version))
+    daily = pd.crosstab(df['created_at'].dt.normalize(), region).rename_axis(index='date', columns='region')
+    by_sentiment = pd.crosstab(region, sentiment).reindex(columns=SENTIMENTS, fill_value=0).rename_axis(columns=None)
+    by_sentiment['tweets'] = by_sentiment[SENTIMENTS].sum(axis=1)
+    return {
+        'region': region,
+        'daily': daily,
+        'sentiment': by_sentiment.sort_values('tweets', ascending=False),
+        'distinct_raw': int(df['location'].nunique()),
+    }
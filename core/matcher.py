@@ -0,0 +1,137 @@
+from collections import deque
+
+import pandas as pd
+
+from core.cache import cached
+from core.data import read_dataset, text_batches
+from core.text import CATEGORIES, NEGATIVE_WORDS, POSITIVE_WORDS
+
+
+class AhoCorasick:
+    # Multi-pattern automaton. Transitions are precomputed into a full DFA so
+    # scanning costs one dict lookup per character, whatever the lexicon size.
+    def __init__(self, patterns):
+        # patterns: {pattern: [(label, whole_word), ...]}
+        self.delta = [{}]
+        self.outputs = [[]]
+        for pattern, labels in patterns.items():
+            state = 0
+            for ch in pattern:
+                nxt = self.delta[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.delta)
+                    self.delta[state][ch] = nxt
+                    self.delta.append({})
+                    self.outputs.append([])
+                state = nxt
+            self.outputs[state].extend((pattern, label, whole_word) for label, whole_word in labels)
+        self._link()
+
+    def _link(self):
+        trie = [dict(edges) for edges in self.delta]
+        fail = [0] * len(trie)
+        order = []
+        queue = deque(trie[0].values())
+        while queue:
+            state = queue.popleft()
+            order.append(state)
+            for ch, nxt in trie[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in trie[f]:
+                    f = fail[f]
+                target = trie[f].get(ch, 0)
+                fail[nxt] = target if target != nxt else 0
+                self.outputs[nxt] = self.outputs[nxt] + self.outputs[fail[nxt]]
+        # Fold failure links into the transition table; BFS order guarantees
+        # the failure state is already complete when it is inherited from
+        for state in order:
+            inherited = dict(self.delta[fail[state]])
+            inherited.update(trie[state])
+            self.delta[state] = inherited
+
+    def scan(self, text):
+        # Yields (pattern, label) once per occurrence
+        delta, outputs = self.delta, self.outputs
+        state = 0
+        for end, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                for pattern, label, whole_word in outputs[state]:
+                    if whole_word:
+                        start = end - len(pattern) + 1
+                        if (start > 0 and text[start - 1].isalnum()) or (end + 1 < len(text) and text[end + 1].isalnum()):
+                            continue
+                    yield pattern, label
+
+
+def _lexicon_patterns():
+    patterns = {}
+    # Sentiment words match as substrings, like classify_sentiment always did
+    for word in NEGATIVE_WORDS:
+        patterns.setdefault(word, []).append(('Negatif', False))
+    for word in POSITIVE_WORDS:
+        patterns.setdefault(word, []).append(('Positif', False))
+    for cat, words in CATEGORIES.items():
+        for word in words:
+            patterns.setdefault(word, []).append((cat, True))
+    return patterns
+
+
+LEXICON = AhoCorasick(_lexicon_patterns())
+LABELS = ['Negatif', 'Positif'] + list(CATEGORIES)
+
+
+def lexicon_counts(text):
+    # Sentiment labels count distinct words present; categories count occurrences
+    counts = dict.fromkeys(LABELS, 0)
+    if pd.isna(text):
+        return counts
+    seen = set()
+    for pattern, label in LEXICON.scan(str(text).lower()):
+        if label in ('Negatif', 'Positif'):
+            if (pattern, label) in seen:
+                continue
+            seen.add((pattern, label))
+        counts[label] += 1
+    return counts
+
+
+def lexicon_hits(texts):
+    hits = pd.DataFrame([lexicon_counts(t) for t in texts], index=texts.index, columns=LABELS)
+    categories = hits[list(CATEGORIES)]
+    hits['topic'] = categories.idxmax(axis=1).where(categories.max(axis=1) > 0, 'Lainnya')
+    return hits
+
+
+def sentiment_from_hits(hits):
+    labels = pd.Series('Netral', index=hits.index)
+    labels[hits['Negatif'] > hits['Positif']] = 'Negatif'
+    labels[hits['Positif'] > hits['Negatif']] = 'Positif'
+    return labels
+
+
+# One cache entry per text column rather than one per unique tweet
+@cached
+def sentiment_labels(texts):
+    return sentiment_from_hits(lexicon_hits(texts))
+
+
+@cached
+def tweet_lexicon_hits(version):
+    return pd.concat([lexicon_hits(texts) for texts in text_batches(version)])
+
+
+def sentiment_of(version, ids):
+    # Labels for any subset of a snapshot's rows, without reading their text
+    return sentiment_from_hits(tweet_lexicon_hits(version).loc[ids])
+
+
+@cached
+def category_daily(version):
+    df = read_dataset(version)
+    hits = tweet_lexicon_hits(version)
+    present = (hits[list(CATEGORIES)] > 0).astype(int)
+    present['date'] = df['created_at'].dt.date
+    daily = present.groupby('date').sum().reset_index()
+    return daily.melt(id_vars='date', var_name='Kategori', value_name='Jumlah Tweet')
@@ -0,0 +1,80 @@
+import argparse
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+PARTITION_DIR = Path(os.environ.get('DASHBOARD_PARTITION_DIR', ROOT / 'data' / 'partitions'))
+PARTITION_FORMAT = 'tweets-%Y-%m.csv'
+
+
+def partition_name(month):
+    return month.strftime(PARTITION_FORMAT)
+
+
+def partition_month(path):
+    return pd.Period(datetime.strptime(path.name, PARTITION_FORMAT), 'M')
+
+
+def is_partitioned(directory=PARTITION_DIR):
+    return directory.is_dir() and any(directory.glob('tweets-*.csv'))
+
+
+def partitions_for(start=None, end=None, directory=PARTITION_DIR):
+    # Partition pruning: only months overlapping [start, end] are opened
+    first = pd.Timestamp(start).to_period('M') if start is not None else None
+    last = pd.Timestamp(end).to_period('M') if end is not None else None
+    paths = []
+    for path in sorted(directory.glob('tweets-*.csv')):
+        month = partition_month(path)
+        if (first is None or month >= first) and (last is None or month <= last):
+            paths.append(path)
+    return paths
+
+
+def load_range(start=None, end=None, directory=PARTITION_DIR):
+    frames = [pd.read_csv(path) for path in partitions_for(start, end, directory)]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def _write(path, df):
+    tmp = path.with_suffix('.csv.tmp')
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def write_partitions(df, directory=PARTITION_DIR):
+    # Merge rows into their month files; only months present in `df` are touched
+    directory.mkdir(parents=True, exist_ok=True)
+    df = df.assign(created_at=pd.to_datetime(df['created_at']))
+    written = []
+    for month, rows in df.groupby(df['created_at'].dt.to_period('M')):
+        path = directory / partition_name(month)
+        if path.exists():
+            existing = pd.read_csv(path, parse_dates=['created_at'])
+            rows = pd.concat([existing, rows], ignore_index=True)
+        rows = rows.drop_duplicates('id', keep='last').sort_values('created_at', kind='stable')
+        _write(path, rows)
+        written.append(path)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage month-partitioned tweet storage")
+    sub = parser.add_subparsers(dest='command', required=True)
+    split = sub.add_parser('split', help="Partition an existing crawl file (default: dataset.csv)")
+    split.add_argument('source', nargs='?', default=str(ROOT / 'dataset.csv'))
+    append = sub.add_parser('append', help="Add a new crawl; only its months are rewritten")
+    append.add_argument('source')
+    args = parser.parse_args(argv)
+
+    written = write_partitions(pd.read_csv(args.source))
+    print(f"{len(written)} partition(s) written to {PARTITION_DIR}")
+
+
+if __name__ == '__main__':
+    main()
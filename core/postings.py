@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from core.cache import cached
+from core.data import read_dataset, text_batches
+from core.matcher import sentiment_from_hits, tweet_lexicon_hits
+from core.text import keywords_of
+
+SENTIMENTS = ['Positif', 'Netral', 'Negatif']
+
+
+@cached
+def term_index(version):
+    # Posting list per keyword: ascending row positions of the tweets using it
+    terms = pd.concat([texts.map(lambda text: sorted(set(keywords_of(text)))) for texts in text_batches(version)],
+                      ignore_index=True).explode().dropna()
+    words = terms.to_numpy(dtype=object)
+    order = np.argsort(words, kind='stable')
+    vocab, starts = np.unique(words[order], return_index=True)
+    return {
+        'vocab': pd.Index(vocab),
+        'row_order': terms.index.to_numpy()[order],
+        'row_bounds': np.append(starts, len(order)),
+    }
+
+
+@cached
+def row_features(version):
+    # Per-row columns a drill-down intersects with, aligned to row positions
+    df = read_dataset(version)
+    return pd.DataFrame({
+        'sentiment': sentiment_from_hits(tweet_lexicon_hits(version)).to_numpy(),
+        'date': df['created_at'].dt.normalize().to_numpy(),
+        'engagement': (df['favorite_count'] + df['retweet_count']).to_numpy(),
+    })
+
+
+def term_rows(index, term):
+    if term not in index['vocab']:
+        return np.empty(0, dtype=np.int64)
+    position = index['vocab'].get_loc(term)
+    return index['row_order'][index['row_bounds'][position]:index['row_bounds'][position + 1]]
+
+
+@cached
+def keyword_drilldown(version, term, sentiment=None, start=None, end=None, top_n=10):
+    # Only the term's rows are touched, so cost follows its frequency; both
+    # indexes are read-only, uncopied cache entries
+    rows = term_rows(term_index(version), term.lower())
+    features = row_features(version).iloc[rows]
+    mask = np.ones(len(rows), dtype=bool)
+    if sentiment is not None:
+        mask = mask & (features['sentiment'].to_numpy() == sentiment)
+    if start is not None:
+        mask = mask & (features['date'].to_numpy() >= pd.Timestamp(start))
+    if end is not None:
+        mask = mask & (features['date'].to_numpy() <= pd.Timestamp(end))
+    rows, features = rows[mask], features[mask]
+
+    top = np.argsort(-features['engagement'].to_numpy(), kind='stable')[:top_n]
+    return {
+        'term': term,
+        'rows': rows,
+        'tweets': len(rows),
+        'engagement': int(features['engagement'].sum()),
+        'sentiment': features['sentiment'].value_counts().reindex(SENTIMENTS, fill_value=0),
+        'daily': features.groupby('date').agg(tweets=('engagement', 'size'), engagement=('engagement', 'sum')),
+        'top_rows': rows[top],
+    }
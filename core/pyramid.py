@@ -0,0 +1,71 @@
+import pandas as pd
+
+from core.cache import cached
+from core.data import read_dataset
+
+# Finest to coarsest. Each level stores, per non-empty bucket, the tweet
+# count (sum) and the min/max of the next finer level's buckets inside it.
+# Weekly periods run Monday-Sunday, so their bucket starts are Mondays.
+LEVELS = [('min', 'Menit'), ('h', 'Jam'), ('D', 'Hari'), ('W', 'Minggu')]
+STEP = {'min': pd.Timedelta(minutes=1), 'h': pd.Timedelta(hours=1), 'D': pd.Timedelta(days=1), 'W': pd.Timedelta(weeks=1)}
+CHART_POINTS = 1200
+
+
+def _rollup(level, freq, finer):
+    # level: the finer level's non-empty buckets. Only non-empty buckets are
+    # stored; a bucket's min is 0 when some finer bucket inside it (within the
+    # data's range) was empty
+    counts = level['buckets']['sum']
+    starts = counts.index.to_period(freq).start_time
+    grouped = counts.groupby(starts)
+    buckets = grouped.agg(['sum', 'min', 'max'])
+    step = STEP[finer]
+    first = buckets.index.to_series().clip(lower=level['start'])
+    last = (buckets.index.to_series() + STEP[freq] - step).clip(upper=level['end'])
+    expected = ((last - first) // step + 1).to_numpy()
+    buckets.loc[grouped.size().to_numpy() < expected, 'min'] = 0
+    return {'buckets': buckets, 'start': starts.min(), 'end': starts.max()}
+
+
+def build_pyramid(timestamps):
+    minutes = timestamps.dt.floor('min').value_counts().sort_index()
+    if minutes.empty:
+        return {}
+    level = {'buckets': pd.DataFrame({'sum': minutes, 'min': minutes, 'max': minutes}),
+             'start': minutes.index.min(), 'end': minutes.index.max()}
+    pyramid = {'min': level}
+    for finer, (freq, _) in zip(LEVELS, LEVELS[1:]):
+        level = _rollup(level, freq, finer[0])
+        pyramid[freq] = level
+    return pyramid
+
+
+def choose_level(start, end, points=CHART_POINTS):
+    # Finest resolution that still fits one bucket per available point
+    span = pd.Timestamp(end) - pd.Timestamp(start)
+    for freq, _ in LEVELS:
+        if span / STEP[freq] <= points:
+            return freq
+    return LEVELS[-1][0]
+
+
+@cached
+def trend_pyramid(version):
+    return build_pyramid(read_dataset(version)['created_at'])
+
+
+@cached
+def trend_window(version, start, end, points=CHART_POINTS):
+    freq = choose_level(start, end, points)
+    level = trend_pyramid(version).get(freq)
+    columns = ['sum', 'min', 'max']
+    if level is None:
+        window = pd.DataFrame(columns=columns, index=pd.DatetimeIndex([]))
+    else:
+        # Empty buckets are filled here, only for the window and resolution
+        # being drawn (at most `points` of them)
+        step = STEP[freq]
+        start, end = max(pd.Timestamp(start), level['start']), min(pd.Timestamp(end), level['end'])
+        first = level['start'] + -((level['start'] - start) // step) * step
+        window = level['buckets'].reindex(pd.date_range(first, end, freq=step), fill_value=0)[columns]
+    return {'freq': freq, 'label': dict(LEVELS)[freq], 'series': window.rename_axis('bucket').reset_index()}
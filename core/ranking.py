@@ -0,0 +1,40 @@
+import numpy as np
+
+from core.cache import cached
+from core.data import read_dataset
+
+RANKED_COLUMNS = ['total_engagement', 'favorite_count', 'retweet_count']
+
+
+@cached
+def ranking_index(version):
+    # Descending row order per metric, computed once per snapshot. Ties keep
+    # dataset order, matching DataFrame.nlargest(keep='first'). Served
+    # uncopied (copy=False policy), so the arrays are read-only.
+    df = read_dataset(version)
+    values = {
+        'total_engagement': (df['favorite_count'] + df['retweet_count']).to_numpy(),
+        'favorite_count': df['favorite_count'].to_numpy(),
+        'retweet_count': df['retweet_count'].to_numpy(),
+    }
+    return {column: np.argsort(-values[column], kind='stable') for column in RANKED_COLUMNS}
+
+
+def top_k(order, mask=None, k=10):
+    # Walk the precomputed order and stop once k rows pass the filter
+    if mask is None:
+        return order[:k]
+    mask = np.asarray(mask, dtype=bool)
+    found = []
+    start, step = 0, max(4 * k, 256)
+    while start < len(order) and sum(len(f) for f in found) < k:
+        chunk = order[start:start + step]
+        found.append(chunk[mask[chunk]])
+        start += step
+        step *= 2
+    return np.concatenate(found)[:k] if found else order[:0]
+
+
+def ranked(order, mask):
+    # Every row passing the filter, in ranking order, without re-sorting
+    return order[np.asarray(mask, dtype=bool)[order]]
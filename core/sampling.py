@@ -0,0 +1,136 @@
+import os
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from core.cache import cached
+
+ROOT = Path(__file__).resolve().parent.parent
+SAMPLE_DIR = Path(os.environ.get('DASHBOARD_SAMPLE_DIR', ROOT / '.sample'))
+# Samples kept on disk: the served snapshot and the one warming
+KEEP_VERSIONS = 2
+SAMPLE_PER_STRATUM = int(os.environ.get('DASHBOARD_SAMPLE_PER_STRATUM', 200))
+# Engagement is heavy-tailed: tweets at or above this are always kept, as a
+# take-all stratum, so a few viral tweets cannot swing the estimates
+TAKE_ALL_ENGAGEMENT = int(os.environ.get('DASHBOARD_TAKE_ALL_ENGAGEMENT', 100))
+TAKE_ALL = 'take-all'
+INGEST_CHUNK_ROWS = 100_000
+Z_95 = 1.96
+
+
+def strata_of(df):
+    strata = df['created_at'].dt.strftime('%Y-%m-%d') + '|' + df['lang'].fillna('und')
+    viral = (df['favorite_count'] + df['retweet_count']) >= TAKE_ALL_ENGAGEMENT
+    return strata.where(~viral, TAKE_ALL)
+
+
+class StratifiedReservoir:
+    # Keeps the rows with the k smallest random keys per (day, language)
+    # stratum: a uniform sample without replacement that can be fed batch by
+    # batch as crawls arrive, with exact population counts per stratum
+
+    def __init__(self, capacity=SAMPLE_PER_STRATUM, seed=0):
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+        self.kept = None
+        self.population = pd.Series(dtype=np.int64)
+
+    def add(self, chunk):
+        chunk = chunk.assign(stratum=strata_of(chunk), _key=self.rng.random(len(chunk)))
+        counts = chunk['stratum'].value_counts()
+        self.population = self.population.add(counts, fill_value=0).astype(np.int64)
+        pool = chunk if self.kept is None else pd.concat([self.kept, chunk])
+        take_all = pool['stratum'] == TAKE_ALL
+        sampled = pool[~take_all].sort_values('_key', kind='stable').groupby('stratum', sort=False).head(self.capacity)
+        self.kept = pd.concat([pool[take_all], sampled])
+
+    def sample(self):
+        if self.kept is None:
+            return pd.DataFrame(columns=['stratum', 'weight'])
+        sample = self.kept.drop(columns='_key').sort_index()
+        sizes = sample['stratum'].map(sample['stratum'].value_counts())
+        sample['weight'] = sample['stratum'].map(self.population) / sizes
+        return sample
+
+
+def sample_path(version):
+    return SAMPLE_DIR / f"{version}.pkl"
+
+
+def build(version, df):
+    # Fed chunk by chunk while a snapshot is ingested and stored beside it, so
+    # approximate pages never need the full frame
+    path = sample_path(version)
+    if path.exists():
+        return path
+    reservoir = StratifiedReservoir()
+    for start in range(0, len(df), INGEST_CHUNK_ROWS):
+        reservoir.add(df.iloc[start:start + INGEST_CHUNK_ROWS])
+    sampled = {'sample': reservoir.sample(), 'population': reservoir.population, 'rows': len(df)}
+    SAMPLE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'wb') as f:
+        pickle.dump(sampled, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    samples = sorted(SAMPLE_DIR.glob('*.pkl'), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in [p for p in samples if p != path][KEEP_VERSIONS - 1:]:
+        old.unlink(missing_ok=True)
+    return path
+
+
+@cached
+def stratified_sample(version):
+    path = sample_path(version)
+    if not path.exists():
+        from core.data import read_dataset
+        read_dataset(version)  # ingesting the snapshot writes its sample
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def estimate_total(sampled, values):
+    # Stratified estimator of a population total with a 95% interval;
+    # strata sampled completely contribute no variance. A Series may cover only
+    # some sample rows (a domain, e.g. with near-duplicates collapsed); the
+    # rows it leaves out count as zero
+    if isinstance(values, pd.Series):
+        values = values.reindex(sampled['sample'].index, fill_value=0)
+    frame = pd.DataFrame({'stratum': sampled['sample']['stratum'].to_numpy(),
+                          'y': np.asarray(values, dtype=float)})
+    stats = frame.groupby('stratum')['y'].agg(['mean', 'var', 'size'])
+    population = sampled['population'].reindex(stats.index)
+    total = (population * stats['mean']).sum()
+    variance = (population ** 2 * (1 - stats['size'] / population) * stats['var'].fillna(0) / stats['size']).sum()
+    return total, Z_95 * np.sqrt(variance)
+
+
+def estimate_counts(sampled, labels, categories):
+    if isinstance(labels, pd.Series):
+        labels = labels.reindex(sampled['sample'].index)
+    rows = []
+    for category in categories:
+        total, margin = estimate_total(sampled, np.asarray(labels) == category)
+        rows.append({'category': category, 'estimate': total, 'margin': margin})
+    return pd.DataFrame(rows).set_index('category')
+
+
+def weighted_size(df, by):
+    # Rows per group; on a sample (which carries `weight`) the estimated
+    # population rows instead
+    if 'weight' not in df.columns:
+        return df.groupby(by).size()
+    return df.groupby(by)['weight'].sum().round().astype(np.int64)
+
+
+def weighted_sum(df, by, columns):
+    if 'weight' not in df.columns:
+        return df.groupby(by)[columns].sum()
+    return df[columns].mul(df['weight'], axis=0).groupby(by).sum().round().astype(np.int64)
+
+
+def weighted_median(values, weights):
+    order = np.argsort(np.asarray(values), kind='stable')
+    values, weights = np.asarray(values)[order], np.asarray(weights, dtype=float)[order]
+    return values[np.searchsorted(np.cumsum(weights), weights.sum() / 2)]
@@ -0,0 +1,22 @@
+import sys
+from pathlib import Path
+
+from streamlit.web import cli
+
+from core import warmup
+
+ROOT = Path(__file__).resolve().parent.parent
+MAIN_SCRIPT = ROOT / '🏠_Beranda.py'
+
+
+def main(argv=None):
+    # Start the warm-up with the server process instead of on the first
+    # session, then hand over to `streamlit run`; pages import this same
+    # core.warmup module and find the thread already running
+    warmup.ensure_started()
+    sys.argv = ['streamlit', 'run', str(MAIN_SCRIPT), *(sys.argv[1:] if argv is None else argv)]
+    sys.exit(cli.main())
+
+
+if __name__ == '__main__':
+    main()
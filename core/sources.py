@@ -0,0 +1,80 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+# One tweet-harvest crawl per query, e.g. data/sources/Shai-Hulud.csv
+SOURCE_DIR = Path(os.environ.get('DASHBOARD_SOURCE_DIR', ROOT / 'data' / 'sources'))
+INGEST_WORKERS = int(os.environ.get('DASHBOARD_INGEST_WORKERS', os.cpu_count() or 1))
+
+
+def is_multi_source(directory=SOURCE_DIR):
+    return directory.is_dir() and any(directory.glob('*.csv'))
+
+
+def source_files(directory=SOURCE_DIR):
+    return sorted(directory.glob('*.csv'))
+
+
+def source_name(path):
+    return Path(path).stem.replace('_', ' ')
+
+
+def read_source(path):
+    df = pd.read_csv(path)
+    df['source'] = source_name(path)
+    return df
+
+
+def read_sources(paths, workers=INGEST_WORKERS):
+    # Each crawl file is parsed in its own process; spawn keeps this safe
+    # when called from the server's threads
+    workers = min(workers, len(paths))
+    if workers <= 1:
+        return [read_source(path) for path in paths]
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        return list(pool.map(read_source, paths))
+
+
+def merge_sources(frames):
+    # A tweet matched by several queries is kept once; `source` is the first
+    # query (in file order) that found it and `sources` lists all of them
+    combined = pd.concat(frames, ignore_index=True)
+    if combined.empty:
+        return combined
+    memberships = combined.groupby('id', sort=False)['source'].agg(lambda names: '|'.join(dict.fromkeys(names)))
+    merged = combined.drop_duplicates('id', keep='first').reset_index(drop=True)
+    merged['sources'] = merged['id'].map(memberships)
+    return merged
+
+
+def load_sources(paths=None, workers=INGEST_WORKERS):
+    paths = source_files() if paths is None else list(paths)
+    if not paths:
+        return pd.DataFrame()
+    return merge_sources(read_sources(paths, workers))
+
+
+def source_summary(df):
+    # Per-query aggregates counted by membership, so overlapping queries each
+    # get credit; `exclusive` counts tweets only that query found
+    if 'sources' not in df.columns:
+        return pd.DataFrame()
+    memberships = df['sources'].str.split('|')
+    exploded = df.assign(query=memberships, shared=memberships.str.len() > 1).explode('query')
+    exploded['total_engagement'] = exploded['favorite_count'] + exploded['retweet_count']
+    summary = exploded.groupby('query').agg(
+        tweets=('id', 'size'),
+        exclusive=('shared', lambda shared: int((~shared).sum())),
+        likes=('favorite_count', 'sum'),
+        retweets=('retweet_count', 'sum'),
+        total_engagement=('total_engagement', 'sum'),
+        first_seen=('created_at', 'min'),
+        last_seen=('created_at', 'max'),
+    )
+    summary['avg_engagement'] = summary['total_engagement'] / summary['tweets']
+    return summary.sort_values('tweets', ascending=False)
@@ -0,0 +1,197 @@
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from core import sources
+from core.cache import cached
+from core.data import PERIOD_END, PERIOD_START, ROOT, dataset_files, dataset_version
+from core.matcher import lexicon_hits, sentiment_from_hits
+
+try:
+    import duckdb
+except ImportError:  # optional dependency
+    duckdb = None
+
+# 'pandas' keeps every aggregation in memory; 'sqlite' or 'duckdb' push the
+# supported ones down to an embedded database file built from dataset.csv
+BACKEND = os.environ.get('DASHBOARD_BACKEND', 'pandas')
+DB_PATHS = {'sqlite': ROOT / 'dataset.sqlite', 'duckdb': ROOT / 'dataset.duckdb'}
+CHUNK_ROWS = 100_000
+# Database files kept per backend: the served snapshot and the one warming
+KEEP_VERSIONS = 2
+# Bumped whenever the table layout changes, so older files are rebuilt
+SCHEMA = 2
+
+# Every source column, in the CSV's order, so filtered rows have the same
+# shape as on the pandas backend
+COLUMNS = ['id', 'conversation_id', 'username', 'in_reply_to_screen_name', 'full_text', 'image_url',
+           'tweet_url', 'lang', 'location', 'favorite_count', 'quote_count', 'reply_count', 'retweet_count', 'user_id',
+           'created_at', 'sentiment']
+
+_lock = threading.Lock()
+
+
+def enabled():
+    if BACKEND == 'duckdb' and duckdb is None:
+        raise RuntimeError("DASHBOARD_BACKEND=duckdb requires the duckdb package")
+    return BACKEND in DB_PATHS
+
+
+def _connect(path, read_only=True):
+    if BACKEND == 'duckdb':
+        return duckdb.connect(str(path), read_only=read_only)
+    if read_only:
+        return sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+    return sqlite3.connect(path)
+
+
+def _stored_version(path):
+    if not path.exists():
+        return None
+    try:
+        con = _connect(path)
+        try:
+            version, schema = con.execute("SELECT version, schema FROM meta").fetchone()
+            return version if schema == SCHEMA else None
+        finally:
+            con.close()
+    except Exception:
+        return None
+
+
+def db_path(version):
+    base = DB_PATHS[BACKEND]
+    return base.with_name(f"{base.stem}-{version}{base.suffix}")
+
+
+def _prune(keep):
+    base = DB_PATHS[BACKEND]
+    files = sorted(base.parent.glob(f"{base.stem}-*{base.suffix}"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for path in [path for path in files if path != keep][KEEP_VERSIONS - 1:]:
+        path.unlink(missing_ok=True)
+
+
+def ingest(version):
+    # One file per snapshot, so the stale one stays queryable while the new
+    # one is built. Built into a temp file and swapped in, so readers never
+    # see a half-built table
+    path = db_path(version)
+    with _lock:
+        if _stored_version(path) == version:
+            return path
+        if version != dataset_version():
+            # The files on disk already belong to a newer snapshot; building
+            # now would label their rows with the old version
+            raise RuntimeError(f"database for snapshot {version} is gone and its source files have changed")
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        tmp.unlink(missing_ok=True)
+        con = _connect(tmp, read_only=False)
+        try:
+            con.execute("""
+                CREATE TABLE tweets (
+                    id BIGINT, conversation_id BIGINT, username TEXT, in_reply_to_screen_name TEXT,
+                    full_text TEXT, image_url TEXT, tweet_url TEXT, lang TEXT, location TEXT, favorite_count BIGINT, quote_count BIGINT,
+                    reply_count BIGINT, retweet_count BIGINT, user_id BIGINT, created_at TEXT, sentiment TEXT
+                )""")
+            placeholders = ', '.join(['?'] * len(COLUMNS))
+            if sources.is_multi_source():
+                # Overlapping crawls must be deduplicated as a whole before loading
+                chunks = [sources.load_sources(dataset_files())]
+            else:
+                chunks = (chunk for path in dataset_files() for chunk in pd.read_csv(path, chunksize=CHUNK_ROWS))
+            for chunk in chunks:
+                # Timestamps are stored as sortable 'YYYY-MM-DD HH:MM:SS' text,
+                # which both engines can range-scan and substring into buckets
+                chunk['created_at'] = pd.to_datetime(chunk['created_at']).dt.strftime('%Y-%m-%d %H:%M:%S')
+                chunk['sentiment'] = sentiment_from_hits(lexicon_hits(chunk['full_text']))
+                chunk['quote_count'] = chunk['quote_count'].fillna(0)
+                if BACKEND == 'duckdb':
+                    con.register('chunk', chunk[COLUMNS])
+                    con.execute("INSERT INTO tweets SELECT * FROM chunk")
+                    con.unregister('chunk')
+                else:
+                    rows = chunk[COLUMNS].astype(object).where(chunk[COLUMNS].notna(), None)
+                    con.executemany(f"INSERT INTO tweets VALUES ({placeholders})", rows.itertuples(index=False, name=None))
+            con.execute("CREATE INDEX idx_tweets_created_at ON tweets (created_at)")
+            con.execute("CREATE TABLE meta (version TEXT, schema INTEGER)")
+            con.execute("INSERT INTO meta VALUES (?, ?)", [version, SCHEMA])
+            con.commit()
+        finally:
+            con.close()
+        os.replace(tmp, path)
+        _prune(keep=path)
+        return path
+
+
+def _bounds(start=None, end=None):
+    start = pd.Timestamp(start or PERIOD_START).strftime('%Y-%m-%d %H:%M:%S')
+    end = pd.Timestamp(end or PERIOD_END).strftime('%Y-%m-%d %H:%M:%S')
+    return start, end
+
+
+def query(version, sql, params=()):
+    path = ingest(version)
+    con = _connect(path)
+    try:
+        cursor = con.execute(sql, list(params))
+        columns = [d[0] for d in cursor.description]
+        return pd.DataFrame(cursor.fetchall(), columns=columns)
+    finally:
+        con.close()
+
+
+_DATE = "substr(created_at, 1, 10)"
+_RANGE = "created_at >= ? AND created_at <= ?"
+
+
+@cached
+def daily_counts(version, start=None, end=None):
+    df = query(version, f"SELECT {_DATE} AS date, COUNT(*) AS count FROM tweets WHERE {_RANGE} GROUP BY 1 ORDER BY 1",
+               _bounds(start, end))
+    df['date'] = pd.to_datetime(df['date']).dt.date
+    return df
+
+
+@cached
+def daily_engagement(version, start=None, end=None):
+    df = query(version, f"""
+        SELECT {_DATE} AS date, SUM(favorite_count) AS likes, SUM(retweet_count) AS retweets
+        FROM tweets WHERE {_RANGE} GROUP BY 1 ORDER BY 1""", _bounds(start, end))
+    df['date'] = pd.to_datetime(df['date']).dt.date
+    return df
+
+
+@cached
+def sentiment_counts(version, start=None, end=None):
+    df = query(version, f"""
+        SELECT sentiment, COUNT(*) AS count FROM tweets WHERE {_RANGE}
+        GROUP BY 1 ORDER BY 2 DESC""", _bounds(start, end))
+    return df.set_index('sentiment')['count'].rename_axis(None)
+
+
+@cached
+def sentiment_daily(version, start=None, end=None):
+    df = query(version, f"""
+        SELECT {_DATE} AS date, sentiment, COUNT(*) AS count FROM tweets WHERE {_RANGE}
+        GROUP BY 1, 2 ORDER BY 1, 2""", _bounds(start, end))
+    df['date'] = pd.to_datetime(df['date']).dt.date
+    return df
+
+
+@cached
+def filtered_tweets(version, search_term='', min_engagement=0, start=None, end=None):
+    # Literal substring search (LIKE with escaped wildcards; SQLite folds case
+    # for ASCII only), rows ordered by total engagement
+    sql = f"""
+        SELECT *, favorite_count + retweet_count AS total_engagement
+        FROM tweets WHERE {_RANGE} AND favorite_count + retweet_count >= ?"""
+    params = [*_bounds(start, end), min_engagement]
+    if search_term:
+        sql += " AND lower(full_text) LIKE ? ESCAPE '\\'"
+        escaped = search_term.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        params.append(f"%{escaped}%")
+    df = query(version, sql + " ORDER BY total_engagement DESC", params)
+    df['created_at'] = pd.to_datetime(df['created_at'])
+    return df.drop(columns='sentiment')
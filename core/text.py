@@ -0,0 +1,110 @@
+import re
+from collections import Counter
+from itertools import combinations, repeat
+
+import pandas as pd
+
+from core.cache import cached
+
+STOPWORDS = {'the', 'and', 'for', 'are', 'with', 'this', 'that', 'from', 'was', 'has', 'have',
+             'been', 'not', 'but', 'can', 'will', 'all', 'more', 'https', 'com', 'via', 'new', 'get', 'one', 'now', 'use'}
+
+NEGATIVE_WORDS = ['attack', 'malicious', 'hack', 'breach', 'vulnerable', 'threat', 'risk', 'danger', 'compromised', 'exploit', 'malware', 'worm']
+POSITIVE_WORDS = ['safe', 'secure', 'protect', 'fix', 'patch', 'solution', 'resolved', 'update', 'defend']
+
+CATEGORIES = {
+    'Security': ['security', 'malicious', 'attack', 'vulnerability', 'threat', 'breach', 'exploit', 'malware', 'worm'],
+    'Technical': ['npm', 'package', 'node', 'javascript', 'code', 'library', 'dependency', 'install', 'version'],
+    'Supply Chain': ['supply', 'chain', 'dependencies', 'upstream', 'downstream'],
+    'Action': ['update', 'fix', 'patch', 'remove', 'check', 'scan', 'monitor', 'protect']
+}
+# First listed category wins for words that appear in more than one
+CATEGORY_OF = {}
+for _cat, _words in CATEGORIES.items():
+    for _word in _words:
+        CATEGORY_OF.setdefault(_word, _cat)
+
+_NOISE_RE = re.compile(r'http\S+|www\S+|@\S+|#\S+')
+_TOKEN_RE = re.compile(r'\b[a-z]{3,}\b')
+HASHTAG_RE = re.compile(r'#(\w+)')
+
+
+def tokenize(text):
+    if pd.isna(text):
+        return []
+    text = _NOISE_RE.sub('', str(text).lower())
+    return _TOKEN_RE.findall(text)
+
+
+def keywords_of(text):
+    return [w for w in tokenize(text) if w not in STOPWORDS]
+
+
+def hashtags_of(text):
+    if pd.isna(text):
+        return []
+    return [tag.lower() for tag in HASHTAG_RE.findall(str(text))]
+
+
+def classify_sentiment(text):
+    if pd.isna(text):
+        return 'Netral'
+    text = str(text).lower()
+    neg_count = sum(1 for word in NEGATIVE_WORDS if word in text)
+    pos_count = sum(1 for word in POSITIVE_WORDS if word in text)
+    if neg_count > pos_count:
+        return 'Negatif'
+    elif pos_count > neg_count:
+        return 'Positif'
+    return 'Netral'
+
+
+def _weighted(texts, weights):
+    # Each tweet counts `weight` times, e.g. its stratum weight in a sample
+    return zip(texts, repeat(1) if weights is None else weights)
+
+
+@cached
+def extract_keywords(texts, top_n=15, weights=None):
+    counts = Counter()
+    for text, weight in _weighted(texts, weights):
+        for word in keywords_of(text):
+            counts[word] += weight
+    return [(word, round(count)) for word, count in counts.most_common(top_n)]
+
+
+@cached
+def categorize_keywords(keywords_list):
+    categorized = {cat: [] for cat in CATEGORIES}
+    uncategorized = []
+
+    for word, freq in keywords_list:
+        cat = CATEGORY_OF.get(word)
+        if cat is None:
+            uncategorized.append((word, freq))
+        else:
+            categorized[cat].append((word, freq))
+
+    return categorized, uncategorized
+
+
+@cached
+def extract_keyword_cooccurrence(texts, top_keywords, top_n=10, weights=None):
+    keyword_set = set([k[0] for k in top_keywords])
+    cooccurrence = Counter()
+
+    for text, weight in _weighted(texts, weights):
+        found_keywords = set(tokenize(text)) & keyword_set
+        if len(found_keywords) >= 2:
+            for pair in combinations(sorted(found_keywords), 2):
+                cooccurrence[pair] += weight
+
+    return [(pair, round(count)) for pair, count in cooccurrence.most_common(top_n)]
+
+
+@cached
+def extract_hashtags(texts):
+    all_hashtags = []
+    for text in texts.dropna():
+        all_hashtags.extend(hashtags_of(text))
+    return Counter(all_hashtags).most_common(15)
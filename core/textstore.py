@@ -0,0 +1,148 @@
+import mmap
+import os
+import shutil
+import threading
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAP_DIR = Path(os.environ.get('DASHBOARD_TEXT_HEAP_DIR', ROOT / '.textheap'))
+# Wide string columns kept out of the analytical frames
+TEXT_COLUMNS = ['full_text', 'image_url', 'tweet_url']
+BLOCK_ROWS = 256
+BATCH_ROWS = 20_000
+# Snapshots whose heaps are kept on disk: the served one and the one warming
+KEEP_VERSIONS = 2
+
+
+def encode_block(values):
+    # int32 byte length per row (-1 for missing) followed by the UTF-8 bytes
+    encoded = [None if pd.isna(value) else str(value).encode('utf-8') for value in values]
+    lengths = np.array([-1 if raw is None else len(raw) for raw in encoded], dtype=np.int32)
+    return zlib.compress(lengths.tobytes() + b''.join(raw for raw in encoded if raw is not None))
+
+
+def decode_block(payload, count):
+    raw = zlib.decompress(payload)
+    lengths = np.frombuffer(raw, dtype=np.int32, count=count).tolist()
+    values, position = [], 4 * count
+    for length in lengths:
+        if length < 0:
+            values.append(None)
+        else:
+            values.append(raw[position:position + length].decode('utf-8'))
+            position += length
+    return values
+
+
+def write_column(path, values):
+    offsets = [0]
+    with open(path, 'wb') as f:
+        for start in range(0, len(values), BLOCK_ROWS):
+            offsets.append(offsets[-1] + f.write(encode_block(values[start:start + BLOCK_ROWS])))
+    return np.array(offsets, dtype=np.int64)
+
+
+def heap_path(version):
+    return HEAP_DIR / version
+
+
+def build(version, df):
+    # Written once per snapshot into a temp directory and swapped in; when
+    # another process finished first its copy is kept
+    directory = heap_path(version)
+    if (directory / 'index.npz').exists():
+        return directory
+    columns = [column for column in TEXT_COLUMNS if column in df.columns]
+    tmp = directory.with_name(f"{directory.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    offsets = {column: write_column(tmp / f"{column}.heap", df[column].to_numpy(dtype=object)) for column in columns}
+    np.savez(tmp / 'index.npz', ids=df.index.to_numpy(), source_columns=np.array(df.columns, dtype=str), **offsets)
+    try:
+        os.replace(tmp, directory)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+    prune(keep=directory)
+    return directory
+
+
+def prune(keep, versions=KEEP_VERSIONS):
+    # Open heaps stay readable after their files are unlinked
+    heaps = sorted((path for path in HEAP_DIR.iterdir() if path.is_dir() and not path.name.endswith('.tmp')),
+                   key=lambda path: path.stat().st_mtime, reverse=True)
+    for path in [path for path in heaps if path != keep][versions - 1:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+class TextHeap:
+    # Read-only view of one snapshot's text columns. Blocks are decompressed
+    # only when a row in them is asked for; the mapped files live in the OS
+    # page cache, shared by every process serving the same snapshot
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        index = np.load(self.directory / 'index.npz')
+        self.ids = pd.Index(index['ids'])
+        self.offsets = {name: index[name] for name in index.files if name not in ('ids', 'source_columns')}
+        # Column order of the ingested files, for exports that put the text back
+        self.source_columns = index['source_columns'].tolist() if 'source_columns' in index.files else []
+        self._maps = {}
+        for column in self.offsets:
+            with open(self.directory / f"{column}.heap", 'rb') as f:
+                self._maps[column] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if len(self.ids) else b''
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __reduce__(self):
+        return TextHeap, (self.directory,)
+
+    def __deepcopy__(self, memo):
+        return self
+
+    @property
+    def columns(self):
+        return list(self.offsets)
+
+    def _block(self, column, block):
+        offsets = self.offsets[column]
+        count = min(BLOCK_ROWS, len(self.ids) - block * BLOCK_ROWS)
+        return decode_block(self._maps[column][offsets[block]:offsets[block + 1]], count)
+
+    def take(self, column, positions):
+        positions = np.asarray(positions, dtype=np.int64)
+        values = np.empty(len(positions), dtype=object)
+        blocks = positions // BLOCK_ROWS
+        order = np.argsort(blocks, kind='stable')
+        needed, starts = np.unique(blocks[order], return_index=True)
+        for block, rows in zip(needed.tolist(), np.split(order, starts[1:])):
+            decoded = self._block(column, block)
+            values[rows] = [decoded[i] for i in (positions[rows] - block * BLOCK_ROWS).tolist()]
+        return values
+
+    def get(self, column, ids):
+        # Text of the given row ids, in that order
+        ids = pd.Index(ids)
+        positions = self.ids.get_indexer(ids)
+        if (positions < 0).any():
+            raise KeyError(f"{int((positions < 0).sum())} row id(s) not in text heap {self.directory.name}")
+        return pd.Series(self.take(column, positions), index=ids, name=column, dtype='str')
+
+    def batches(self, column, ids=None, rows=BATCH_ROWS):
+        # Stream a column (or the given row ids, in that order) without
+        # materializing all of it
+        ids = self.ids if ids is None else pd.Index(ids)
+        for start in range(0, len(ids), rows):
+            yield self.get(column, ids[start:start + rows])
+
+    def contains(self, column, ids, term, case=False, regex=False):
+        parts = [batch.str.contains(term, case=case, na=False, regex=regex).to_numpy()
+                 for batch in self.batches(column, ids)]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=bool)
+
+    def nbytes(self):
+        return sum(len(mapped) for mapped in self._maps.values())
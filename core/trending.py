@@ -0,0 +1,229 @@
+import copy
+import hashlib
+import heapq
+import math
+import threading
+from collections import deque
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+from core.cache import cached
+from core.data import read_dataset, text_batches
+from core.text import keywords_of
+
+UNITS = {'H': 'h', 'D': 'D', 'W': 'W-MON'}
+# Buckets kept per snapshot engine; covers every window + baseline the pages offer
+RETAIN_BUCKETS = 32
+
+
+class SpaceSaving:
+    # Space-Saving heavy hitters: at most `capacity` counters, every true
+    # top item is kept and its count is overestimated by at most `error`
+    def __init__(self, capacity=200):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self._heap = []
+
+    def __len__(self):
+        return len(self.counts)
+
+    def _push(self, item):
+        heapq.heappush(self._heap, (self.counts[item], item))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, key) for key, count in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == count:
+                return item
+
+    def add(self, item, weight=1):
+        if item in self.counts:
+            self.counts[item] += weight
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = weight
+            self.errors[item] = 0
+        else:
+            victim = self._pop_min()
+            floor = self.counts.pop(victim)
+            del self.errors[victim]
+            self.counts[item] = floor + weight
+            self.errors[item] = floor
+        self._push(item)
+
+    def update(self, items):
+        for item in items:
+            self.add(item)
+
+    def floor(self):
+        # Most an item this sketch does not hold can have occurred in it: only
+        # a full sketch has evicted anything
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def merge(self, other):
+        merged = SpaceSaving(max(self.capacity, other.capacity))
+        # An item missing from one side is charged that side's floor, in both
+        # its count and its error, so counts stay upper bounds after merging
+        floor, other_floor = self.floor(), other.floor()
+        counts, errors = {}, {}
+        for item in {**self.counts, **other.counts}:
+            counts[item] = self.counts.get(item, floor) + other.counts.get(item, other_floor)
+            errors[item] = self.errors.get(item, floor) + other.errors.get(item, other_floor)
+        for item in heapq.nlargest(merged.capacity, counts, key=counts.__getitem__):
+            merged.counts[item] = counts[item]
+            merged.errors[item] = errors[item]
+        merged._heap = [(count, item) for item, count in merged.counts.items()]
+        heapq.heapify(merged._heap)
+        return merged
+
+    def top(self, n):
+        return heapq.nlargest(n, self.counts.items(), key=lambda kv: (kv[1], kv[0]))
+
+
+class TrendingEngine:
+    # Sliding window of per-bucket sketches fed in timestamp order. Only the
+    # last `window + baseline` buckets (or `retain`, if larger) are kept, so
+    # memory stays bounded however long the crawl is.
+    def __init__(self, unit='D', window=1, baseline=7, capacity=200, retain=None):
+        self.unit = unit
+        self.window = window
+        self.baseline = baseline
+        self.capacity = capacity
+        self.buckets = deque(maxlen=max(window + baseline, retain or 0))
+        self.current = None
+
+    def _bucket_of(self, timestamp):
+        return pd.Timestamp(timestamp).to_period(UNITS[self.unit]).start_time
+
+    def _advance(self, bucket):
+        if self.current is not None and bucket < self.current:
+            raise ValueError("Tweets must be added in timestamp order")
+        if bucket == self.current:
+            return
+        # Empty buckets still count towards the baseline
+        if self.current is not None:
+            step = pd.tseries.frequencies.to_offset(UNITS[self.unit])
+            gap, filled = self.current + step, 0
+            while gap < bucket and filled < self.buckets.maxlen:
+                self.buckets.append((gap, SpaceSaving(self.capacity)))
+                gap += step
+                filled += 1
+        self.buckets.append((bucket, SpaceSaving(self.capacity)))
+        self.current = bucket
+
+    def add(self, timestamp, terms):
+        self._advance(self._bucket_of(timestamp))
+        self.buckets[-1][1].update(terms)
+
+    def feed(self, timestamps, texts):
+        # Bulk ingest of an already time-ordered batch
+        buckets = bucket_starts(timestamps, self.unit)
+        for bucket, text in zip(buckets, texts):
+            self._advance(bucket)
+            self.buckets[-1][1].update(keywords_of(text))
+
+    def trending(self, top_n=15, window=None, baseline=None):
+        # Any window + baseline up to the retained length, without refeeding
+        window = window or self.window
+        baseline = baseline or self.baseline
+        if window + baseline > self.buckets.maxlen:
+            raise ValueError(f"only {self.buckets.maxlen} buckets are retained")
+        if not self.buckets:
+            return pd.DataFrame(columns=['term', 'recent', 'baseline', 'burst'])
+        buckets = list(self.buckets)[-(window + baseline):]
+        recent_part, base_part = buckets[-window:], buckets[:-window]
+
+        recent = SpaceSaving(self.capacity)
+        for _, sketch in recent_part:
+            recent = recent.merge(sketch)
+        base = SpaceSaving(self.capacity)
+        for _, sketch in base_part:
+            base = base.merge(sketch)
+
+        base_buckets = max(len(base_part), 1)
+        rows = []
+        for term, count in recent.top(self.capacity):
+            recent_rate = count / len(recent_part)
+            base_rate = base.counts.get(term, 0) / base_buckets
+            burst = (recent_rate - base_rate) / math.sqrt(base_rate + 1)
+            rows.append({'term': term, 'recent': count, 'baseline': round(base_rate, 2), 'burst': round(burst, 2)})
+        result = pd.DataFrame(rows, columns=['term', 'recent', 'baseline', 'burst'])
+        return result.sort_values(['burst', 'recent'], ascending=False).head(top_n).reset_index(drop=True)
+
+
+def bucket_starts(timestamps, unit='D'):
+    return timestamps.dt.to_period(UNITS[unit]).dt.start_time
+
+
+def stream_buckets(timestamps, texts, unit='D', capacity=200, weights=None):
+    # Yield (bucket_start, sketch) per bucket, processing tweets in timestamp
+    # order; `weights` (e.g. a sample's stratum weights) scale each tweet's terms
+    order = timestamps.argsort(kind='stable')
+    buckets = bucket_starts(timestamps.iloc[order], unit)
+    weights = repeat(1) if weights is None else weights.iloc[order]
+    current, sketch = None, None
+    for bucket, text, weight in zip(buckets, texts.iloc[order], weights):
+        if bucket != current:
+            if sketch is not None:
+                yield current, sketch
+            current, sketch = bucket, SpaceSaving(capacity)
+        for term in keywords_of(text):
+            sketch.add(term, weight)
+    if sketch is not None:
+        yield current, sketch
+
+
+@cached
+def extract_keywords_temporal(df, top_n=10):
+    # Daily top terms from a bounded sketch per day instead of a full Counter
+    daily_keywords = {}
+    for bucket, sketch in stream_buckets(df['created_at'], df['full_text'], 'D', weights=df.get('weight')):
+        daily_keywords[bucket.date()] = [(term, round(count)) for term, count in sketch.top(top_n)]
+    return daily_keywords
+
+
+_engines_lock = threading.Lock()
+_engines = {}
+
+
+def fed_fingerprint(df, until):
+    # Identifies the tweets up to `until`; unchanged means a new snapshot only
+    # appended later tweets
+    ids = np.sort(df.loc[df['created_at'] <= until, 'id'].to_numpy())
+    return hashlib.blake2b(ids.tobytes(), digest_size=16).hexdigest()
+
+
+@cached
+def trend_engine(version, unit='D'):
+    # Bucket sketches built once per snapshot and unit. A snapshot that only
+    # appends newer tweets extends a copy of the previous engine with add()
+    # instead of re-reading the corpus text.
+    df = read_dataset(version).sort_values('created_at', kind='stable')
+    with _engines_lock:
+        previous = _engines.get(unit)
+    if previous is not None and fed_fingerprint(df, previous['until']) == previous['fingerprint']:
+        engine = copy.deepcopy(previous['engine'])
+        new = df[df['created_at'] > previous['until']]
+        for texts in text_batches(version, ids=new.index):
+            for timestamp, text in zip(new['created_at'].loc[texts.index], texts):
+                engine.add(timestamp, keywords_of(text))
+    else:
+        engine = TrendingEngine(unit, retain=RETAIN_BUCKETS)
+        for texts in text_batches(version, ids=df.index):
+            engine.feed(df['created_at'].loc[texts.index], texts)
+    if len(df):
+        until = df['created_at'].iloc[-1]
+        with _engines_lock:
+            _engines[unit] = {'engine': engine, 'until': until, 'fingerprint': fed_fingerprint(df, until)}
+    return engine
+
+
+@cached
+def trending_keywords(version, unit='D', window=1, baseline=7, top_n=15):
+    engine = trend_engine(version, unit)
+    return {'as_of': engine.current, 'terms': engine.trending(top_n, window, baseline)}
@@ -0,0 +1,141 @@
+import contextlib
+import time
+from datetime import timedelta
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from core import cache, data, warmup
+from core.dedup import collapse_near_duplicates, near_duplicate_clusters
+from core.sampling import stratified_sample
+
+
+def _waiting_spinner(flight):
+    # Sessions that hit a computation already running elsewhere wait on it
+    # instead of starting their own; tell them what they are waiting for
+    if get_script_run_ctx() is None:
+        return contextlib.nullcontext()
+    return st.spinner(f"⏳ Menunggu perhitungan {flight.name} yang sedang berjalan "
+                      f"({flight.waiters} sesi menunggu)...", show_time=True)
+
+
+cache.set_wait_hook(_waiting_spinner)
+
+
+def wait_for_warmup(poll_seconds=1.0):
+    # Hold the page on a placeholder until the shared warm-up has filled the
+    # caches, instead of every early session computing the cold path itself.
+    # A failed warm-up falls back to computing on demand.
+    placeholder = st.empty()
+    while not warmup.is_ready() and not warmup.status()['error']:
+        step = warmup.status()['step'] or 'menunggu'
+        placeholder.info(f"⏳ Dashboard sedang menyiapkan data ({step}). Halaman tampil otomatis setelah siap.")
+        time.sleep(poll_seconds)
+    placeholder.empty()
+
+
+def collapse_toggle():
+    return st.sidebar.checkbox(
+        "🧬 Gabungkan tweet hampir identik", key='collapse_duplicates',
+        help="Tweet templated/copy-paste (MinHash-LSH) dihitung sekali sebelum analisis kata kunci dan sentimen")
+
+
+def approximate_toggle():
+    return st.sidebar.checkbox(
+        "⚡ Mode perkiraan (sampel)", key='approximate',
+        help="Hitung dari sampel reservoir berstrata (hari × bahasa) dengan interval kepercayaan 95%; matikan untuk hasil eksak")
+
+
+def margin_caption(margin, sampled, fmt=',.0f'):
+    st.caption(f"± {margin:{fmt}} (IK 95%, {len(sampled['sample']):,} sampel)")
+
+
+def page_frame(approximate, collapsed=False):
+    # The served snapshot, or in approximate mode only the sample stored at
+    # ingestion, with `stratum` and `weight` columns. Collapsing keeps one tweet
+    # per near-duplicate cluster; on the sample, the rows that are their
+    # cluster's earliest tweet in the whole snapshot, so the weights still apply
+    version = data.served_version()
+    if approximate:
+        sampled = stratified_sample(version)
+        df = sampled['sample']
+        if collapsed:
+            df = df[near_duplicate_clusters(version)['representative'].reindex(df.index).to_numpy()]
+        return df, sampled
+    df = data.load_data()
+    if collapsed:
+        df = collapse_near_duplicates(df, near_duplicate_clusters(version))
+    return df, None
+
+
+def sample_caption(sampled):
+    st.caption(f"⚡ Mode perkiraan: dihitung dari {len(sampled['sample']):,} sampel berstrata "
+               f"atas {sampled['rows']:,} tweet; angka adalah estimasi populasi")
+
+
+def period_comparison(df):
+    # Two date ranges for the comparison mode, or None when it is off
+    if not st.sidebar.checkbox("🔀 Bandingkan dua periode", key='compare_periods',
+                               help="Hitung metrik dua rentang tanggal berdampingan dari agregat harian"):
+        return None
+    first, last = df['created_at'].min().date(), df['created_at'].max().date()
+    b_start = max(first, last - timedelta(days=6))
+    a_start = max(first, b_start - timedelta(days=7))
+    period_a = st.sidebar.date_input("Periode A", value=(a_start, b_start - timedelta(days=1)),
+                                     min_value=first, max_value=last, key='period_a')
+    period_b = st.sidebar.date_input("Periode B", value=(b_start, last),
+                                     min_value=first, max_value=last, key='period_b')
+    if len(period_a) < 2 or len(period_b) < 2:
+        st.sidebar.caption("Pilih tanggal awal dan akhir untuk kedua periode.")
+        return None
+    return tuple(period_a), tuple(period_b)
+
+
+def period_label(summary):
+    return f"{summary['start']:%d %b} – {summary['end']:%d %b %Y}"
+
+
+def render_sidebar(df, total=None):
+    # `total` overrides len(df) when df is only a sample of the snapshot
+    total = len(df) if total is None else total
+    st.sidebar.info(f"**Periode:** Sep - Nov 2025\n**Total Data:** {total:,} tweets")
+
+    state = warmup.status()
+    if state['error']:
+        st.sidebar.warning(f"⚠️ Warm-up cache gagal: {state['error']}")
+    elif not warmup.is_ready():
+        step = state['step'] or 'menunggu'
+        st.sidebar.caption(f"⏳ Menyiapkan cache ({step})...")
+
+    snapshot = data.snapshot_info()
+    if snapshot['modified_at'] is not None:
+        st.sidebar.caption(f"📦 Snapshot data: {snapshot['modified_at']:%d/%m/%Y %H:%M}")
+    if snapshot['pending']:
+        st.sidebar.caption("🔄 Versi dataset baru sedang diproses di latar belakang")
+
+    summary = data.source_aggregates(data.served_version())
+    if not summary.empty:
+        with st.sidebar.expander(f"🗂️ Sumber Query ({len(summary)})", expanded=True):
+            table = summary[['tweets', 'exclusive', 'total_engagement', 'avg_engagement']].round(1)
+            st.dataframe(table.rename(columns={'tweets': 'Tweet', 'exclusive': 'Eksklusif',
+                                               'total_engagement': 'Engagement', 'avg_engagement': 'Rata-rata'}),
+                         width='stretch')
+            overlap = data.source_overlap(data.served_version())
+            st.caption(f"{overlap:,} tweet ditemukan oleh lebih dari satu query (dihitung sekali)")
+
+    with st.sidebar.expander("🧮 Statistik Cache"):
+        stats = pd.DataFrame(cache.stats())
+        if stats.empty:
+            st.caption("Belum ada fungsi ter-cache.")
+        else:
+            stats['MB'] = (stats['bytes'] / cache.MB).round(2)
+            stats['hit_rate'] = (stats['hit_rate'] * 100).round(1)
+            st.dataframe(stats[['function', 'entries', 'MB', 'hit_rate', 'evictions', 'coalesced', 'oversize']],
+                         hide_index=True, width='stretch')
+            if stats['oversize'].any():
+                st.caption("⚠️ Sebagian hasil melebihi anggaran cache-nya dan dihitung ulang setiap kali")
+            st.caption(f"Total memori cache: {stats['MB'].sum():.1f} MB")
+        for flight in cache.in_flight():
+            st.caption(f"⏳ {flight['function']} sedang dihitung ({flight['seconds']:.1f}s, "
+                       f"{flight['waiters']} sesi menunggu)")
@@ -0,0 +1,140 @@
+import logging
+import threading
+import time
+
+from core import accounts, anomaly, api, cardinality, compare, data, dedup, graph, hashtags, locations, matcher, postings, pyramid, ranking, sampling, sqlstore, text, trending
+
+POLL_SECONDS = 30
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_thread = None
+_state = {'version': None, 'ready': False, 'step': None, 'error': None, 'warmed': None, 'finished_at': None}
+
+
+def _set(**fields):
+    with _lock:
+        _state.update(fields)
+
+
+def status():
+    with _lock:
+        return dict(_state)
+
+
+def is_ready():
+    state = status()
+    return state['warmed'] == data.served_version()
+
+
+def _warm_frame(df, version):
+    texts = data.load_texts(df, version=version)
+
+    _set(step='keywords')
+    keywords = text.extract_keywords(texts, top_n=20)
+    text.categorize_keywords(keywords)
+
+    _set(step='co-occurrence')
+    text.extract_keyword_cooccurrence(texts, keywords, top_n=15)
+
+    _set(step='temporal')
+    trending.extract_keywords_temporal(df[['created_at']].assign(full_text=texts), top_n=5)
+
+    _set(step='hashtags')
+    text.extract_hashtags(texts)
+
+
+def warm(version):
+    # Call every cached function with exactly the arguments the pages use,
+    # so the first real session only hits warm entries. Cache entries have no
+    # TTL, so they stay warm until a new snapshot replaces them. The previous
+    # snapshot stays active until this finishes.
+    _set(version=version, ready=False, step='dataset', error=None)
+    df = data.read_dataset(version)
+    data.source_aggregates(version)
+    data.source_overlap(version)
+    data.text_heap(version)
+
+    _set(step='sentiment')
+    matcher.tweet_lexicon_hits(version)
+
+    # Sentimen and Kata Kunci can run on the frame with near-duplicates collapsed
+    _set(step='near-duplicates')
+    clusters = dedup.near_duplicate_clusters(version)
+    for frame in (df, dedup.collapse_near_duplicates(df, clusters)):
+        _warm_frame(frame, version)
+
+    trending.trending_keywords(version, unit='D', window=1, baseline=7)
+
+    _set(step='topics')
+    matcher.category_daily(version)
+
+    _set(step='locations')
+    locations.location_index(version)
+
+    _set(step='keyword postings')
+    postings.term_index(version)
+    postings.row_features(version)
+    compare.daily_buckets(version)
+
+    if sqlstore.enabled():
+        _set(step='database')
+        for aggregate in (sqlstore.daily_counts, sqlstore.daily_engagement,
+                          sqlstore.sentiment_counts, sqlstore.sentiment_daily, sqlstore.filtered_tweets):
+            aggregate(version)
+
+    _set(step='trend pyramid')
+    first, last = data.snapshot_span(version)
+    pyramid.trend_window(version, first.floor('h').to_pydatetime(), last.ceil('h').to_pydatetime())
+
+    _set(step='anomalies')
+    anomaly.spike_intervals(version)
+
+    _set(step='sample')
+    sampling.stratified_sample(version)
+
+    _set(step='rankings')
+    ranking.ranking_index(version)
+
+    _set(step='accounts')
+    for by in ('total_engagement', 'tweets', 'avg_engagement'):
+        accounts.top_accounts(version, by=by, n=10)
+
+    _set(step='hashtags')
+    hashtags.top_hashtags(version, n=15)
+    hashtags.top_hashtags(version, by='avg_engagement', n=200)
+
+    _set(step='conversations')
+    graph.conversation_graph(version)
+
+    _set(step='distinct counts')
+    for field in ('words', 'users', 'hashtags'):
+        cardinality.count_distinct(version, field)
+
+    data.activate(version)
+    _set(ready=True, step=None, warmed=version, finished_at=time.time())
+
+
+def _run():
+    while True:
+        version = data.dataset_version()
+        state = status()
+        if version != state['version'] or (not state['ready'] and state['error']):
+            try:
+                warm(version)
+            except Exception as exc:
+                logger.exception("Cache warm-up failed")
+                _set(error=str(exc), step=None)
+        time.sleep(POLL_SECONDS)
+
+
+def ensure_started():
+    # One watcher per server process; reruns and new sessions reuse it
+    global _thread
+    with _lock:
+        if _thread is not None and _thread.is_alive():
+            return
+        _thread = threading.Thread(target=_run, name='cache-warmup', daemon=True)
+        _thread.start()
+    api.ensure_started()
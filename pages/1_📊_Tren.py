@@ -3,26 +3,69 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from datetime import timedelta
+
+from core import sqlstore, warmup
+from core.anomaly import spike_intervals
+from core.compare import compare_periods
+from core.data import served_version, snapshot_span
+from core.pyramid import trend_window
+from core.sampling import weighted_size
+from core.ui import approximate_toggle, page_frame, period_comparison, period_label, render_sidebar, sample_caption, wait_for_warmup
 
 st.set_page_config(page_title="Tren", page_icon="📊", layout="wide")
 
-@st.cache_data
-def load_data():
-    df = pd.read_csv('dataset.csv')
-    df['created_at'] = pd.to_datetime(df['created_at'])
-    df = df[(df['created_at'] >= '2025-09-01') & (df['created_at'] <= '2025-11-30')]
-    return df
+warmup.ensure_started()
+wait_for_warmup()
 
-df = load_data()
+approximate = approximate_toggle()
+# On the sample every count below is weighted; daily totals stay exact, since
+# each day's strata are scaled by their true sizes
+df, sampled = page_frame(approximate)
 
-st.sidebar.info(f"**Periode:** Sep - Nov 2025\n**Total Data:** {len(df):,} tweets")
+render_sidebar(df, total=sampled['rows'] if approximate else None)
+periods = period_comparison(df)
+if periods:
+    period_a, period_b = compare_periods(served_version(), *periods)
 
 st.title("📊 Tren")
 st.caption("Analisis pola waktu diskusi publik terkait NPM Supply Chain Attack")
+if approximate:
+    sample_caption(sampled)
 st.markdown("---")
 
-daily_counts = df.groupby(df['created_at'].dt.date).size().reset_index()
-daily_counts.columns = ['date', 'count']
+if periods:
+    st.markdown("### 🔀 Perbandingan Periode")
+    st.markdown(f"**A:** {period_label(period_a)} &nbsp;&nbsp; vs &nbsp;&nbsp; **B:** {period_label(period_b)}")
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Total Tweet (B)", f"{period_b['tweets']:,}", delta=f"{period_b['tweets'] - period_a['tweets']:+,}")
+    with col2:
+        st.metric("Tweet per Hari (B)", f"{period_b['per_day']:.1f}", delta=f"{period_b['per_day'] - period_a['per_day']:+.1f}")
+    with col3:
+        st.metric("Pengguna Unik (B)", f"{period_b['users']:,}", delta=f"{period_b['users'] - period_a['users']:+,}")
+    with col4:
+        peak_a = period_a['daily'].max() if len(period_a['daily']) else 0
+        peak_b = period_b['daily'].max() if len(period_b['daily']) else 0
+        st.metric("Puncak Harian (B)", f"{peak_b:,}", delta=f"{peak_b - peak_a:+,}")
+
+    # Both periods on a shared "day N" axis so their shapes line up
+    overlay = pd.concat([
+        pd.DataFrame({'Hari ke-': range(1, len(s['daily']) + 1), 'Jumlah Tweet': s['daily'].to_numpy(), 'Periode': name})
+        for name, s in (('A', period_a), ('B', period_b))
+    ])
+    fig = px.line(overlay, x='Hari ke-', y='Jumlah Tweet', color='Periode', markers=True,
+                  color_discrete_map={'A': '#95a5a6', 'B': '#1f77b4'}, title='Volume Harian: Periode A vs B')
+    fig.update_layout(height=400)
+    st.plotly_chart(fig, width='stretch')
+    st.markdown("---")
+
+if sqlstore.enabled() and not approximate:
+    daily_counts = sqlstore.daily_counts(served_version())
+else:
+    daily_counts = weighted_size(df, df['created_at'].dt.date).reset_index()
+    daily_counts.columns = ['date', 'count']
 
 # Chart 1: Line Chart
 st.markdown("### 📈 Tren Volume Tweet Harian")
@@ -39,6 +82,9 @@ fig = px.line(daily_counts, x='date', y='count',
               labels={'date': 'Tanggal', 'count': 'Jumlah Tweet'},
               title='Volume Tweet Harian')
 fig.update_traces(line_color='#1f77b4', line_width=2.5)
+spikes = spike_intervals(served_version())
+for _, spike in spikes[spikes['metric'] == 'volume'].iterrows():
+    fig.add_vrect(x0=spike['start'], x1=spike['end'], fillcolor='#e74c3c', opacity=0.25, line_width=0)
 fig.update_layout(hovermode='x unified', height=600)
 st.plotly_chart(fig, width='stretch')
 
@@ -59,6 +105,43 @@ untuk memitigasi dampak serangan supply chain di masa depan.
 
 st.markdown("---")
 
+# Chart 1b: Spike Detection
+st.markdown("### 🚨 Deteksi Lonjakan Otomatis")
+
+col1, col2 = st.columns([3, 1])
+with col1:
+    st.markdown("**🎯 Tujuan:** Menandai jam-jam dengan lonjakan volume, engagement, atau proporsi sentimen negatif yang tidak wajar")
+    st.markdown("**🔬 Metode:** EWMA z-score per jam dengan baseline musiman (jam dalam seminggu), update O(1) per jam baru")
+with col2:
+    st.metric("Interval Lonjakan", f"{len(spikes)}")
+    st.caption("Ditandai merah pada grafik volume harian")
+
+if not spikes.empty:
+    st.dataframe(
+        spikes[['label', 'start', 'end', 'peak_z', 'peak_value', 'provisional']],
+        width='stretch',
+        hide_index=True,
+        column_config={
+            "label": "Metrik",
+            "start": st.column_config.DatetimeColumn("Mulai", format="DD/MM/YYYY HH:mm"),
+            "end": st.column_config.DatetimeColumn("Selesai", format="DD/MM/YYYY HH:mm"),
+            "peak_z": st.column_config.NumberColumn("Z-score Puncak", format="%.1f"),
+            "peak_value": st.column_config.NumberColumn("Nilai Puncak", format="%.2f"),
+            "provisional": st.column_config.CheckboxColumn("Sementara"),
+        }
+    )
+    st.markdown(f"""
+    **📊 Hasil:**
+    - Lonjakan terkuat: **{spikes.loc[spikes['peak_z'].idxmax(), 'label']}** pada **{spikes.loc[spikes['peak_z'].idxmax(), 'start']}** (z = {spikes['peak_z'].max():.1f})
+
+    **💡 Insight:**
+    Interval yang ditandai adalah kandidat **momen kritis** (rilis advisory, laporan insiden baru) yang layak ditelusuri lebih lanjut.
+    """)
+else:
+    st.info("Tidak ada lonjakan signifikan yang terdeteksi.")
+
+st.markdown("---")
+
 # Chart 2: Weekly Bar
 st.markdown("### 📊 Volume Tweet per Minggu")
 
@@ -69,7 +152,7 @@ with col1:
 with col2:
     df_weekly = df.copy()
     df_weekly['week'] = df_weekly['created_at'].dt.to_period('W').astype(str)
-    weekly_counts = df_weekly.groupby('week').size().reset_index(name='count')
+    weekly_counts = weighted_size(df_weekly, 'week').reset_index(name='count')
     st.metric("Rata-rata Mingguan", f"{weekly_counts['count'].mean():.0f} tweet")
     st.caption(f"Total: {len(weekly_counts)} minggu")
 
@@ -131,18 +214,17 @@ with col1:
     st.markdown("**🎯 Tujuan:** Mengidentifikasi pola aktivitas berdasarkan jam dan hari dalam seminggu")
     st.markdown("**🔬 Metode:** Heatmap dengan agregasi hour-of-day vs day-of-week")
 with col2:
-    df_hourly = df.copy()
-    df_hourly['hour'] = df_hourly['created_at'].dt.hour
-    peak_hour = df_hourly['hour'].mode()[0]
+    hourly_counts = weighted_size(df, df['created_at'].dt.hour)
+    peak_hour = hourly_counts.idxmax()
     st.metric("Jam Paling Aktif", f"{peak_hour}:00")
-    st.caption(f"{len(df_hourly[df_hourly['hour']==peak_hour])} tweet")
+    st.caption(f"{hourly_counts[peak_hour]} tweet")
 
 df_heatmap = df.copy()
 df_heatmap['hour'] = df_heatmap['created_at'].dt.hour
 df_heatmap['day_name'] = df_heatmap['created_at'].dt.day_name()
 day_order_en = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
 day_order_id = ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu']
-heatmap_data = df_heatmap.groupby(['day_name', 'hour']).size().reset_index(name='count')
+heatmap_data = weighted_size(df_heatmap, ['day_name', 'hour']).reset_index(name='count')
 heatmap_pivot = heatmap_data.pivot(index='day_name', columns='hour', values='count').fillna(0)
 heatmap_pivot = heatmap_pivot.reindex(day_order_en)
 heatmap_pivot.index = day_order_id
@@ -158,7 +240,7 @@ st.plotly_chart(fig, width='stretch')
 
 st.markdown(f"""
 **📊 Hasil:**
-- Jam paling aktif: **{peak_hour}:00** dengan **{len(df_hourly[df_hourly['hour']==peak_hour])}** tweet
+- Jam paling aktif: **{peak_hour}:00** dengan **{hourly_counts[peak_hour]}** tweet
 - Pola menunjukkan aktivitas tertinggi pada jam kerja, mengindikasikan diskusi profesional
 
 **💡 Insight:**
@@ -178,7 +260,7 @@ with col1:
     
     df_monthly = df.copy()
     df_monthly['month'] = df_monthly['created_at'].dt.to_period('M').astype(str)
-    monthly_counts = df_monthly.groupby('month').size().reset_index(name='count')
+    monthly_counts = weighted_size(df_monthly, 'month').reset_index(name='count')
     
     fig = px.bar(monthly_counts, x='month', y='count',
                  labels={'month': 'Bulan', 'count': 'Jumlah Tweet'},
@@ -290,7 +372,7 @@ with col1:
     
     df_dow = df.copy()
     df_dow['day_name'] = df_dow['created_at'].dt.day_name()
-    dow_counts = df_dow.groupby('day_name').size().reset_index(name='count')
+    dow_counts = weighted_size(df_dow, 'day_name').reset_index(name='count')
     dow_counts['day_name'] = pd.Categorical(dow_counts['day_name'], 
                                             categories=day_order_en, 
                                             ordered=True)
@@ -316,7 +398,7 @@ with col2:
     st.markdown("**🔬 Metode:** Pie chart kategori hari")
     
     df_dow['is_weekend'] = df_dow['created_at'].dt.dayofweek.isin([5, 6])
-    weekend_counts = df_dow.groupby('is_weekend').size().reset_index(name='count')
+    weekend_counts = weighted_size(df_dow, 'is_weekend').reset_index(name='count')
     weekend_counts['category'] = weekend_counts['is_weekend'].map({True: 'Weekend', False: 'Weekday'})
     
     fig = px.pie(weekend_counts, values='count', names='category',
@@ -328,7 +410,7 @@ with col2:
     fig.update_layout(height=400)
     st.plotly_chart(fig, width='stretch')
     
-    weekday_pct = weekend_counts[weekend_counts['category']=='Weekday']['count'].values[0] / len(df) * 100
+    weekday_pct = weekend_counts[weekend_counts['category']=='Weekday']['count'].values[0] / weekend_counts['count'].sum() * 100
     st.markdown(f"""
     **📊 Hasil:**
     - Weekday: **{weekday_pct:.1f}%**
@@ -340,6 +422,56 @@ with col2:
 
 st.markdown("---")
 
+# Chart 9: Multi-resolution Zoom
+st.markdown("### 🔍 Zoom Tren Multi-Resolusi")
+
+col1, col2 = st.columns([3, 1])
+with col1:
+    st.markdown("**🎯 Tujuan:** Menelusuri lonjakan singkat hingga resolusi jam atau menit tanpa memuat data mentah")
+    st.markdown("**🔬 Metode:** Piramida rollup (menit, jam, hari, minggu) dengan resolusi dipilih sesuai rentang yang ditampilkan")
+
+# Bounds of the whole snapshot: the pyramid covers it even when only the sample is loaded
+first_tweet, last_tweet = snapshot_span(served_version())
+zoom_min = first_tweet.floor('h').to_pydatetime()
+zoom_max = last_tweet.ceil('h').to_pydatetime()
+zoom_start, zoom_end = st.slider("Rentang waktu:", min_value=zoom_min, max_value=zoom_max,
+                                 value=(zoom_min, zoom_max), step=timedelta(hours=1),
+                                 format="DD/MM/YY HH:mm")
+zoom = trend_window(served_version(), zoom_start, zoom_end)
+zoom_series = zoom['series']
+finer_label = {'min': 'menit', 'h': 'menit', 'D': 'jam', 'W': 'hari'}[zoom['freq']]
+
+with col2:
+    st.metric("Resolusi", zoom['label'])
+    st.caption(f"{len(zoom_series):,} titik ditampilkan")
+
+fig = make_subplots(specs=[[{"secondary_y": True}]])
+fig.add_trace(go.Scatter(x=zoom_series['bucket'], y=zoom_series['sum'],
+                         name=f"Tweet per {zoom['label'].lower()}", line=dict(color='#1f77b4', width=2)),
+              secondary_y=False)
+if zoom['freq'] != 'min':
+    fig.add_trace(go.Scatter(x=zoom_series['bucket'], y=zoom_series['max'],
+                             name=f"Puncak per {finer_label}", line=dict(color='#e74c3c', width=1, dash='dot')),
+                  secondary_y=True)
+fig.update_layout(title=f"Volume Tweet (resolusi {zoom['label'].lower()})", hovermode='x unified', height=600)
+fig.update_yaxes(title_text='Jumlah Tweet', secondary_y=False)
+fig.update_yaxes(title_text=f'Puncak per {finer_label}', secondary_y=True)
+st.plotly_chart(fig, width='stretch')
+
+if not zoom_series.empty:
+    peak_bucket = zoom_series.loc[zoom_series['sum'].idxmax()]
+    st.markdown(f"""
+    **📊 Hasil:**
+    - Puncak pada rentang ini: **{peak_bucket['bucket']}** dengan **{peak_bucket['sum']:,}** tweet per {zoom['label'].lower()}
+    - Lonjakan tertinggi dalam satu {finer_label}: **{zoom_series['max'].max():,}** tweet
+
+    **💡 Insight:**
+    Persempit rentang waktu untuk beralih otomatis ke resolusi yang lebih halus dan melihat **lonjakan singkat** 
+    yang tersamarkan pada agregasi harian.
+    """)
+
+st.markdown("---")
+
 # Summary Statistics
 st.markdown("### 📊 Ringkasan Statistik Temporal")
 
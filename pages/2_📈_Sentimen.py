@@ -2,51 +2,93 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from core import sqlstore, warmup
+from core.anomaly import spike_intervals
+from core.compare import compare_periods
+from core.data import served_version
+from core.locations import GLOBAL, UNKNOWN, location_index
+from core.matcher import sentiment_of
+from core.sampling import estimate_counts, estimate_total
+from core.ui import approximate_toggle, collapse_toggle, margin_caption, page_frame, period_comparison, period_label, render_sidebar, sample_caption, wait_for_warmup
+
 st.set_page_config(page_title="Sentimen", page_icon="📈", layout="wide")
 
-@st.cache_data
-def load_data():
-    df = pd.read_csv('dataset.csv')
-    df['created_at'] = pd.to_datetime(df['created_at'])
-    df = df[(df['created_at'] >= '2025-09-01') & (df['created_at'] <= '2025-11-30')]
-    return df
-
-@st.cache_data
-def classify_sentiment(text):
-    if pd.isna(text):
-        return 'Netral'
-    text = str(text).lower()
-    negative_words = ['attack', 'malicious', 'hack', 'breach', 'vulnerable', 'threat', 'risk', 'danger', 'compromised', 'exploit', 'malware', 'worm']
-    positive_words = ['safe', 'secure', 'protect', 'fix', 'patch', 'solution', 'resolved', 'update', 'defend']
-    neg_count = sum(1 for word in negative_words if word in text)
-    pos_count = sum(1 for word in positive_words if word in text)
-    if neg_count > pos_count:
-        return 'Negatif'
-    elif pos_count > neg_count:
-        return 'Positif'
-    return 'Netral'
-
-df = load_data()
-df['sentiment'] = df['full_text'].apply(classify_sentiment)
-sentiment_counts = df['sentiment'].value_counts()
-
-st.sidebar.info(f"**Periode:** Sep - Nov 2025\n**Total Data:** {len(df):,} tweets")
+warmup.ensure_started()
+wait_for_warmup()
+
+collapsed = collapse_toggle()
+approximate = approximate_toggle()
+# In approximate mode only the sample stored at ingestion is read; collapsed,
+# it keeps the sample rows that stand for their near-duplicate cluster
+df, sampled = page_frame(approximate, collapsed)
+total_tweets = len(df)
+
+# The SQL backend has labels stored at ingestion; collapsing needs the frame
+use_sql = sqlstore.enabled() and not collapsed and not approximate
+if use_sql:
+    sentiment_counts = sqlstore.sentiment_counts(served_version())
+elif approximate:
+    # Classify only the stratified sample and scale counts by stratum weights;
+    # sample rows dropped by collapsing count as zero
+    df['sentiment'] = sentiment_of(served_version(), df.index)
+    sentiment_estimates = estimate_counts(sampled, df['sentiment'], ['Positif', 'Netral', 'Negatif'])
+    sentiment_counts = sentiment_estimates['estimate'].round().astype(int).sort_values(ascending=False)
+    total_tweets = round(estimate_total(sampled, pd.Series(1, index=df.index))[0]) if collapsed else sampled['rows']
+else:
+    df['sentiment'] = sentiment_of(served_version(), df.index)
+    sentiment_counts = df['sentiment'].value_counts()
+
+render_sidebar(df, total=total_tweets)
+# The sample covers every day, so its date bounds match the snapshot's
+periods = period_comparison(df)
+if periods:
+    period_a, period_b = compare_periods(served_version(), *periods)
 
 st.title("📈 Sentimen")
 st.caption("Analisis polaritas sentimen publik menggunakan Lexicon-based Classification")
+if approximate:
+    sample_caption(sampled)
 st.markdown("---")
 
+if periods:
+    st.markdown("### 🔀 Perbandingan Periode (Seluruh Korpus)")
+    st.markdown(f"**A:** {period_label(period_a)} &nbsp;&nbsp; vs &nbsp;&nbsp; **B:** {period_label(period_b)}")
+
+    col1, col2, col3 = st.columns(3)
+    for col, label in zip((col1, col2, col3), ['Positif', 'Netral', 'Negatif']):
+        with col:
+            change = (period_b[f'{label}_share'] - period_a[f'{label}_share']) * 100
+            st.metric(f"{label} (B)", f"{period_b[f'{label}_share'] * 100:.1f}%", delta=f"{change:+.1f} pp",
+                      delta_color='inverse' if label == 'Negatif' else 'normal')
+
+    shares = pd.DataFrame([
+        {'Periode': name, 'Sentimen': label, 'Proporsi': s[f'{label}_share'] * 100}
+        for name, s in (('A', period_a), ('B', period_b)) for label in ['Positif', 'Netral', 'Negatif']
+    ])
+    fig = px.bar(shares, x='Sentimen', y='Proporsi', color='Periode', barmode='group',
+                 color_discrete_map={'A': '#95a5a6', 'B': '#3498db'}, title='Proporsi Sentimen: Periode A vs B',
+                 labels={'Proporsi': 'Proporsi (%)'})
+    fig.update_layout(height=400)
+    st.plotly_chart(fig, width='stretch')
+    st.markdown("---")
+
 # Metrics
 col1, col2, col3 = st.columns(3)
 with col1:
     st.metric("😊 Positif", f"{sentiment_counts.get('Positif', 0):,}", 
-              f"{sentiment_counts.get('Positif', 0)/len(df)*100:.1f}%")
+              f"{sentiment_counts.get('Positif', 0)/total_tweets*100:.1f}%")
+    if approximate:
+        margin_caption(sentiment_estimates.loc['Positif', 'margin'], sampled)
 with col2:
     st.metric("😐 Netral", f"{sentiment_counts.get('Netral', 0):,}", 
-              f"{sentiment_counts.get('Netral', 0)/len(df)*100:.1f}%")
+              f"{sentiment_counts.get('Netral', 0)/total_tweets*100:.1f}%")
+    if approximate:
+        margin_caption(sentiment_estimates.loc['Netral', 'margin'], sampled)
 with col3:
     st.metric("😟 Negatif", f"{sentiment_counts.get('Negatif', 0):,}", 
-              f"{sentiment_counts.get('Negatif', 0)/len(df)*100:.1f}%")
+              f"{sentiment_counts.get('Negatif', 0)/total_tweets*100:.1f}%")
+    if approximate:
+        margin_caption(sentiment_estimates.loc['Negatif', 'margin'], sampled)
 
 st.markdown("---")
 
@@ -65,8 +107,8 @@ with col1:
     
     st.markdown(f"""
     **📊 Hasil:**
-    - Sentimen dominan: **{sentiment_counts.idxmax()}** ({sentiment_counts.max()/len(df)*100:.1f}%)
-    - Total terklasifikasi: **{len(df):,} tweet**
+    - Sentimen dominan: **{sentiment_counts.idxmax()}** ({sentiment_counts.max()/total_tweets*100:.1f}%)
+    - Total terklasifikasi: **{total_tweets:,} tweet**
     
     **💡 Insight:**
     Dominasi sentimen netral menunjukkan bahwa mayoritas diskusi bersifat **informatif dan objektif**, 
@@ -92,9 +134,9 @@ with col2:
     
     st.markdown(f"""
     **📊 Hasil:**
-    - Positif: **{sentiment_counts.get('Positif', 0):,}** tweet ({sentiment_counts.get('Positif', 0)/len(df)*100:.1f}%)
-    - Netral: **{sentiment_counts.get('Netral', 0):,}** tweet ({sentiment_counts.get('Netral', 0)/len(df)*100:.1f}%)
-    - Negatif: **{sentiment_counts.get('Negatif', 0):,}** tweet ({sentiment_counts.get('Negatif', 0)/len(df)*100:.1f}%)
+    - Positif: **{sentiment_counts.get('Positif', 0):,}** tweet ({sentiment_counts.get('Positif', 0)/total_tweets*100:.1f}%)
+    - Netral: **{sentiment_counts.get('Netral', 0):,}** tweet ({sentiment_counts.get('Netral', 0)/total_tweets*100:.1f}%)
+    - Negatif: **{sentiment_counts.get('Negatif', 0):,}** tweet ({sentiment_counts.get('Negatif', 0)/total_tweets*100:.1f}%)
     
     **💡 Insight:**
     Meskipun terjadi serangan keamanan, sentimen negatif relatif rendah. Ini menunjukkan bahwa komunitas 
@@ -147,15 +189,26 @@ st.markdown("### 📅 Tren Sentimen Harian")
 st.markdown("**🎯 Tujuan:** Melihat evolusi sentimen dari waktu ke waktu")
 st.markdown("**🔬 Metode:** Stacked area chart sentimen per hari")
 
-df_sentiment_daily = df.groupby([df['created_at'].dt.date, 'sentiment']).size().reset_index(name='count')
-df_sentiment_daily.columns = ['date', 'sentiment', 'count']
+if use_sql:
+    df_sentiment_daily = sqlstore.sentiment_daily(served_version())
+elif approximate:
+    df_sentiment_daily = df.groupby([df['created_at'].dt.date, 'sentiment'])['weight'].sum().reset_index(name='count')
+    df_sentiment_daily.columns = ['date', 'sentiment', 'count']
+else:
+    df_sentiment_daily = df.groupby([df['created_at'].dt.date, 'sentiment']).size().reset_index(name='count')
+    df_sentiment_daily.columns = ['date', 'sentiment', 'count']
 
 fig = px.area(df_sentiment_daily, x='date', y='count', color='sentiment',
               labels={'date': 'Tanggal', 'count': 'Jumlah', 'sentiment': 'Sentimen'},
               color_discrete_map={'Positif': '#2ecc71', 'Netral': '#95a5a6', 'Negatif': '#e74c3c'},
               title='Evolusi Sentimen Harian')
+negative_spikes = spike_intervals(served_version()).query("metric == 'negative_share'")
+for _, spike in negative_spikes.iterrows():
+    fig.add_vrect(x0=spike['start'], x1=spike['end'], fillcolor='#e74c3c', opacity=0.25, line_width=0)
 fig.update_layout(height=600)
 st.plotly_chart(fig, width='stretch')
+if not negative_spikes.empty:
+    st.caption(f"🚨 {len(negative_spikes)} interval lonjakan proporsi sentimen negatif ditandai merah")
 
 st.markdown("""
 **📊 Hasil:**
@@ -166,3 +219,47 @@ konsisten mengindikasikan **stabilitas diskusi objektif** tanpa fluktuasi emosio
 Tidak ada lonjakan sentimen negatif yang signifikan, menunjukkan komunitas **responsif namun tenang** 
 dalam menghadapi krisis keamanan.
 """)
+
+st.markdown("---")
+
+# Chart 6: Sentiment by Region
+st.markdown("### 🌍 Sentimen per Wilayah (Seluruh Korpus)")
+st.markdown("**🎯 Tujuan:** Melihat asal diskusi dan perbedaan sentimen antar wilayah")
+st.markdown("**🔬 Metode:** Normalisasi kolom lokasi dengan gazetteer offline (provinsi Indonesia & negara), lalu agregasi wilayah × sentimen dan wilayah × hari")
+
+regions = location_index(served_version())
+region_sentiment = regions['sentiment'].drop(index=[UNKNOWN, GLOBAL], errors='ignore')
+region_sentiment = region_sentiment[region_sentiment['tweets'] > 0].head(12)
+known_share = 1 - regions['sentiment'].loc[UNKNOWN, 'tweets'] / regions['sentiment']['tweets'].sum()
+
+col1, col2 = st.columns(2)
+
+with col1:
+    region_long = region_sentiment[['Positif', 'Netral', 'Negatif']].reset_index().melt(
+        id_vars='region', var_name='Sentimen', value_name='Jumlah')
+    fig = px.bar(region_long, x='Jumlah', y='region', color='Sentimen', orientation='h',
+                 color_discrete_map={'Positif': '#2ecc71', 'Netral': '#95a5a6', 'Negatif': '#e74c3c'},
+                 title='Sentimen per Wilayah (Top 12)', labels={'region': 'Wilayah'})
+    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500)
+    st.plotly_chart(fig, width='stretch')
+
+with col2:
+    region_daily = regions['daily'][region_sentiment.index[:6]]
+    region_weekly = region_daily.resample('W-MON', label='left', closed='left').sum()
+    fig = px.line(region_weekly, labels={'date': 'Minggu', 'value': 'Jumlah Tweet', 'region': 'Wilayah'},
+                  title='Volume Mingguan per Wilayah (Top 6)', markers=True)
+    fig.update_layout(height=500)
+    st.plotly_chart(fig, width='stretch')
+
+if len(region_sentiment) > 0:
+    negative_share = region_sentiment['Negatif'] / region_sentiment['tweets']
+    st.markdown(f"""
+    **📊 Hasil:**
+    - **{regions['distinct_raw']:,}** teks lokasi unik dipetakan; **{known_share * 100:.1f}%** tweet memiliki lokasi yang dikenali
+    - Wilayah teraktif: **{region_sentiment.index[0]}** ({region_sentiment['tweets'].iloc[0]} tweet)
+    - Proporsi negatif tertinggi: **{negative_share.idxmax()}** ({negative_share.max() * 100:.1f}%)
+
+    **💡 Insight:**
+    Lokasi diisi bebas oleh pengguna sehingga banyak yang kosong atau tidak geografis ("Global", "Earth"); 
+    angka per wilayah menggambarkan **akun yang mencantumkan lokasi**, bukan seluruh populasi.
+    """)
@@ -2,116 +2,86 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from collections import Counter
-import re
-from itertools import combinations
 
-st.set_page_config(page_title="Kata Kunci", page_icon="🔤", layout="wide")
+from core import warmup
+from core.cardinality import count_distinct
+from core.compare import compare_periods, keyword_deltas
+from core.data import load_texts, served_version, snapshot_rows
+from core.matcher import category_daily, tweet_lexicon_hits
+from core.postings import keyword_drilldown, term_index
+from core.text import categorize_keywords, extract_keyword_cooccurrence, extract_keywords
+from core.trending import extract_keywords_temporal, trending_keywords
+from core.ui import approximate_toggle, collapse_toggle, page_frame, period_comparison, period_label, render_sidebar, sample_caption, wait_for_warmup
 
-@st.cache_data
-def load_data():
-    df = pd.read_csv('dataset.csv')
-    df['created_at'] = pd.to_datetime(df['created_at'])
-    df = df[(df['created_at'] >= '2025-09-01') & (df['created_at'] <= '2025-11-30')]
-    return df
-
-@st.cache_data
-def extract_keywords(texts, top_n=15):
-    stopwords = {'the', 'and', 'for', 'are', 'with', 'this', 'that', 'from', 'was', 'has', 'have', 
-                 'been', 'not', 'but', 'can', 'will', 'all', 'more', 'https', 'com', 'via', 'new', 'get', 'one', 'now', 'use'}
-    words = []
-    for text in texts:
-        if pd.notna(text):
-            text = str(text).lower()
-            text = re.sub(r'http\S+|www\S+|@\S+|#\S+', '', text)
-            tokens = re.findall(r'\b[a-z]{3,}\b', text)
-            words.extend([w for w in tokens if w not in stopwords])
-    return Counter(words).most_common(top_n)
-
-@st.cache_data
-def categorize_keywords(keywords_list):
-    categories = {
-        'Security': ['security', 'malicious', 'attack', 'vulnerability', 'threat', 'breach', 'exploit', 'malware', 'worm'],
-        'Technical': ['npm', 'package', 'node', 'javascript', 'code', 'library', 'dependency', 'install', 'version'],
-        'Supply Chain': ['supply', 'chain', 'dependencies', 'upstream', 'downstream'],
-        'Action': ['update', 'fix', 'patch', 'remove', 'check', 'scan', 'monitor', 'protect']
-    }
-    
-    categorized = {cat: [] for cat in categories}
-    uncategorized = []
-    
-    for word, freq in keywords_list:
-        assigned = False
-        for cat, keywords in categories.items():
-            if word in keywords:
-                categorized[cat].append((word, freq))
-                assigned = True
-                break
-        if not assigned:
-            uncategorized.append((word, freq))
-    
-    return categorized, uncategorized
+st.set_page_config(page_title="Kata Kunci", page_icon="🔤", layout="wide")
 
-@st.cache_data
-def extract_keyword_cooccurrence(texts, top_keywords, top_n=10):
-    keyword_set = set([k[0] for k in top_keywords])
-    cooccurrence = Counter()
-    
-    for text in texts:
-        if pd.notna(text):
-            text = str(text).lower()
-            text = re.sub(r'http\S+|www\S+|@\S+|#\S+', '', text)
-            tokens = set(re.findall(r'\b[a-z]{3,}\b', text))
-            found_keywords = tokens & keyword_set
-            
-            if len(found_keywords) >= 2:
-                for pair in combinations(sorted(found_keywords), 2):
-                    cooccurrence[pair] += 1
-    
-    return cooccurrence.most_common(top_n)
+warmup.ensure_started()
+wait_for_warmup()
 
-@st.cache_data
-def extract_keywords_temporal(df, top_n=10):
-    df_temp = df.copy()
-    df_temp['date'] = df_temp['created_at'].dt.date
-    
-    stopwords = {'the', 'and', 'for', 'are', 'with', 'this', 'that', 'from', 'was', 'has', 'have', 
-                 'been', 'not', 'but', 'can', 'will', 'all', 'more', 'https', 'com', 'via', 'new', 'get', 'one', 'now', 'use'}
-    
-    daily_keywords = {}
-    for date, group in df_temp.groupby('date'):
-        words = []
-        for text in group['full_text']:
-            if pd.notna(text):
-                text = str(text).lower()
-                text = re.sub(r'http\S+|www\S+|@\S+|#\S+', '', text)
-                tokens = re.findall(r'\b[a-z]{3,}\b', text)
-                words.extend([w for w in tokens if w not in stopwords])
-        daily_keywords[date] = Counter(words).most_common(top_n)
-    
-    return daily_keywords
-
-df = load_data()
-keywords = extract_keywords(df['full_text'], top_n=20)
+collapsed = collapse_toggle()
+approximate = approximate_toggle()
+df, sampled = page_frame(approximate, collapsed)
+texts = load_texts(df)
+# On the sample each tweet's words count with its stratum weight
+weights = df['weight'] if approximate else None
+keywords = extract_keywords(texts, top_n=20, weights=weights)
 keywords_df = pd.DataFrame(keywords, columns=['Kata Kunci', 'Frekuensi'])
 keywords_df['Persentase'] = (keywords_df['Frekuensi'] / keywords_df['Frekuensi'].sum() * 100).round(2)
 categorized, uncategorized = categorize_keywords(keywords)
-cooccurrence = extract_keyword_cooccurrence(df['full_text'], keywords, top_n=15)
-daily_keywords = extract_keywords_temporal(df, top_n=5)
+cooccurrence = extract_keyword_cooccurrence(texts, keywords, top_n=15, weights=weights)
+daily_keywords = extract_keywords_temporal(df[['created_at', 'weight'] if approximate else ['created_at']].assign(full_text=texts),
+                                           top_n=5)
+# The per-day counters cover the whole snapshot; a collapsed frame is counted
+# directly, with the same tokenization. A sample cannot estimate a distinct
+# count, so approximate mode keeps the snapshot's
+if collapsed and not approximate:
+    unique_words = texts.str.lower().str.split().explode().nunique()
+else:
+    unique_words = count_distinct(served_version(), 'words')
 
-st.sidebar.info(f"**Periode:** Sep - Nov 2025\n**Total Data:** {len(df):,} tweets")
+render_sidebar(df, total=sampled['rows'] if approximate else None)
+periods = period_comparison(df)
+if periods:
+    period_a, period_b = compare_periods(served_version(), *periods)
 
 st.title("🔤 Kata Kunci")
 st.caption("Ekstraksi dan kata-kata dominan dalam diskusi")
+if approximate:
+    sample_caption(sampled)
 st.markdown("---")
 
+if periods:
+    st.markdown("### 🔀 Perbandingan Periode (Seluruh Korpus)")
+    st.markdown(f"**A:** {period_label(period_a)} &nbsp;&nbsp; vs &nbsp;&nbsp; **B:** {period_label(period_b)}")
+    st.markdown("**🔬 Metode:** Penggabungan hitungan kata per hari; angka = jumlah tweet yang memuat kata, dinormalisasi per hari")
+
+    deltas = keyword_deltas(period_a, period_b)
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        rates = deltas[['A / hari', 'B / hari']].reset_index().melt(id_vars='term', var_name='Periode', value_name='Tweet per Hari')
+        fig = px.bar(rates, x='Tweet per Hari', y='term', color='Periode', barmode='group', orientation='h',
+                     color_discrete_map={'A / hari': '#95a5a6', 'B / hari': '#9b59b6'},
+                     title='Kata Kunci Teratas: Periode A vs B', labels={'term': 'Kata Kunci'})
+        fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500)
+        st.plotly_chart(fig, width='stretch')
+    with col2:
+        st.dataframe(deltas.round(2), width='stretch')
+        rising = deltas['Perubahan'].idxmax()
+        falling = deltas['Perubahan'].idxmin()
+        st.markdown(f"""
+        **💡 Insight:**
+        - Naik paling tajam: **"{rising}"** ({deltas.loc[rising, 'Perubahan']:+.1f} tweet/hari)
+        - Turun paling tajam: **"{falling}"** ({deltas.loc[falling, 'Perubahan']:+.1f} tweet/hari)
+        """)
+    st.markdown("---")
+
 col1, col2 = st.columns([3, 1])
 with col1:
     st.markdown("### 📊 Top 15 Kata Kunci Dominan")
     st.markdown("**🎯 Tujuan:** Identifikasi istilah teknis yang paling sering muncul")
     st.markdown("**🔬 Metode:** Frequency counting dengan stopword removal")
 with col2:
-    st.metric("Total Kata Unik", f"{len(set([w for text in df['full_text'] if pd.notna(text) for w in str(text).lower().split()])):,}")
+    st.metric("Total Kata Unik", f"{unique_words:,}")
     st.metric("Kata Teratas", keywords_df.iloc[0]['Kata Kunci'])
     st.caption(f"Frekuensi: {keywords_df.iloc[0]['Frekuensi']} kali")
 
@@ -266,6 +236,49 @@ else:
 
 st.markdown("---")
 
+# Chart 4b: Per-tweet Topics
+st.markdown("### 🧭 Topik per Tweet (Seluruh Korpus)")
+
+topic_hits = tweet_lexicon_hits(served_version())
+topic_counts = topic_hits['topic'].value_counts().reset_index()
+topic_counts.columns = ['Topik', 'Jumlah Tweet']
+
+col1, col2 = st.columns([3, 1])
+with col1:
+    st.markdown("**🎯 Tujuan:** Memberi label topik pada setiap tweet, bukan hanya pada 20 kata teratas")
+    st.markdown("**🔬 Metode:** Automaton Aho-Corasick dari seluruh leksikon kategori dan sentimen, satu kali scan per tweet")
+with col2:
+    labelled_pct = (topic_hits['topic'] != 'Lainnya').mean() * 100
+    st.metric("Tweet Berlabel", f"{labelled_pct:.1f}%")
+    st.caption(f"Topik dominan: {topic_counts.iloc[0]['Topik']}")
+
+col1, col2 = st.columns(2)
+
+with col1:
+    fig = px.bar(topic_counts, x='Jumlah Tweet', y='Topik', orientation='h',
+                 title='Distribusi Topik Dominan per Tweet', text='Jumlah Tweet')
+    fig.update_traces(marker_color='#16a085', textposition='outside')
+    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=450)
+    st.plotly_chart(fig, width='stretch')
+
+with col2:
+    fig = px.line(category_daily(served_version()), x='date', y='Jumlah Tweet', color='Kategori',
+                  title='Tweet per Kategori per Hari',
+                  labels={'date': 'Tanggal'})
+    fig.update_layout(hovermode='x unified', height=450)
+    st.plotly_chart(fig, width='stretch')
+
+st.markdown(f"""
+**📊 Hasil:**
+- **{labelled_pct:.1f}%** tweet mengandung minimal satu kata dari leksikon kategori
+- Topik dominan: **{topic_counts.iloc[0]['Topik']}** ({topic_counts.iloc[0]['Jumlah Tweet']:,} tweet)
+
+**💡 Insight:**
+Label per tweet memungkinkan melihat **kapan** setiap tema (keamanan, teknis, supply chain, aksi mitigasi) mendominasi diskusi.
+""")
+
+st.markdown("---")
+
 # Chart 5: Co-occurrence Network
 st.markdown("### 🔗 Analisis Co-occurrence Kata Kunci")
 
@@ -374,12 +387,119 @@ else:
 
 st.markdown("---")
 
+# Chart 7: Trending Keywords
+st.markdown("### 🚀 Kata Kunci Trending")
+
+col1, col2 = st.columns([3, 1])
+with col1:
+    st.markdown("**🎯 Tujuan:** Menemukan kata kunci yang sedang melonjak dibanding periode sebelumnya")
+    st.markdown("**🔬 Metode:** Space-Saving heavy hitters pada sliding window dengan burst score terhadap baseline")
+with col2:
+    trend_units = {'Jam': 'H', 'Hari': 'D', 'Minggu': 'W'}
+    trend_unit = st.selectbox("Resolusi window:", list(trend_units), index=1)
+    trend_baseline = st.selectbox("Baseline (jumlah window):", [3, 7, 14], index=1)
+
+trending = trending_keywords(served_version(), unit=trend_units[trend_unit], window=1, baseline=trend_baseline)
+trending_df = trending['terms']
+
+if not trending_df.empty:
+    fig = px.bar(trending_df, x='burst', y='term', orientation='h',
+                 title=f"Burst Score Kata Kunci ({trend_unit} terakhir vs {trend_baseline} {trend_unit.lower()} sebelumnya)",
+                 labels={'burst': 'Burst Score', 'term': 'Kata Kunci'},
+                 hover_data=['recent', 'baseline'])
+    fig.update_traces(marker_color='#e67e22')
+    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500)
+    st.plotly_chart(fig, width='stretch')
+
+    st.markdown(f"""
+    **📊 Hasil:**
+    - Window terakhir dimulai: **{trending['as_of']}**
+    - Kata paling melonjak: **"{trending_df.iloc[0]['term']}"** ({trending_df.iloc[0]['recent']} kemunculan, baseline {trending_df.iloc[0]['baseline']} per window)
+
+    **💡 Insight:**
+    Burst score tinggi menandakan kata yang **baru muncul** atau **melonjak tajam**, bukan sekadar kata yang selalu sering dipakai.
+    """)
+else:
+    st.info("Data trending tidak tersedia.")
+
+st.markdown("---")
+
+# Chart 8: Keyword Drill-down
+st.markdown("### 🔎 Drill-down Kata Kunci (Seluruh Korpus)")
+st.markdown("**🎯 Tujuan:** Melihat sentimen, volume harian, dan tweet teratas untuk satu kata kunci")
+st.markdown("**🔬 Metode:** Posting list kata → baris tweet, diiris dengan label sentimen dan engagement yang sudah dihitung")
+
+col1, col2 = st.columns([1, 3])
+with col1:
+    drill_options = keywords_df['Kata Kunci'].tolist()
+    drill_term = st.selectbox("Kata kunci:", drill_options + ['(lainnya)'])
+    if drill_term == '(lainnya)':
+        drill_term = st.text_input("Ketik kata kunci:", value='worm').strip().lower()
+    drill_sentiment = st.selectbox("Filter sentimen:", ['Semua', 'Positif', 'Netral', 'Negatif'])
+
+drill = keyword_drilldown(served_version(), drill_term,
+                          sentiment=None if drill_sentiment == 'Semua' else drill_sentiment)
+
+with col2:
+    if drill['tweets'] == 0:
+        if drill_term not in term_index(served_version())['vocab']:
+            st.info(f'Kata "{drill_term}" tidak ditemukan dalam dataset.')
+        else:
+            st.info(f'Tidak ada tweet "{drill_term}" dengan sentimen {drill_sentiment}.')
+    else:
+        m1, m2, m3 = st.columns(3)
+        with m1:
+            st.metric("Tweet", f"{drill['tweets']:,}")
+        with m2:
+            st.metric("Total Engagement", f"{drill['engagement']:,}")
+        with m3:
+            st.metric("Rata-rata Engagement", f"{drill['engagement'] / drill['tweets']:.1f}")
+
+if drill['tweets'] > 0:
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        sentiment_split = drill['sentiment'][drill['sentiment'] > 0]
+        fig = px.pie(values=sentiment_split.values, names=sentiment_split.index,
+                     title=f'Sentimen Tweet "{drill_term}"', color=sentiment_split.index,
+                     color_discrete_map={'Positif': '#2ecc71', 'Netral': '#95a5a6', 'Negatif': '#e74c3c'})
+        fig.update_layout(height=400)
+        st.plotly_chart(fig, width='stretch')
+    with col2:
+        drill_daily = drill['daily'].reset_index()
+        fig = px.bar(drill_daily, x='date', y='tweets', hover_data=['engagement'],
+                     title=f'Volume Harian "{drill_term}"',
+                     labels={'date': 'Tanggal', 'tweets': 'Jumlah Tweet', 'engagement': 'Engagement'})
+        fig.update_traces(marker_color='#3498db')
+        fig.update_layout(height=400)
+        st.plotly_chart(fig, width='stretch')
+
+    st.markdown(f"**🏆 Tweet Teratas dengan \"{drill_term}\"**")
+    drill_top = snapshot_rows(drill['top_rows'])
+    drill_top = drill_top.assign(full_text=load_texts(drill_top))[['username', 'full_text', 'favorite_count', 'retweet_count']]
+    drill_top['total_engagement'] = drill_top['favorite_count'] + drill_top['retweet_count']
+    st.dataframe(drill_top.rename(columns={'username': 'Username', 'full_text': 'Tweet', 'favorite_count': 'Likes',
+                                           'retweet_count': 'Retweets', 'total_engagement': 'Total Engagement'}),
+                 width='stretch', hide_index=True)
+
+    dominant = drill['sentiment'].idxmax()
+    st.markdown(f"""
+    **📊 Hasil:**
+    - **{drill['tweets']:,}** tweet menyebut "{drill_term}", aktif selama **{len(drill['daily'])}** hari
+    - Sentimen dominan: **{dominant}** ({drill['sentiment'][dominant] / drill['tweets'] * 100:.1f}%)
+
+    **💡 Insight:**
+    Bandingkan beberapa kata kunci (misalnya *worm* vs *token*) untuk melihat istilah mana yang 
+    memicu kekhawatiran dan mana yang mendapat perhatian terbesar.
+    """)
+
+st.markdown("---")
+
 # Summary Statistics
 st.markdown("### 📊 Ringkasan Statistik Kata Kunci")
 
 col1, col2, col3, col4 = st.columns(4)
 with col1:
-    st.metric("Total Kata Unik", f"{len(set([w for text in df['full_text'] if pd.notna(text) for w in str(text).lower().split()])):,}")
+    st.metric("Total Kata Unik", f"{unique_words:,}")
     st.caption("Dalam dataset")
 with col2:
     st.metric("Avg Frekuensi", f"{keywords_df['Frekuensi'].mean():.1f}")
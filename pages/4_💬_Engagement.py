@@ -2,47 +2,98 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import re
-from collections import Counter
+
+from core import sqlstore, warmup
+from core.accounts import account_index, account_rows, top_accounts
+from core.cardinality import count_distinct
+from core.compare import compare_periods
+from core.data import load_texts, served_version, snapshot_rows
+from core.graph import conversation_graph
+from core.hashtags import hashtag_daily, hashtag_index, hashtag_rows, top_hashtags
+from core.postings import row_features
+from core.ranking import ranking_index, top_k
+from core.sampling import estimate_total, weighted_median, weighted_sum
+from core.ui import approximate_toggle, margin_caption, page_frame, period_comparison, period_label, render_sidebar, sample_caption, wait_for_warmup
 
 st.set_page_config(page_title="Engagement & Hashtag", page_icon="💬", layout="wide")
 
-@st.cache_data
-def load_data():
-    df = pd.read_csv('dataset.csv')
-    df['created_at'] = pd.to_datetime(df['created_at'])
-    df = df[(df['created_at'] >= '2025-09-01') & (df['created_at'] <= '2025-11-30')]
-    return df
-
-@st.cache_data
-def extract_hashtags(df):
-    all_hashtags = []
-    for text in df['full_text'].dropna():
-        hashtags = re.findall(r'#(\w+)', str(text))
-        all_hashtags.extend([tag.lower() for tag in hashtags])
-    return Counter(all_hashtags).most_common(15)
-
-df = load_data()
+warmup.ensure_started()
+wait_for_warmup()
+
+approximate = approximate_toggle()
+df, sampled = page_frame(approximate)
 df['total_engagement'] = df['favorite_count'] + df['retweet_count']
+if approximate:
+    # Weighted totals over the sample; tweets with engagement >= 100 are all in
+    # it (take-all stratum), so the top of the distribution is exact
+    total_tweets = sampled['rows']
+    total_likes, likes_margin = estimate_total(sampled, df['favorite_count'])
+    total_retweets, retweets_margin = estimate_total(sampled, df['retweet_count'])
+    engaged_tweets, engaged_margin = estimate_total(sampled, df['total_engagement'] > 0)
+    total_likes, total_retweets = round(total_likes), round(total_retweets)
+    median_engagement = weighted_median(df['total_engagement'], df['weight'])
+else:
+    total_tweets = len(df)
+    total_likes, total_retweets = int(df['favorite_count'].sum()), int(df['retweet_count'].sum())
+    engaged_tweets = int((df['total_engagement'] > 0).sum())
+    median_engagement = df['total_engagement'].median()
+total_engagement = total_likes + total_retweets
+avg_engagement = total_engagement / total_tweets
 
-st.sidebar.info(f"**Periode:** Sep - Nov 2025\n**Total Data:** {len(df):,} tweets")
+render_sidebar(df, total=total_tweets)
+periods = period_comparison(df)
+if periods:
+    period_a, period_b = compare_periods(served_version(), *periods)
 
 st.title("💬 Analisis Engagement & Hashtag")
 st.caption("Analisis interaksi publik dan kategorisasi topik dalam diskusi NPM supply chain attack")
+if approximate:
+    sample_caption(sampled)
 st.markdown("---")
 
+if periods:
+    st.markdown("## 🔀 Perbandingan Periode")
+    st.markdown(f"**A:** {period_label(period_a)} &nbsp;&nbsp; vs &nbsp;&nbsp; **B:** {period_label(period_b)}")
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Total Engagement (B)", f"{period_b['total_engagement']:,}",
+                  delta=f"{period_b['total_engagement'] - period_a['total_engagement']:+,}")
+    with col2:
+        st.metric("Avg Engagement (B)", f"{period_b['avg_engagement']:.1f}",
+                  delta=f"{period_b['avg_engagement'] - period_a['avg_engagement']:+.1f}")
+    with col3:
+        st.metric("Likes (B)", f"{period_b['likes']:,}", delta=f"{period_b['likes'] - period_a['likes']:+,}")
+    with col4:
+        st.metric("Retweets (B)", f"{period_b['retweets']:,}", delta=f"{period_b['retweets'] - period_a['retweets']:+,}")
+
+    tags = pd.concat([s['hashtags'].head(10).assign(Periode=name) for name, s in (('A', period_a), ('B', period_b))])
+    if not tags.empty:
+        fig = px.bar(tags, x='tweets', y='hashtag', color='Periode', barmode='group', orientation='h',
+                     color_discrete_map={'A': '#95a5a6', 'B': '#16a085'}, title='Top Hashtag: Periode A vs B',
+                     labels={'tweets': 'Jumlah Tweet', 'hashtag': 'Hashtag'})
+        fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=450)
+        st.plotly_chart(fig, width='stretch')
+    st.markdown("---")
+
 st.markdown("## 📊 Analisis Engagement")
 
 col1, col2, col3, col4 = st.columns(4)
 with col1:
-    st.metric("Total Likes", f"{df['favorite_count'].sum():,}")
+    st.metric("Total Likes", f"{total_likes:,}")
+    if approximate:
+        margin_caption(likes_margin, sampled)
 with col2:
-    st.metric("Total Retweets", f"{df['retweet_count'].sum():,}")
+    st.metric("Total Retweets", f"{total_retweets:,}")
+    if approximate:
+        margin_caption(retweets_margin, sampled)
 with col3:
-    st.metric("Avg Engagement", f"{df['total_engagement'].mean():.1f}")
+    st.metric("Avg Engagement", f"{avg_engagement:.1f}")
 with col4:
-    engagement_rate = (df[df['total_engagement'] > 0].shape[0] / len(df) * 100)
+    engagement_rate = engaged_tweets / total_tweets * 100
     st.metric("Engagement Rate", f"{engagement_rate:.1f}%")
+    if approximate:
+        margin_caption(engaged_margin / total_tweets * 100, sampled, fmt='.1f')
 
 st.markdown("---")
 
@@ -53,16 +104,18 @@ with col1:
     st.markdown("**🎯 Tujuan:** Menganalisis pola distribusi engagement untuk memahami variasi respons publik")
     st.markdown("**🔬 Metode:** Histogram distribusi total engagement (likes + retweets)")
     
+    # On the sample each bar sums the weights of its tweets
     fig = px.histogram(df, x='total_engagement', nbins=30, title='Distribusi Total Engagement',
-                      labels={'total_engagement': 'Total Engagement', 'count': 'Frekuensi'})
+                      labels={'total_engagement': 'Total Engagement', 'count': 'Frekuensi', 'weight': 'Frekuensi'},
+                      **({'y': 'weight', 'histfunc': 'sum'} if approximate else {}))
     fig.update_traces(marker_color='#8e44ad', marker_line_color='#6c3483', marker_line_width=1.5)
     fig.update_layout(height=400)
     st.plotly_chart(fig, width='stretch')
     
     st.markdown(f"""
     **📊 Hasil:**
-    - Median: **{df['total_engagement'].median():.0f}**
-    - Mean: **{df['total_engagement'].mean():.1f}**
+    - Median: **{median_engagement:.0f}**
+    - Mean: **{avg_engagement:.1f}**
     - Max: **{df['total_engagement'].max():,}**
     
     **💡 Kesimpulan:**
@@ -75,11 +128,11 @@ with col2:
     st.markdown("**🎯 Tujuan:** Mengidentifikasi momen peak interest dan pola engagement sepanjang waktu")
     st.markdown("**🔬 Metode:** Time series agregasi engagement harian")
     
-    daily_engagement = df.groupby(df['created_at'].dt.date).agg({
-        'favorite_count': 'sum', 
-        'retweet_count': 'sum'
-    }).reset_index()
-    daily_engagement.columns = ['date', 'likes', 'retweets']
+    if sqlstore.enabled() and not approximate:
+        daily_engagement = sqlstore.daily_engagement(served_version())
+    else:
+        daily_engagement = weighted_sum(df, df['created_at'].dt.date, ['favorite_count', 'retweet_count']).reset_index()
+        daily_engagement.columns = ['date', 'likes', 'retweets']
     
     fig = go.Figure()
     fig.add_trace(go.Scatter(x=daily_engagement['date'], y=daily_engagement['likes'], 
@@ -114,7 +167,7 @@ col1, col2 = st.columns(2)
 with col1:
     engagement_type = pd.DataFrame({
         'Type': ['Likes', 'Retweets'],
-        'Count': [df['favorite_count'].sum(), df['retweet_count'].sum()]
+        'Count': [total_likes, total_retweets]
     })
     
     fig = px.pie(engagement_type, values='Count', names='Type',
@@ -127,13 +180,13 @@ with col1:
     st.plotly_chart(fig, width='stretch')
 
 with col2:
-    likes_pct = (df['favorite_count'].sum() / df['total_engagement'].sum() * 100)
-    retweets_pct = (df['retweet_count'].sum() / df['total_engagement'].sum() * 100)
+    likes_pct = (total_likes / total_engagement * 100)
+    retweets_pct = (total_retweets / total_engagement * 100)
     
     st.markdown(f"""
     **📊 Hasil:**
-    - Likes: **{likes_pct:.1f}%** ({df['favorite_count'].sum():,})
-    - Retweets: **{retweets_pct:.1f}%** ({df['retweet_count'].sum():,})
+    - Likes: **{likes_pct:.1f}%** ({total_likes:,})
+    - Retweets: **{retweets_pct:.1f}%** ({total_retweets:,})
     - Rasio Likes:Retweets = **{likes_pct/retweets_pct:.2f}:1**
     
     **💡 Kesimpulan:**
@@ -149,33 +202,151 @@ st.markdown("### 🔥 Top 10 Tweet dengan Engagement Tertinggi")
 st.markdown("**🎯 Tujuan:** Identifikasi konten yang paling resonan untuk memahami jenis informasi yang viral")
 st.markdown("**🔬 Metode:** Sorting berdasarkan total engagement")
 
-top_tweets = df.nlargest(10, 'total_engagement')[['username', 'full_text', 'favorite_count', 'retweet_count', 'total_engagement']]
+# Ranking and posting-list positions index the snapshot, not the sample
+top_tweets = snapshot_rows(top_k(ranking_index(served_version())['total_engagement'], k=10))
+top_tweets = top_tweets.assign(full_text=load_texts(top_tweets),
+                               total_engagement=top_tweets['favorite_count'] + top_tweets['retweet_count'])
+top_tweets = top_tweets[['username', 'full_text', 'favorite_count', 'retweet_count', 'total_engagement']]
 st.dataframe(top_tweets, width='stretch', height=400)
 
 st.markdown(f"""
 **📊 Hasil:**
 - Tweet teratas: **{top_tweets.iloc[0]['total_engagement']:,}** engagement
 - Top 10 total: **{top_tweets['total_engagement'].sum():,}** engagement
-- Persentase dari total: **{(top_tweets['total_engagement'].sum()/df['total_engagement'].sum()*100):.1f}%**
+- Persentase dari total: **{(top_tweets['total_engagement'].sum()/total_engagement*100):.1f}%**
 
 **💡 Kesimpulan:**
 Tweet dengan engagement tinggi berisi **informasi teknis**, **warning**, atau **solusi praktis** 
 yang bernilai bagi komunitas developer dalam merespons ancaman keamanan.
 """)
 
+st.markdown("---")
+
+st.markdown("### 👤 Leaderboard Akun")
+st.markdown("**🎯 Tujuan:** Mengidentifikasi akun paling berpengaruh, bukan hanya tweet individual")
+st.markdown("**🔬 Metode:** Indeks agregat per akun (jumlah tweet, engagement, periode aktif, sentimen dominan)")
+
+leaderboard_metrics = {
+    'Total Engagement': 'total_engagement',
+    'Jumlah Tweet': 'tweets',
+    'Rata-rata Engagement': 'avg_engagement',
+}
+col1, col2 = st.columns([1, 3])
+with col1:
+    leaderboard_by = st.selectbox("Urutkan berdasarkan:", list(leaderboard_metrics))
+    leaderboard = top_accounts(served_version(), by=leaderboard_metrics[leaderboard_by], n=10)
+    selected_account = st.selectbox("Detail akun:", leaderboard['account'],
+                                    format_func=lambda key: f"@{leaderboard.set_index('account').loc[key, 'username']}")
+with col2:
+    st.dataframe(
+        leaderboard[['username', 'tweets', 'total_engagement', 'avg_engagement', 'first_seen', 'last_seen', 'dominant_sentiment']],
+        width='stretch',
+        hide_index=True,
+        column_config={
+            "username": "Username",
+            "tweets": st.column_config.NumberColumn("Tweet", format="%d"),
+            "total_engagement": st.column_config.NumberColumn("Total Engagement", format="%d"),
+            "avg_engagement": st.column_config.NumberColumn("Rata-rata", format="%.1f"),
+            "first_seen": st.column_config.DatetimeColumn("Pertama", format="DD/MM/YYYY"),
+            "last_seen": st.column_config.DatetimeColumn("Terakhir", format="DD/MM/YYYY"),
+            "dominant_sentiment": "Sentimen Dominan",
+        }
+    )
+
+accounts_idx = account_index(served_version())
+account = accounts_idx['accounts'].loc[selected_account]
+account_tweets = snapshot_rows(account_rows(accounts_idx, selected_account))
+account_tweets = account_tweets.assign(full_text=load_texts(account_tweets),
+                                       total_engagement=account_tweets['favorite_count'] + account_tweets['retweet_count'])
+
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    st.metric("Tweet", f"{account['tweets']:,}")
+with col2:
+    st.metric("Total Engagement", f"{account['total_engagement']:,}")
+with col3:
+    st.metric("Aktif", f"{(account['last_seen'] - account['first_seen']).days + 1} hari")
+with col4:
+    st.metric("Sentimen Dominan", account['dominant_sentiment'])
+
+st.dataframe(account_tweets.sort_values('total_engagement', ascending=False)[['created_at', 'full_text', 'favorite_count', 'retweet_count', 'total_engagement']],
+             width='stretch', height=250)
+
+st.markdown("---")
+st.markdown("---")
+
+st.markdown("## 🧵 Analisis Percakapan")
+
+conversations = conversation_graph(served_version())
+threads = conversations['threads']
+graph_stats = conversations['stats']
+
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    st.metric("Total Thread", f"{len(threads):,}")
+with col2:
+    st.metric("Thread Terbesar", f"{threads['tweets'].max():,} tweet")
+with col3:
+    st.metric("Kedalaman Maksimum", f"{threads['depth'].max()} level")
+with col4:
+    st.metric("Komunitas Terhubung", f"{graph_stats['components']:,}")
+    st.caption(f"{graph_stats['users']:,} akun, {graph_stats['reply_edges'] + graph_stats['mention_edges']:,} relasi")
+
+col1, col2 = st.columns(2)
+
+with col1:
+    st.markdown("### 💬 Akun Paling Banyak Dibalas")
+    st.markdown("**🎯 Tujuan:** Mengidentifikasi akun yang menjadi pusat percakapan")
+    st.markdown("**🔬 Metode:** In-degree graf balasan user→user (CSR adjacency)")
+
+    top_replied = conversations['top_replied'].head(10)
+    fig = px.bar(top_replied, x='replies_received', y='username', orientation='h',
+                 title='Top 10 Akun Paling Banyak Dibalas',
+                 labels={'replies_received': 'Balasan Diterima', 'username': 'Akun'},
+                 hover_data=['reply_count'])
+    fig.update_traces(marker_color='#d35400')
+    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=450)
+    st.plotly_chart(fig, width='stretch')
+
+with col2:
+    st.markdown("### 🌳 Ukuran dan Kedalaman Thread")
+    st.markdown("**🎯 Tujuan:** Melihat seberapa jauh percakapan menyebar")
+    st.markdown("**🔬 Metode:** Grouping `conversation_id` dan propagasi kedalaman balasan per level")
+
+    thread_shape = threads.groupby(['tweets', 'depth']).size().reset_index(name='count')
+    fig = px.scatter(thread_shape, x='tweets', y='depth', size='count',
+                     title='Distribusi Ukuran vs Kedalaman Thread',
+                     labels={'tweets': 'Tweet dalam Thread', 'depth': 'Kedalaman', 'count': 'Jumlah Thread'})
+    fig.update_traces(marker_color='#2c3e50')
+    fig.update_layout(height=450)
+    st.plotly_chart(fig, width='stretch')
+
+multi_tweet_threads = (threads['tweets'] > 1).sum()
+st.markdown(f"""
+**📊 Hasil:**
+- Thread dengan lebih dari satu tweet: **{multi_tweet_threads:,}** dari {len(threads):,}
+- Akun paling banyak dibalas: **@{top_replied.iloc[0]['username']}** ({top_replied.iloc[0]['replies_received']} balasan)
+- Komunitas terbesar: **{conversations['component_sizes'][0]:,}** akun saling terhubung lewat balasan/mention
+
+**💡 Kesimpulan:**
+Sebagian besar tweet berdiri sendiri (broadcast), sementara diskusi interaktif terkonsentrasi pada 
+segelintir akun media dan peneliti keamanan yang menjadi **hub informasi**.
+""")
+
 st.markdown("---")
 st.markdown("---")
 
 st.markdown("## 🔗 Analisis Hashtag")
 
-hashtags = extract_hashtags(df)
+hashtags = top_hashtags(served_version(), n=15)
+unique_hashtags = count_distinct(served_version(), 'hashtags')
 
 if len(hashtags) > 0:
-    hashtag_df = pd.DataFrame(hashtags, columns=['Hashtag', 'Frekuensi'])
+    hashtag_df = hashtags[['hashtag', 'uses']].rename(columns={'hashtag': 'Hashtag', 'uses': 'Frekuensi'})
     
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total Hashtag Unik", len(hashtags))
+        st.metric("Total Hashtag Unik", f"{unique_hashtags:,}")
     with col2:
         st.metric("Hashtag Teratas", f"#{hashtag_df.iloc[0]['Hashtag']}")
         st.caption(f"{hashtag_df.iloc[0]['Frekuensi']} kali")
@@ -189,7 +360,7 @@ if len(hashtags) > 0:
     with col1:
         st.markdown("### 📊 Top 15 Hashtag")
         st.markdown("**🎯 Tujuan:** Identifikasi tagar populer untuk memahami kategorisasi topik")
-        st.markdown("**🔬 Metode:** Regex extraction dan frequency counting")
+        st.markdown("**🔬 Metode:** Indeks hashtag × hari yang dibangun sekali per versi dataset")
         
         fig = px.bar(hashtag_df, x='Frekuensi', y='Hashtag', orientation='h',
                      title='Most Used Hashtags')
@@ -222,7 +393,7 @@ if len(hashtags) > 0:
         top_10_pct = (hashtag_df.head(10)['Frekuensi'].sum() / hashtag_df['Frekuensi'].sum() * 100)
         st.markdown(f"""
         **📊 Hasil:**
-        - Total hashtag unik: **{len(hashtags)}**
+        - Total hashtag unik: **{unique_hashtags:,}**
         - Konsentrasi top 10: **{top_10_pct:.1f}%**
         
         **💡 Insight:**
@@ -232,6 +403,75 @@ if len(hashtags) > 0:
     
     st.markdown("---")
     
+    st.markdown("### 📈 Tren & Engagement Hashtag")
+    st.markdown("**🎯 Tujuan:** Melihat perkembangan hashtag dari waktu ke waktu dan hashtag yang paling mendorong engagement")
+    st.markdown("**🔬 Metode:** Lookup tabel hashtag × hari (jumlah tweet, likes, retweets) tanpa memindai ulang teks")
+    
+    tag_index = hashtag_index(served_version())
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        selected_tag = st.selectbox("Pilih hashtag:", hashtag_df['Hashtag'], format_func=lambda tag: f"#{tag}")
+        tag_daily = hashtag_daily(tag_index, selected_tag).reset_index()
+        
+        fig = px.bar(tag_daily, x='date', y='tweets', hover_data=['likes', 'retweets'],
+                     title=f'Penggunaan #{selected_tag} per Hari',
+                     labels={'date': 'Tanggal', 'tweets': 'Jumlah Tweet'})
+        fig.update_traces(marker_color='#16a085')
+        fig.update_layout(height=400)
+        st.plotly_chart(fig, width='stretch')
+        
+        tag_peak = tag_daily.loc[tag_daily['tweets'].idxmax()]
+        st.markdown(f"""
+        **📊 Hasil:**
+        - Aktif selama **{len(tag_daily)}** hari, puncak pada **{tag_peak['date']:%d %b %Y}** ({tag_peak['tweets']} tweet)
+        - Total engagement: **{tag_daily['total_engagement'].sum():,}**
+        """)
+    
+    with col2:
+        # Only hashtags used in at least 3 tweets, so single viral tweets don't dominate
+        engaging = top_hashtags(served_version(), by='avg_engagement', n=200)
+        engaging = engaging[engaging['tweets'] >= 3].head(10)
+        
+        fig = px.bar(engaging, x='avg_engagement', y='hashtag', orientation='h',
+                     hover_data=['tweets', 'likes', 'retweets'],
+                     title='Rata-rata Engagement per Hashtag (min. 3 tweet)',
+                     labels={'avg_engagement': 'Rata-rata Engagement', 'hashtag': 'Hashtag'})
+        fig.update_traces(marker_color='#e67e22')
+        fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=400)
+        st.plotly_chart(fig, width='stretch')
+        
+        if len(engaging) > 0:
+            st.markdown(f"""
+            **💡 Insight:**
+            **#{engaging.iloc[0]['hashtag']}** menghasilkan rata-rata **{engaging.iloc[0]['avg_engagement']:.1f}** 
+            engagement per tweet, dibandingkan **{avg_engagement:.1f}** untuk seluruh dataset.
+            """)
+    
+    st.markdown(f"**🔎 Rincian #{selected_tag}**")
+    # Breakdowns that are not by date read the hashtag's posting list, so only its tweets are touched
+    tag_features = row_features(served_version()).iloc[hashtag_rows(tag_index, selected_tag)]
+    col1, col2 = st.columns([1, 2])
+    
+    with col1:
+        tag_sentiment = tag_features['sentiment'].value_counts().reindex(['Positif', 'Netral', 'Negatif'], fill_value=0)
+        fig = px.pie(values=tag_sentiment.values, names=tag_sentiment.index, title=f'Sentimen Tweet #{selected_tag}',
+                     color=tag_sentiment.index,
+                     color_discrete_map={'Positif': '#2ecc71', 'Netral': '#95a5a6', 'Negatif': '#e74c3c'})
+        fig.update_layout(height=350)
+        st.plotly_chart(fig, width='stretch')
+    
+    with col2:
+        tag_top = snapshot_rows(tag_features.nlargest(5, 'engagement').index)
+        tag_top = tag_top.assign(full_text=load_texts(tag_top),
+                                 total_engagement=tag_top['favorite_count'] + tag_top['retweet_count'])
+        st.dataframe(tag_top[['username', 'full_text', 'favorite_count', 'retweet_count', 'total_engagement']].rename(
+                         columns={'username': 'Username', 'full_text': 'Tweet', 'favorite_count': 'Likes',
+                                  'retweet_count': 'Retweets', 'total_engagement': 'Total Engagement'}),
+                     width='stretch', hide_index=True)
+    
+    st.markdown("---")
+    
     st.markdown("### 📋 Ringkasan Analisis Engagement & Hashtag")
     
     col1, col2, col3 = st.columns(3)
@@ -239,16 +479,16 @@ if len(hashtags) > 0:
     with col1:
         st.markdown("**💬 Engagement Metrics**")
         st.markdown(f"""
-        - Total engagement: **{df['total_engagement'].sum():,}**
+        - Total engagement: **{total_engagement:,}**
         - Engagement rate: **{engagement_rate:.1f}%**
-        - Avg per tweet: **{df['total_engagement'].mean():.1f}**
+        - Avg per tweet: **{avg_engagement:.1f}**
         - Likes ratio: **{likes_pct:.1f}%**
         """)
     
     with col2:
         st.markdown("**🔗 Hashtag Metrics**")
         st.markdown(f"""
-        - Total hashtag: **{len(hashtags)}**
+        - Total hashtag: **{unique_hashtags:,}**
         - Total usage: **{hashtag_df['Frekuensi'].sum():,}**
         - Top hashtag: **#{hashtag_df.iloc[0]['Hashtag']}**
         - Top 10 share: **{top_10_pct:.1f}%**
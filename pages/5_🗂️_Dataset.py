@@ -1,18 +1,24 @@
 import streamlit as st
-import pandas as pd
 
-st.set_page_config(page_title="Dataset", page_icon="🗂️", layout="wide")
+from core import sqlstore, warmup
+from core.data import load_data, served_version, text_heap, with_text_columns
+from core.ranking import ranked, ranking_index
+from core.sampling import estimate_total, stratified_sample
+from core.ui import approximate_toggle, margin_caption, render_sidebar, wait_for_warmup
 
-@st.cache_data
-def load_data():
-    df = pd.read_csv('dataset.csv')
-    df['created_at'] = pd.to_datetime(df['created_at'])
-    df = df[(df['created_at'] >= '2025-09-01') & (df['created_at'] <= '2025-11-30')]
-    return df
+st.set_page_config(page_title="Dataset", page_icon="🗂️", layout="wide")
 
-df = load_data()
+warmup.ensure_started()
+wait_for_warmup()
 
-st.sidebar.info(f"**Periode:** Sep - Nov 2025\n**Total Data:** {len(df):,} tweets")
+approximate = approximate_toggle()
+if approximate:
+    # Only the sample stored at ingestion is read; the full frame is not loaded
+    sampled = stratified_sample(served_version())
+    render_sidebar(sampled['sample'], total=sampled['rows'])
+else:
+    df = load_data()
+    render_sidebar(df)
 
 st.title("🗂️ Eksplorasi Data Mentah")
 st.caption("Akses dan filter data hasil pemrosesan")
@@ -26,33 +32,65 @@ with col1:
 with col2:
     min_engagement = st.slider("📊 Minimum total engagement (likes + retweets):", 0, 100, 0)
 
-# Apply filters
-filtered_df = df.copy()
-if search_term:
-    filtered_df = filtered_df[filtered_df['full_text'].str.contains(search_term, case=False, na=False)]
+if approximate:
+    # Filter the stratified sample only; totals are weighted estimates
+    sample = sampled['sample'].copy()
+    sample['total_engagement'] = sample['favorite_count'] + sample['retweet_count']
+    mask = (sample['total_engagement'] >= min_engagement).to_numpy()
+    if search_term:
+        mask = mask & text_heap(served_version()).contains('full_text', sample.index, search_term)
+    filtered_df = sample[mask].sort_values('total_engagement', ascending=False, kind='stable')
+    estimates = {name: estimate_total(sampled, mask * values) for name, values in (
+        ('tweets', 1), ('likes', sample['favorite_count']), ('retweets', sample['retweet_count']),
+        ('engagement', sample['total_engagement']))}
+elif sqlstore.enabled():
+    filtered_df = sqlstore.filtered_tweets(served_version(), search_term, min_engagement)
+else:
+    # Apply filters as a row mask, then read rows off the precomputed engagement ranking
+    df['total_engagement'] = df['favorite_count'] + df['retweet_count']
+    mask = (df['total_engagement'] >= min_engagement).to_numpy()
+    if search_term:
+        mask = mask & text_heap(served_version()).contains('full_text', df.index, search_term)
 
-filtered_df['total_engagement'] = filtered_df['favorite_count'] + filtered_df['retweet_count']
-filtered_df = filtered_df[filtered_df['total_engagement'] >= min_engagement]
+    filtered_df = df.iloc[ranked(ranking_index(served_version())['total_engagement'], mask)]
 
 # Metrics
 col1, col2, col3, col4 = st.columns(4)
-with col1:
-    st.metric("📊 Tweet Ditampilkan", f"{len(filtered_df):,}")
-with col2:
-    st.metric("❤️ Total Likes", f"{filtered_df['favorite_count'].sum():,}")
-with col3:
-    st.metric("🔄 Total Retweets", f"{filtered_df['retweet_count'].sum():,}")
-with col4:
-    st.metric("💬 Avg Engagement", f"{filtered_df['total_engagement'].mean():.1f}")
+if approximate:
+    tweets_estimate = estimates['tweets'][0]
+    with col1:
+        st.metric("📊 Perkiraan Tweet Cocok", f"≈ {tweets_estimate:,.0f}")
+        margin_caption(estimates['tweets'][1], sampled)
+    with col2:
+        st.metric("❤️ Total Likes", f"≈ {estimates['likes'][0]:,.0f}")
+        margin_caption(estimates['likes'][1], sampled)
+    with col3:
+        st.metric("🔄 Total Retweets", f"≈ {estimates['retweets'][0]:,.0f}")
+        margin_caption(estimates['retweets'][1], sampled)
+    with col4:
+        st.metric("💬 Avg Engagement", f"≈ {estimates['engagement'][0] / tweets_estimate:.1f}" if tweets_estimate else "-")
+    st.caption(f"Tabel menampilkan {len(filtered_df):,} tweet dari sampel; matikan mode perkiraan untuk semua baris.")
+else:
+    with col1:
+        st.metric("📊 Tweet Ditampilkan", f"{len(filtered_df):,}")
+    with col2:
+        st.metric("❤️ Total Likes", f"{filtered_df['favorite_count'].sum():,}")
+    with col3:
+        st.metric("🔄 Total Retweets", f"{filtered_df['retweet_count'].sum():,}")
+    with col4:
+        st.metric("💬 Avg Engagement", f"{filtered_df['total_engagement'].mean():.1f}")
 
 st.markdown("---")
 
 # Data table
 st.markdown("### 📋 Tabel Data")
 display_cols = ['created_at', 'username', 'full_text', 'favorite_count', 'retweet_count', 'total_engagement']
+# Text columns are read from the heap for the rows that pass the filters only;
+# sampling columns stay out of the table and the export
+filtered_df = with_text_columns(filtered_df.drop(columns=['stratum', 'weight'], errors='ignore'))
 
 st.dataframe(
-    filtered_df[display_cols].sort_values('total_engagement', ascending=False),
+    filtered_df[display_cols],
     width='stretch',
     height=650,
     column_config={
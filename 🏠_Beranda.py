@@ -1,5 +1,10 @@
 import streamlit as st
-import pandas as pd
+
+from core import warmup
+from core.cardinality import count_distinct
+from core.data import served_version, snapshot_span
+from core.sampling import estimate_total
+from core.ui import approximate_toggle, margin_caption, page_frame, render_sidebar, sample_caption, wait_for_warmup
 
 # Page config
 st.set_page_config(
@@ -9,37 +14,49 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Load data
-@st.cache_data
-def load_data():
-    df = pd.read_csv('dataset.csv')
-    df['created_at'] = pd.to_datetime(df['created_at'])
-    df = df[(df['created_at'] >= '2025-09-01') & (df['created_at'] <= '2025-11-30')]
-    return df
+warmup.ensure_started()
+wait_for_warmup()
 
-df = load_data()
+# Load data
+approximate = approximate_toggle()
+df, sampled = page_frame(approximate)
+total_tweets = sampled['rows'] if approximate else len(df)
+if approximate:
+    likes, likes_margin = estimate_total(sampled, df['favorite_count'])
+    retweets, retweets_margin = estimate_total(sampled, df['retweet_count'])
+else:
+    likes, retweets = df['favorite_count'].sum(), df['retweet_count'].sum()
+first_tweet, last_tweet = snapshot_span(served_version())
 
 # Sidebar
-st.sidebar.info(f"**Periode:** Sep - Nov 2025\n**Total Data:** {len(df):,} tweets")
+render_sidebar(df, total=total_tweets)
 
 
 # Main Page
 st.title("Analisis Dinamika Sentimen dan Respons Publik")
 st.subheader("Serangan Supply Chain pada Node Package Manager (NPM)")
 st.caption("Periode: September - November 2025")
+if approximate:
+    sample_caption(sampled)
 
 st.markdown("---")
 
 # Metrics
-col1, col2, col3, col4 = st.columns(4)
+col1, col2, col3, col4, col5 = st.columns(5)
 with col1:
-    st.metric("📊 Total Tweet", f"{len(df):,}")
+    st.metric("📊 Total Tweet", f"{total_tweets:,}")
 with col2:
-    st.metric("📅 Rentang Waktu", f"{(df['created_at'].max() - df['created_at'].min()).days} hari")
+    st.metric("📅 Rentang Waktu", f"{(last_tweet - first_tweet).days} hari")
 with col3:
-    st.metric("❤️ Total Likes", f"{df['favorite_count'].sum():,}")
+    st.metric("❤️ Total Likes", f"{likes:,.0f}")
+    if approximate:
+        margin_caption(likes_margin, sampled)
 with col4:
-    st.metric("🔄 Total Retweets", f"{df['retweet_count'].sum():,}")
+    st.metric("🔄 Total Retweets", f"{retweets:,.0f}")
+    if approximate:
+        margin_caption(retweets_margin, sampled)
+with col5:
+    st.metric("👥 Pengguna Unik", f"{count_distinct(served_version(), 'users'):,}")
 
 st.markdown("---")
 
@@ -56,7 +73,7 @@ dengan kata kunci: **NPM Supply Chain Attack**, **Shai-Hulud**, **Worm Malware**
 4. **Favorite Count** - Jumlah likes
 5. **Retweet Count** - Jumlah retweets
 
-Data yang diolah sebanyak **{len(df):,}** baris data dari periode **September - November 2025**.
+Data yang diolah sebanyak **{total_tweets:,}** baris data dari periode **September - November 2025**.
 """)
 
 st.markdown("---")